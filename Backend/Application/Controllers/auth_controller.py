@@ -1,11 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm # DTO estándar de FastAPI para login
 from Domain.Exceptions.domain_exception import DomainError
-from Domain.Interfaces.auth_service_interface import AuthServiceInterface
+from Domain.Interfaces.auth_service_async_interface import ServicioAuth
 from Application.DTOs.auth_dto import Token, UserLogin, UserResponse, UserCreate
 from Infrastructure.deps import get_auth_service
+from Infrastructure.concurrency import ejecutar
 from Domain.Entities.user import User
 from Infrastructure.Security.jwt_handler import get_current_user
+from Infrastructure.Security.hashing_pool import HashingPoolSaturadoError
 
 
 
@@ -13,15 +15,18 @@ router = APIRouter(prefix="/api", tags=["Autenticacion"])
 
 # ------------------------------------ CREAR JWT (LOGIN) -------------------------------------------------------
 @router.post("/auth/token", response_model=Token, summary="Obtener token JWT (Login)", operation_id="Login_Usuario")
-def login_for_access_token( form_data: OAuth2PasswordRequestForm = Depends(), # Acepta el formato de formulario estándar
-    auth_service: AuthServiceInterface = Depends(get_auth_service)) -> Token:
+async def login_for_access_token( form_data: OAuth2PasswordRequestForm = Depends(), # Acepta el formato de formulario estándar
+    auth_service: ServicioAuth = Depends(get_auth_service)) -> Token:
     """
     Endpoint para iniciar sesión.
     """
     # Creamos un DTO UserLogin a partir de form_data para pasarlo al servicio.
     user_login_dto = UserLogin(username=form_data.username, password=form_data.password)
     # Autenticamos (pasamos el DTO de Aplicación al Servicio).
-    user = auth_service.authenticate_user(user_login=user_login_dto)
+    try:
+        user = await ejecutar(auth_service.authenticate_user, user_login=user_login_dto)
+    except HashingPoolSaturadoError as e:
+        raise _servicio_saturado(e)
 
     if not user:
         raise HTTPException(
@@ -31,20 +36,20 @@ def login_for_access_token( form_data: OAuth2PasswordRequestForm = Depends(), #
         )
     
     # Si el usuario es válido, crear el token.
-    access_token = auth_service.create_access_token(user_id=user.id) # user.id es la Entidad de Dominio.
+    access_token = await ejecutar(auth_service.create_access_token, user_id=user.id) # user.id es la Entidad de Dominio.
     return access_token
 # --------------------------------------------------------------------------------------------------------------
 
 
 # ------------------------------------ CREAR USUARIO -----------------------------------------------------------
 @router.post("/auth/register", response_model=UserResponse,status_code=status.HTTP_201_CREATED,summary="Registrar un nuevo usuario en el sistema", operation_id="Register_User")
-def register_new_user( user_data: UserCreate, auth_service: AuthServiceInterface = Depends(get_auth_service)):
+async def register_new_user( user_data: UserCreate, auth_service: ServicioAuth = Depends(get_auth_service)):
     """
     Endpoint para registrar un nuevo usuario.
     """
     try:
         # Llamamos al caso de uso de Aplicación.
-        user_entity = auth_service.register_user(user_data)
+        user_entity = await ejecutar(auth_service.register_user, user_data)
         # Mapeamos la Entidad de Dominio a un DTO de Respuesta (UserResponse).
         return UserResponse(
             id=user_entity.id,
@@ -58,12 +63,19 @@ def register_new_user( user_data: UserCreate, auth_service: AuthServiceInterface
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
+    except HashingPoolSaturadoError as e:
+        raise _servicio_saturado(e)
 # --------------------------------------------------------------------------------------------------------------
 
 
+def _servicio_saturado(e: HashingPoolSaturadoError) -> HTTPException:
+    """El pool de hashing está lleno: se rechaza rápido para no degradar al resto de las rutas."""
+    return HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e), headers={"Retry-After": "1"})
+
+
 # ------------------------------------ OBTENER USUARIO ---------------------------------------------------------
 @router.get("/auth/me", response_model=UserResponse, summary="Obtener usuario actual", operation_id="Obtener_Usuario")
-def get_current_user_endpoint(current_user: User = Depends(get_current_user)):
+async def get_current_user_endpoint(current_user: User = Depends(get_current_user)):
     """
     Endpoint para obtener los datos del usuario autenticado.
     """
@@ -73,4 +85,14 @@ def get_current_user_endpoint(current_user: User = Depends(get_current_user)):
         full_name=current_user.full_name,
         is_active=current_user.is_active
     )
-# --------------------------------------------------------------------------------------------------------------
\ No newline at end of file
+# --------------------------------------------------------------------------------------------------------------
+
+# ------------------------------------ DESACTIVAR USUARIO ------------------------------------------------------
+@router.delete("/auth/me", status_code=status.HTTP_204_NO_CONTENT, summary="Desactivar la cuenta del usuario actual", operation_id="Desactivar_Usuario")
+async def deactivate_current_user(current_user: User = Depends(get_current_user), auth_service: ServicioAuth = Depends(get_auth_service)):
+    """
+    Endpoint para desactivar la cuenta. Sus tokens dejan de ser válidos inmediatamente (se invalida la caché).
+    """
+    await ejecutar(auth_service.deactivate_user, current_user.id)
+    return
+# --------------------------------------------------------------------------------------------------------------
@@ -1,28 +1,40 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response, Request, Header
+from typing import List, Optional, Tuple, Dict, Any, Union
+from pydantic import ValidationError
+from starlette.requests import ClientDisconnect
+from starlette.responses import StreamingResponse
+from starlette.concurrency import iterate_in_threadpool
+from config import settings
 from Domain.Entities.user import User
 from Domain.Entities.ejercicio import Ejercicio
 from Domain.ValueObjects.dias import DiaSemana
 from Domain.Exceptions.domain_exception import ValueError
-from Domain.Interfaces.rutina_service_interface import RutinaServiceInterface
+from Domain.Interfaces.rutina_service_async_interface import ServicioRutinas
 from Application.DTOs.ejercicio_dto import EjercicioCreate, EjercicioUpdate, EjercicioResponse
-from Application.DTOs.rutina_dto import RutinaConEjerciciosCreate, RutinaResponse, RutinaModificarRequest
-from Application.Exceptions.rutina_exception import RutinaAlreadyExistsError, RutinaNotFoundError
+from Application.DTOs.rutina_dto import RutinaConEjerciciosCreate, RutinaResponse, RutinaModificarRequest, RutinaBulkResultado, RutinaBulkResumen, RutinaPorDiaResponse, RutinaResumenResponse
+from Application.DTOs.batch_dto import BatchRequest, BatchResponse, OperacionResultado, OperacionLote
+from Application.Exceptions.rutina_exception import RutinaAlreadyExistsError, RutinaNotFoundError, CursorInvalidoError, LoteRevertidoError
+from Application.Services.paginacion import NEXT_CURSOR_HEADER, recortar_pagina
+from Application.Services.exportacion import FORMATOS_EXPORT, exportar_csv, exportar_ndjson
+from Application.Services.etag import CACHE_CONTROL_RUTINAS, etag_rutinas, no_modificado
+from Application.Services.serializacion import a_json
 from Infrastructure.deps import get_rutina_service
+from Infrastructure.concurrency import ejecutar
+from Infrastructure.streaming import NDJSON_MEDIA_TYPE, DuplexStreamingResponse, leer_ndjson
 from Infrastructure.Security.jwt_handler import get_current_user
 
 router = APIRouter(prefix="/api", tags=["Rutinas"])
 
 # ------------------------------------ ALTA RUTINAS ------------------------------------------------------------
 @router.post("/rutinas", response_model=RutinaResponse, status_code=status.HTTP_201_CREATED, summary="Dar de Alta una Rutina", operation_id="Alta_Rutina")
-def alta_rutina( data: RutinaConEjerciciosCreate,
-    servicio: RutinaServiceInterface = Depends(get_rutina_service), 
+async def alta_rutina( data: RutinaConEjerciciosCreate,
+    servicio: ServicioRutinas = Depends(get_rutina_service), 
     # Si la validación de get_current_user falla (token ausente o inválido),
     # FastAPI detiene la ejecución y devuelve 401 Unauthorized.
     current_user: User = Depends(get_current_user)) -> RutinaResponse:
     try:
         # Llamada al Caso de Uso/Servicio de Aplicación.
-        rutina = servicio.alta_rutina(data, user_id=current_user.id)
+        rutina = await ejecutar(servicio.alta_rutina, data, user_id=current_user.id)
 
         # Mapeo de Entidad de Dominio a DTO de Respuesta (para el cliente).
         return RutinaResponse.model_validate(rutina) 
@@ -40,41 +52,204 @@ def alta_rutina( data: RutinaConEjerciciosCreate,
 # --------------------------------------------------------------------------------------------------------------
 
 
+# ------------------------------------ ALTA MASIVA DE RUTINAS (NDJSON) ----------------------------------------
+@router.post("/rutinas/bulk", response_class=DuplexStreamingResponse, summary="Alta masiva de rutinas desde un body NDJSON", operation_id="Alta_Rutinas_Bulk",
+    openapi_extra={"requestBody": {"required": True, "content": {NDJSON_MEDIA_TYPE: {"schema": {"$ref": "#/components/schemas/RutinaConEjerciciosCreate"}}}}},
+    responses={200: {"description": "Una línea RutinaBulkResultado por rutina y al final {\"resumen\": RutinaBulkResumen}.", "content": {NDJSON_MEDIA_TYPE: {}}}})
+async def alta_rutinas_bulk( request: Request,
+    servicio: ServicioRutinas = Depends(get_rutina_service), current_user: User = Depends(get_current_user)):
+    """
+    Cada línea del body es un RutinaConEjerciciosCreate. Las líneas se validan a medida que llegan y las
+    válidas se insertan de a BULK_BATCH_SIZE por transacción (INSERT multi-fila).
+    La respuesta se va enviando mientras se procesa: la memoria depende del tamaño del lote, no del archivo.
+    """
+    user_id = current_user.id
+
+    async def resultados():
+        resumen = RutinaBulkResumen()
+        lote: List[Tuple[int, RutinaConEjerciciosCreate]] = []
+        try:
+            async for numero, linea in leer_ndjson(request, settings.BULK_MAX_LINE_BYTES):
+                resumen.total += 1
+                try:
+                    if not linea:
+                        raise ValueError(f"La línea supera el máximo de {settings.BULK_MAX_LINE_BYTES} bytes.")
+                    lote.append((numero, RutinaConEjerciciosCreate.model_validate_json(linea)))
+                except (ValidationError, ValueError) as e:
+                    resumen.errores += 1
+                    yield _linea_ndjson(RutinaBulkResultado(linea=numero, estado="error", detalle=_detalle_error(e)))
+                    continue
+
+                if len(lote) >= settings.BULK_BATCH_SIZE:
+                    for resultado in await _procesar_lote(servicio, lote, user_id, resumen):
+                        yield _linea_ndjson(resultado)
+                    lote = []
+
+            if lote:
+                for resultado in await _procesar_lote(servicio, lote, user_id, resumen):
+                    yield _linea_ndjson(resultado)
+        except ClientDisconnect:
+            # El cliente cortó la conexión: los lotes ya confirmados quedan guardados.
+            return
+        yield '{"resumen": ' + resumen.model_dump_json() + '}\n'
+
+    return DuplexStreamingResponse(resultados(), media_type=NDJSON_MEDIA_TYPE)
+
+
+async def _procesar_lote(servicio: ServicioRutinas, lote: List[Tuple[int, RutinaConEjerciciosCreate]],
+    user_id: int, resumen: RutinaBulkResumen) -> List[RutinaBulkResultado]:
+    """Guarda un lote (una transacción) y traduce el resultado de cada rutina a su línea de respuesta."""
+    try:
+        creadas = await ejecutar(servicio.alta_rutinas_lote, [data for _, data in lote], user_id=user_id)
+    except Exception as e:
+        # Error de la DB: el lote completo se revierte.
+        creadas = [Exception(f"Error al crear la rutina: {str(e)}")] * len(lote)
+
+    resultados = []
+    for (numero, data), creada in zip(lote, creadas):
+        if isinstance(creada, Exception):
+            resumen.errores += 1
+            resultados.append(RutinaBulkResultado(linea=numero, estado="error", nombre=data.nombre, detalle=str(creada)))
+        else:
+            resumen.creadas += 1
+            resultados.append(RutinaBulkResultado(linea=numero, estado="creada", id=creada.id, nombre=creada.nombre))
+    return resultados
+
+
+def _linea_ndjson(resultado: RutinaBulkResultado) -> str:
+    return resultado.model_dump_json(exclude_none=True) + "\n"
+
+
+def _detalle_error(error: Exception) -> str:
+    """Mensaje corto de un error de validación: 'campo: mensaje; ...'."""
+    if isinstance(error, ValidationError):
+        return "; ".join(": ".join(filter(None, [".".join(str(p) for p in err["loc"]), err["msg"]])) for err in error.errors())
+    return str(error)
+# --------------------------------------------------------------------------------------------------------------
+
+
 # ------------------------------------ LISTAR RUTINAS ----------------------------------------------------------
-@router.get( "/rutinas", response_model=List[RutinaResponse], summary="Lista todas las rutinas con paginación", operation_id="Listar_Rutina" )
-def listar_rutinas( skip: int = Query(0, ge=0, description="Número de autos a saltar"),
-    limit: int = Query(100, ge=1, le=1000, description="Número de autos a devolver"),
-    servicio: RutinaServiceInterface = Depends(get_rutina_service), current_user: User = Depends(get_current_user)) -> List[RutinaResponse]:
+@router.get( "/rutinas", response_model=Union[List[RutinaResponse], List[RutinaResumenResponse]], summary="Lista todas las rutinas con paginación", operation_id="Listar_Rutina" )
+async def listar_rutinas(
+    skip: int = Query(0, ge=0, description="Número de rutinas a saltar (modo offset, por compatibilidad)"),
+    limit: int = Query(100, ge=1, le=1000, description="Número de rutinas a devolver"),
+    cursor: Optional[str] = Query(None, description="Cursor opaco devuelto en el header X-Next-Cursor. Si se envía, se ignora 'skip'."),
+    vista: str = Query("completa", pattern="^(completa|resumen)$", description="'completa': RutinaResponse con sus ejercicios. 'resumen': RutinaResumenResponse (cantidad de ejercicios por día)."),
+    if_none_match: Optional[str] = Header(None, description="ETag de una respuesta anterior: si nada cambió se responde 304 sin cuerpo."),
+    servicio: ServicioRutinas = Depends(get_rutina_service), current_user: User = Depends(get_current_user)) -> Response:
+    # Se resuelve antes de cargar las rutinas: si el cliente ya tiene esta versión, no se consultan.
+    etag = await _etag(servicio, current_user.id)
+    if no_modificado(if_none_match, etag):
+        return _no_modificado(etag)
     try:
-        rutinas = servicio.listar_rutinas(skip, limit, user_id=current_user.id)
-        return [RutinaResponse.model_validate(r) for r in rutinas]
+        # El resumen no lee los ejercicios: la DB devuelve solo la cantidad por día.
+        resumen = vista == "resumen"
+        if cursor:
+            # Modo keyset: el costo no depende de la profundidad de la página.
+            listar = servicio.listar_rutinas_cursor_resumen if resumen else servicio.listar_rutinas_cursor_filas
+            rutinas, next_cursor = await ejecutar(listar, limit, cursor, user_id=current_user.id)
+        else:
+            listar = servicio.listar_rutinas_resumen if resumen else servicio.listar_rutinas_filas
+            # Se pide una rutina de más: solo si llega hay página siguiente (y su cursor).
+            rutinas, next_cursor = recortar_pagina(await ejecutar(listar, skip, limit + 1, user_id=current_user.id), limit)
+
+        # El cursor viaja en un header para no cambiar el cuerpo (lista) que ya consumen los clientes.
+        headers = _cabeceras_etag(etag)
+        if next_cursor:
+            headers[NEXT_CURSOR_HEADER] = next_cursor
+        return _respuesta_json(rutinas, headers)
+    except CursorInvalidoError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+async def _etag(servicio: ServicioRutinas, user_id: int) -> str:
+    """ETag de la versión actual de las rutinas del usuario (una lectura por PK)."""
+    return etag_rutinas(user_id, await ejecutar(servicio.version_rutinas, user_id))
+
+
+def _cabeceras_etag(etag: str) -> Dict[str, str]:
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL_RUTINAS}
+
+
+def _no_modificado(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=_cabeceras_etag(etag))
+
+
+def _respuesta_json(contenido: Any, headers: Dict[str, str]) -> Response:
+    """
+    Respuesta ya codificada (orjson): FastAPI no vuelve a validar ni a serializar el cuerpo.
+    El response_model de la ruta queda solo para documentar el esquema en OpenAPI.
+    """
+    return Response(content=a_json(contenido), media_type="application/json", headers=headers)
 # --------------------------------------------------------------------------------------------------------------
 
 
 # ------------------------------------ BUSQUEDA PARCIAL POR NOMBRE ---------------------------------------------
 @router.get("/rutinas/buscar", response_model=List[RutinaResponse],summary="Busca rutinas por coincidencia parcial en el nombre", operation_id="Busqueda_Parcial")
-def search_rutinas(nombre: str = Query(..., min_length=1, description="Término de búsqueda parcial (ej: 'cardio')"),
-    servicio: RutinaServiceInterface = Depends(get_rutina_service), current_user: User = Depends(get_current_user)):
+async def search_rutinas(nombre: str = Query(..., min_length=1, description="Término de búsqueda parcial (ej: 'cardio')"),
+    limit: int = Query(50, ge=1, le=200, description="Máximo de resultados, ordenados por relevancia"),
+    servicio: ServicioRutinas = Depends(get_rutina_service), current_user: User = Depends(get_current_user)):
     """
     Endpoint que responde a: GET /api/rutinas/buscar?nombre={texto}
     """
     # Llamada al Caso de Uso/Servicio de Aplicación.
     # Usamos el servicio existente, el cual recibe el término y devuelve las Entidades.
-    rutinas_domain = servicio.buscar_rutinas_por_nombre(nombre, user_id=current_user.id)
+    rutinas_domain = await ejecutar(servicio.buscar_rutinas_por_nombre, nombre, user_id=current_user.id, limit=limit)
     rutinas_resumen_dto = [RutinaResponse.model_validate(r) for r in rutinas_domain]
     return rutinas_resumen_dto
 # --------------------------------------------------------------------------------------------------------------
 
 
+# ------------------------------------ EXPORTAR RUTINAS (STREAMING) --------------------------------------------
+@router.get("/rutinas/export", response_class=StreamingResponse, summary="Exporta todas las rutinas del usuario en NDJSON o CSV", operation_id="Exportar_Rutinas",
+    responses={200: {"description": "NDJSON: una rutina por línea (forma de RutinaResponse). CSV: una fila por ejercicio.",
+                     "content": {media_type: {} for media_type in FORMATOS_EXPORT.values()}}})
+async def exportar_rutinas( formato: str = Query("ndjson", pattern="^(ndjson|csv)$", description="Formato de salida: 'ndjson' o 'csv'"),
+    servicio: ServicioRutinas = Depends(get_rutina_service), current_user: User = Depends(get_current_user)):
+    """
+    Las filas se leen con un cursor del lado del servidor y se codifican a medida que llegan,
+    sin armar Entidades ni DTOs: la memoria no depende de la cantidad de rutinas del usuario.
+    """
+    particiones = servicio.exportar_rutinas(current_user.id, settings.EXPORT_BATCH_SIZE)
+    if not hasattr(particiones, "__aiter__"):
+        # Modo sync: cada partición se lee en el threadpool (un salto de hilo por lote, no por fila).
+        particiones = iterate_in_threadpool(particiones)
+
+    cuerpo = exportar_csv(particiones) if formato == "csv" else exportar_ndjson(particiones)
+    return StreamingResponse(cuerpo, media_type=FORMATOS_EXPORT[formato],
+                             headers={"Content-Disposition": f'attachment; filename="rutinas.{formato}"'})
+# --------------------------------------------------------------------------------------------------------------
+
+
 # ------------------------------------ BUSCAR RUTINA POR ID ----------------------------------------------------
 @router.get("/rutinas/{rutina_id}", response_model=RutinaResponse, summary="Obtiene el detalle completo de una rutina agrupado por día", operation_id="Rutina_por_dia")
-def obtener_detalle_rutina( rutina_id: int, servicio: RutinaServiceInterface = Depends(get_rutina_service), current_user: User = Depends(get_current_user)):
+async def obtener_detalle_rutina( rutina_id: int,
+    if_none_match: Optional[str] = Header(None, description="ETag de una respuesta anterior: si nada cambió se responde 304 sin cuerpo."),
+    servicio: ServicioRutinas = Depends(get_rutina_service), current_user: User = Depends(get_current_user)):
+    etag = await _etag(servicio, current_user.id)
+    if no_modificado(if_none_match, etag):
+        return _no_modificado(etag)
     try:
-        rutina_domain = servicio.obtener_detalle_rutina(rutina_id, user_id=current_user.id)
-        response_data = RutinaResponse.model_validate(rutina_domain)
-        return response_data
+        rutina = await ejecutar(servicio.obtener_detalle_rutina_filas, rutina_id, user_id=current_user.id)
+        return _respuesta_json(rutina, _cabeceras_etag(etag))
+    except RutinaNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+# --------------------------------------------------------------------------------------------------------------
+
+
+# ------------------------------------ RUTINA AGRUPADA POR DIA -------------------------------------------------
+@router.get("/rutinas/{rutina_id}/dias", response_model=RutinaPorDiaResponse, summary="Ejercicios de una rutina agrupados por día (Lunes..Domingo) y ordenados por 'orden'", operation_id="Rutina_Agrupada_por_Dia")
+async def obtener_rutina_por_dia( rutina_id: int,
+    if_none_match: Optional[str] = Header(None, description="ETag de una respuesta anterior: si nada cambió se responde 304 sin cuerpo."),
+    servicio: ServicioRutinas = Depends(get_rutina_service), current_user: User = Depends(get_current_user)):
+    etag = await _etag(servicio, current_user.id)
+    if no_modificado(if_none_match, etag):
+        return _no_modificado(etag)
+    try:
+        rutina = await ejecutar(servicio.obtener_rutina_por_dia, rutina_id, user_id=current_user.id)
+        return _respuesta_json(rutina, _cabeceras_etag(etag))
     except RutinaNotFoundError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
 # --------------------------------------------------------------------------------------------------------------
@@ -82,9 +257,9 @@ def obtener_detalle_rutina( rutina_id: int, servicio: RutinaServiceInterface = D
 
 # ------------------------------------ BUSCAR RUTINA POR NOMBRE ------------------------------------------------
 @router.get("/rutinas/nombre/{nombre}", response_model=RutinaResponse, summary="Buscar una Rutina por su nombre", operation_id="Buscar_Rutina_por_Nombre")
-def buscar_por_nombre( nombre: str, servicio: RutinaServiceInterface = Depends(get_rutina_service), current_user: User = Depends(get_current_user)) -> RutinaResponse:
+async def buscar_por_nombre( nombre: str, servicio: ServicioRutinas = Depends(get_rutina_service), current_user: User = Depends(get_current_user)) -> RutinaResponse:
     try:
-        rutina = servicio.buscar_por_nombre(nombre, user_id=current_user.id)
+        rutina = await ejecutar(servicio.buscar_por_nombre, nombre, user_id=current_user.id)
         return RutinaResponse.model_validate(rutina)
     except Exception as e:
         raise HTTPException(
@@ -96,10 +271,10 @@ def buscar_por_nombre( nombre: str, servicio: RutinaServiceInterface = Depends(g
 
 # ------------------------------------ MODIFICAR RUTINA --------------------------------------------------------
 @router.put("/rutinas/{rutina_id}", response_model=RutinaResponse, summary="Modifica una rutina existente y sus ejercicios asociados", operation_id="Modificar_Rutina")
-def modificar_rutina( rutina_id: int, data: RutinaModificarRequest, servicio: RutinaServiceInterface = Depends(get_rutina_service), current_user: User = Depends(get_current_user)):
+async def modificar_rutina( rutina_id: int, data: RutinaModificarRequest, servicio: ServicioRutinas = Depends(get_rutina_service), current_user: User = Depends(get_current_user)):
     try:
         # Llamada al Caso de Uso/Servicio de Aplicación.
-        rutina_domain = servicio.modificar_rutina(rutina_id, data, user_id=current_user.id)
+        rutina_domain = await ejecutar(servicio.modificar_rutina, rutina_id, data, user_id=current_user.id)
         response_data = RutinaResponse.model_validate(rutina_domain)
         return response_data
     except RutinaNotFoundError as e:
@@ -114,10 +289,10 @@ def modificar_rutina( rutina_id: int, data: RutinaModificarRequest, servicio: Ru
 
 # ------------------------------------ DAR DE BAJA UNA RUTINA --------------------------------------------------
 @router.delete("/rutinas/{rutina_id}", status_code=status.HTTP_204_NO_CONTENT, summary="Elimina una rutina y todos sus ejercicios asociados", operation_id="Dar_Baja_Rutina")
-def dar_baja_rutina( rutina_id: int, rutina_service: RutinaServiceInterface = Depends(get_rutina_service), current_user: User = Depends(get_current_user)):
+async def dar_baja_rutina( rutina_id: int, rutina_service: ServicioRutinas = Depends(get_rutina_service), current_user: User = Depends(get_current_user)):
     try:
         # Llamada al Caso de Uso/Servicio de Aplicación.
-        rutina_service.dar_baja_rutina(rutina_id, user_id=current_user.id)
+        await ejecutar(rutina_service.dar_baja_rutina, rutina_id, user_id=current_user.id)
         return 
     except RutinaNotFoundError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
@@ -126,9 +301,9 @@ def dar_baja_rutina( rutina_id: int, rutina_service: RutinaServiceInterface = De
 
 # ------------------------------------ POST /rutinas/{id}/ejercicios ---------------------------------------------
 @router.post("/rutinas/{rutina_id}/ejercicios", response_model=RutinaResponse,status_code=status.HTTP_201_CREATED, summary="Agrega un ejercicio a una rutina existente", operation_id="Agregar_Ejercicio")
-def agregar_ejercicio(rutina_id: int, data: EjercicioCreate, servicio: RutinaServiceInterface = Depends(get_rutina_service), current_user: User = Depends(get_current_user)) -> RutinaResponse:
+async def agregar_ejercicio(rutina_id: int, data: EjercicioCreate, servicio: ServicioRutinas = Depends(get_rutina_service), current_user: User = Depends(get_current_user)) -> RutinaResponse:
     try:
-        rutina_domain = servicio.agregar_ejercicio_a_rutina(rutina_id, data, user_id=current_user.id)
+        rutina_domain = await ejecutar(servicio.agregar_ejercicio_a_rutina, rutina_id, data, user_id=current_user.id)
         return RutinaResponse.model_validate(rutina_domain)
     except RutinaNotFoundError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
@@ -141,9 +316,9 @@ def agregar_ejercicio(rutina_id: int, data: EjercicioCreate, servicio: RutinaSer
 
 # ------------------------------------ PUT /ejercicios/{id} ------------------------------------------------------
 @router.put( "/ejercicios/{ejercicio_id}", response_model=EjercicioResponse, summary="Actualiza un ejercicio existente por ID", operation_id="Actualizar_Ejercicio")
-def actualizar_ejercicio( ejercicio_id: int, data: EjercicioUpdate, servicio: RutinaServiceInterface = Depends(get_rutina_service), current_user: User = Depends(get_current_user)) -> EjercicioResponse:
+async def actualizar_ejercicio( ejercicio_id: int, data: EjercicioUpdate, servicio: ServicioRutinas = Depends(get_rutina_service), current_user: User = Depends(get_current_user)) -> EjercicioResponse:
     try:
-        ejercicio_domain = servicio.actualizar_ejercicio(ejercicio_id, data, user_id=current_user.id)
+        ejercicio_domain = await ejecutar(servicio.actualizar_ejercicio, ejercicio_id, data, user_id=current_user.id)
         return EjercicioResponse.model_validate(ejercicio_domain)
     except RutinaNotFoundError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
@@ -154,12 +329,54 @@ def actualizar_ejercicio( ejercicio_id: int, data: EjercicioUpdate, servicio: Ru
 
 # ------------------------------------ DELETE /ejercicios/{id} ---------------------------------------------------
 @router.delete("/ejercicios/{ejercicio_id}", status_code=status.HTTP_204_NO_CONTENT, summary="Elimina un ejercicio por ID", operation_id="Eliminar_Ejercicio")
-def eliminar_ejercicio( ejercicio_id: int, servicio: RutinaServiceInterface = Depends(get_rutina_service), current_user: User = Depends(get_current_user)):
+async def eliminar_ejercicio( ejercicio_id: int, servicio: ServicioRutinas = Depends(get_rutina_service), current_user: User = Depends(get_current_user)):
     try:
-        servicio.eliminar_ejercicio(ejercicio_id, user_id=current_user.id)
+        await ejecutar(servicio.eliminar_ejercicio, ejercicio_id, user_id=current_user.id)
         return 
     except RutinaNotFoundError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
 # ----------------------------------------------------------------------------------------------------------------
 
 
+# ------------------------------------ POST /batch ---------------------------------------------------------------
+@router.post("/batch", response_model=BatchResponse, summary="Ejecuta en orden varias operaciones sobre ejercicios en una sola transacción", operation_id="Lote_Operaciones",
+    responses={code: {"model": BatchResponse, "description": "Lote atómico revertido: el código es el de la operación que falló."} for code in (400, 404, 409)})
+async def ejecutar_lote_operaciones( data: BatchRequest, response: Response,
+    servicio: ServicioRutinas = Depends(get_rutina_service), current_user: User = Depends(get_current_user)) -> BatchResponse:
+    """
+    Reemplaza una ráfaga de POST /rutinas/{id}/ejercicios, PUT /ejercicios/{id} y DELETE /ejercicios/{id}:
+    una sola autenticación, una sesión y (con atomico=true) una transacción para todas las operaciones.
+    Si una operación de un lote atómico falla no se guarda ninguna: la respuesta lleva el código de esa operación,
+    su error, y las demás quedan 'revertida' (anteriores) u 'omitida' (siguientes).
+    """
+    if len(data.operaciones) > settings.BATCH_MAX_OPERACIONES:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=f"El lote supera el máximo de {settings.BATCH_MAX_OPERACIONES} operaciones.")
+    try:
+        resultados = await ejecutar(servicio.ejecutar_lote, data.operaciones, user_id=current_user.id, atomico=data.atomico)
+    except LoteRevertidoError as e:
+        fallida = _resultado_operacion(e.indice, data.operaciones[e.indice], e.error)
+        response.status_code = fallida.status
+        return BatchResponse(confirmado=False, resultados=[
+            fallida if i == e.indice else
+            OperacionResultado(indice=i, op=operacion.op, estado="revertida" if i < e.indice else "omitida", status=status.HTTP_424_FAILED_DEPENDENCY)
+            for i, operacion in enumerate(data.operaciones)])
+    return BatchResponse(confirmado=True, resultados=[_resultado_operacion(i, operacion, resultado)
+                                                      for i, (operacion, resultado) in enumerate(zip(data.operaciones, resultados))])
+
+
+def _resultado_operacion(indice: int, operacion: OperacionLote, resultado: Any) -> OperacionResultado:
+    """Traduce el resultado de una operación a lo que habría respondido su ruta individual."""
+    if isinstance(resultado, Exception):
+        if isinstance(resultado, RutinaNotFoundError):
+            codigo = status.HTTP_404_NOT_FOUND
+        elif isinstance(resultado, RutinaAlreadyExistsError):
+            codigo = status.HTTP_409_CONFLICT
+        else: # ValueError / DomainError
+            codigo = status.HTTP_400_BAD_REQUEST
+        return OperacionResultado(indice=indice, op=operacion.op, estado="error", status=codigo, detalle=str(resultado))
+    if operacion.op == "agregar_ejercicio":
+        return OperacionResultado(indice=indice, op=operacion.op, estado="ok", status=status.HTTP_201_CREATED, rutina=RutinaResponse.model_validate(resultado))
+    if operacion.op == "actualizar_ejercicio":
+        return OperacionResultado(indice=indice, op=operacion.op, estado="ok", status=status.HTTP_200_OK, ejercicio=EjercicioResponse.model_validate(resultado))
+    return OperacionResultado(indice=indice, op=operacion.op, estado="ok", status=status.HTTP_204_NO_CONTENT)
+# ----------------------------------------------------------------------------------------------------------------
@@ -0,0 +1,54 @@
+from pydantic import BaseModel, Field
+from sqlmodel import SQLModel
+from typing import Optional, List, Union, Literal, Annotated
+from Application.DTOs.ejercicio_dto import EjercicioCreate, EjercicioUpdate, EjercicioResponse
+from Application.DTOs.rutina_dto import RutinaResponse
+
+
+# DTOs de Solicitud (POST /api/batch). Cada operación equivale a una ruta individual; 'op' indica cuál.
+class OperacionAgregarEjercicio(BaseModel):
+    """Equivale a POST /api/rutinas/{rutina_id}/ejercicios"""
+    op: Literal["agregar_ejercicio"]
+    rutina_id: int
+    datos: EjercicioCreate
+
+
+class OperacionActualizarEjercicio(BaseModel):
+    """Equivale a PUT /api/ejercicios/{ejercicio_id}"""
+    op: Literal["actualizar_ejercicio"]
+    ejercicio_id: int
+    datos: EjercicioUpdate
+
+
+class OperacionEliminarEjercicio(BaseModel):
+    """Equivale a DELETE /api/ejercicios/{ejercicio_id}"""
+    op: Literal["eliminar_ejercicio"]
+    ejercicio_id: int
+
+
+OperacionLote = Annotated[Union[OperacionAgregarEjercicio, OperacionActualizarEjercicio, OperacionEliminarEjercicio], Field(discriminator="op")]
+
+
+class BatchRequest(BaseModel):
+    """DTO del lote de operaciones, que se ejecutan en orden"""
+    operaciones: List[OperacionLote] = Field(..., min_length=1)
+    # True: todas o ninguna (una transacción). False: cada operación se confirma por separado y las que fallan no cortan el lote.
+    atomico: bool = True
+
+
+# DTOs de Respuesta (Response)
+class OperacionResultado(SQLModel):
+    """DTO con el resultado de una operación del lote"""
+    indice: int
+    op: str
+    estado: str # "ok" | "error" | "revertida" (era válida, pero el lote atómico se deshizo) | "omitida" (no se llegó a ejecutar)
+    status: int # El código que habría respondido la ruta individual.
+    rutina: Optional[RutinaResponse] = None
+    ejercicio: Optional[EjercicioResponse] = None
+    detalle: Optional[str] = None
+
+
+class BatchResponse(SQLModel):
+    """DTO de la respuesta de POST /api/batch"""
+    confirmado: bool # False: el lote atómico falló y no se guardó ninguna operación.
+    resultados: List[OperacionResultado]
@@ -2,6 +2,7 @@ from pydantic import BaseModel
 from sqlmodel import SQLModel, Field # Se usa SQLModel aquí como DTO
 from typing import Optional, List
 from datetime import datetime
+from Domain.ValueObjects.dias import DiaSemana
 # Importamos los DTOs de Ejercicio aquí (abajo) para la respuesta
 
 
@@ -35,9 +36,58 @@ class RutinaResponse(SQLModel):
     descripcion: Optional[str] = None
     fecha_creacion: datetime
     ejercicios: List["EjercicioResponse"] = [] # Referencia a DTOs
+
+
+class DiaEjerciciosResponse(SQLModel):
+    """DTO con los ejercicios de un día, ordenados por 'orden'"""
+    dia: DiaSemana
+    ejercicios: List["EjercicioResponse"] = []
+
+
+class RutinaPorDiaResponse(SQLModel):
+    """DTO de la rutina con sus ejercicios agrupados por día, en orden de la semana (solo días con ejercicios)"""
+    id: int
+    nombre: str
+    descripcion: Optional[str] = None
+    fecha_creacion: datetime
+    dias: List[DiaEjerciciosResponse] = []
+
+
+class DiaResumenResponse(SQLModel):
+    """DTO con la cantidad de ejercicios de un día"""
+    dia: DiaSemana
+    ejercicios: int
+
+
+class RutinaResumenResponse(SQLModel):
+    """DTO del resumen de una rutina (GET /api/rutinas?vista=resumen): sin los ejercicios, solo cuántos hay por día"""
+    id: int
+    nombre: str
+    descripcion: Optional[str] = None
+    fecha_creacion: datetime
+    total_ejercicios: int
+    dias: List[DiaResumenResponse] = [] # En orden de la semana, solo días con ejercicios.
+
+
+# DTOs del Alta Masiva (POST /api/rutinas/bulk, una línea NDJSON por objeto)
+class RutinaBulkResultado(SQLModel):
+    """DTO con el resultado de una línea del alta masiva"""
+    linea: int
+    estado: str # "creada" | "error"
+    id: Optional[int] = None
+    nombre: Optional[str] = None
+    detalle: Optional[str] = None
+
+
+class RutinaBulkResumen(SQLModel):
+    """DTO con el resumen final del alta masiva (última línea de la respuesta)"""
+    total: int = 0
+    creadas: int = 0
+    errores: int = 0
     
 
 # Importaciones y refs para resolver dependencia circular
 from Application.DTOs.ejercicio_dto import EjercicioResponse, EjercicioCreate, EjercicioUpdate
 RutinaResponse.update_forward_refs()
+DiaEjerciciosResponse.update_forward_refs()
 RutinaConEjerciciosCreate.update_forward_refs()
\ No newline at end of file
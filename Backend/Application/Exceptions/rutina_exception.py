@@ -8,3 +8,14 @@ class RutinaAlreadyExistsError(Exception):
 class RutinaNotFoundError(Exception):
 	"""Excepción lanzada cuando una rutina con el mismo nombre ya existe."""
 	pass
+
+class CursorInvalidoError(Exception):
+	"""Excepción lanzada cuando el cursor de paginación no es válido o fue manipulado."""
+	pass
+
+class LoteRevertidoError(Exception):
+	"""Excepción lanzada cuando falla una operación de un lote atómico: se revierten todas."""
+	def __init__(self, indice: int, error: Exception):
+		super().__init__(str(error))
+		self.indice = indice # Posición de la operación que falló.
+		self.error = error
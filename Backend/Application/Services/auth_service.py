@@ -6,6 +6,7 @@ from Domain.Interfaces.user_repository_interface import UserRepositoryInterface
 from Application.DTOs.auth_dto import Token, UserLogin, TokenPayload, UserCreate
 from Infrastructure.Security.jwt_handler import JWTHandler         # Utilitario para el token
 from Infrastructure.Security.password_hasher import PasswordHasher # Utilitario para el hash
+from Infrastructure.Security.user_cache import UserCache           # Caché de usuarios autenticados
 
 
 
@@ -13,10 +14,11 @@ class AuthService(AuthServiceInterface):
     """
     Implementación del Caso de Uso para la autenticación y gestión de tokens.
     """
-    def __init__(self, user_repository: UserRepositoryInterface, password_hasher: PasswordHasher, jwt_handler: JWTHandler):
+    def __init__(self, user_repository: UserRepositoryInterface, password_hasher: PasswordHasher, jwt_handler: JWTHandler, user_cache: Optional[UserCache] = None):
         self.user_repository = user_repository
         self.password_hasher = password_hasher
         self.jwt_handler = jwt_handler
+        self.user_cache = user_cache # Caché de usuarios autenticados (opcional).
 
     
     # --------------------------- AUTENTICACION DE USUARIO (LOGIN) ------------------------------
@@ -29,13 +31,20 @@ class AuthService(AuthServiceInterface):
         
         if not user:
             return None # Usuario no encontrado.
-        # Verificar la contraseña, delegando a la Entidad y la Utilidad.
-        if not user.is_valid_password(self.password_hasher, user_login.password):
+        # Verificar la contraseña (en el pool de hashing); si los parámetros argon2 cambiaron, llega el hash nuevo.
+        valido, nuevo_hash = self.password_hasher.verify_and_update(user_login.password, user.hashed_password)
+        if not valido:
             return None # Contraseña incorrecta
-        
-        # Si es válido y activo, devolver la Entidad User.
+
         if not user.is_active:
-             return None # Usuario inactivo, no se puede autenticar.
+             return None # Usuario inactivo, no se puede autenticar (ni se rehashea).
+
+        if nuevo_hash:
+            # Rehash transparente: el usuario no nota el cambio de parámetros.
+            self.user_repository.update_password(user.id, nuevo_hash)
+            user.hashed_password = nuevo_hash
+
+        # Si es válido y activo, devolver la Entidad User.
         return user
     # -------------------------------------------------------------------------------------------
 
@@ -81,18 +90,35 @@ class AuthService(AuthServiceInterface):
     # ------------------- DEVOLVEMOS AL USUARIO SEGUN SU TOKEN (PROTECCIÓN) ---------------------
     def get_user_from_token(self, token: str) -> Optional[User]:
         """
-        Decodifica el token, verifica su validez y busca al usuario en la DB.
+        Decodifica el token, verifica su validez y busca al usuario (primero en la caché, luego en la DB).
         """
-        # Decodificar el token para obtener el user_id.
-        user_id = self.jwt_handler.decode_token(token)
+        # Decodificar el token para obtener el user_id (y su expiración).
+        payload = self.jwt_handler.decode_payload(token)
         
-        if user_id is None:
+        if payload is None:
             return None # Token inválido, expirado o mal formado.
-        # Buscar al usuario en el repositorio por ID.
-        user = self.user_repository.get_by_id(user_id)
+        # Otro token del mismo usuario ya lo trajo de la DB: evitamos el round trip.
+        user = self.user_cache.get_by_user_id(payload.sub) if self.user_cache else None
+        if user is None:
+            user = self.user_repository.get_by_id(payload.sub)
         
         if user is None or not user.is_active:
             return None # Usuario no existe o no está activo.
+
+        if self.user_cache:
+            self.user_cache.put(token, user, token_exp=payload.exp)
         # Devolver la Entidad User.
         return user
-    # -------------------------------------------------------------------------------------------
\ No newline at end of file
+    # -------------------------------------------------------------------------------------------
+
+
+    # ------------------------------ DESACTIVAR UN USUARIO --------------------------------------
+    def deactivate_user(self, user_id: int) -> bool:
+        """
+        Caso de Uso: Desactiva al usuario y lo saca de la caché, así sus tokens dejan de valer al instante.
+        """
+        desactivado = self.user_repository.set_active(user_id, False)
+        if self.user_cache:
+            self.user_cache.invalidate_user(user_id)
+        return desactivado
+    # -------------------------------------------------------------------------------------------
@@ -0,0 +1,112 @@
+from typing import Optional
+from Domain.Entities.user import User
+from Domain.Exceptions.domain_exception import DomainError
+from Domain.Interfaces.auth_service_async_interface import AsyncAuthServiceInterface
+from Domain.Interfaces.user_repository_async_interface import AsyncUserRepositoryInterface
+from Application.DTOs.auth_dto import Token, UserLogin, UserCreate
+from Infrastructure.Security.jwt_handler import JWTHandler
+from Infrastructure.Security.password_hasher import PasswordHasher
+from Infrastructure.Security.user_cache import UserCache
+
+
+
+class AsyncAuthService(AsyncAuthServiceInterface):
+    """
+    Implementación asíncrona del Caso de Uso de autenticación (modo DB_ASYNC_MODE).
+    El hashing argon2 es CPU intensivo: se espera al pool de procesos sin bloquear el event loop.
+    """
+    def __init__(self, user_repository: AsyncUserRepositoryInterface, password_hasher: PasswordHasher, jwt_handler: JWTHandler, user_cache: Optional[UserCache] = None):
+        self.user_repository = user_repository
+        self.password_hasher = password_hasher
+        self.jwt_handler = jwt_handler
+        self.user_cache = user_cache # Caché de usuarios autenticados (opcional).
+
+
+    # --------------------------- AUTENTICACION DE USUARIO (LOGIN) ------------------------------
+    async def authenticate_user(self, user_login: UserLogin) -> Optional[User]:
+        """
+        Verifica las credenciales del usuario.
+        """
+        user = await self.user_repository.get_by_username(user_login.username)
+
+        if not user:
+            return None # Usuario no encontrado.
+        # La verificación del hash no debe bloquear el event loop.
+        valido, nuevo_hash = await self.password_hasher.verify_and_update_async(user_login.password, user.hashed_password)
+        if not valido:
+            return None # Contraseña incorrecta
+
+        if not user.is_active:
+             return None # Usuario inactivo, no se puede autenticar (ni se rehashea).
+
+        if nuevo_hash:
+            # Rehash transparente: el usuario no nota el cambio de parámetros.
+            await self.user_repository.update_password(user.id, nuevo_hash)
+            user.hashed_password = nuevo_hash
+        return user
+    # -------------------------------------------------------------------------------------------
+
+
+    # ---------------------------------- REGISTRAMOS UN NUEVO USER ------------------------------
+    async def register_user(self, user_data: UserCreate) -> User:
+        """
+        Caso de Uso: Registra un nuevo usuario en el sistema, asegurando unicidad.
+        """
+        if await self.user_repository.get_by_username(user_data.username):
+            raise DomainError(f"El nombre de usuario '{user_data.username}' ya está en uso.")
+
+        hashed_password = await self.password_hasher.hash_password_async(user_data.password)
+
+        new_user_entity = User(
+            username=user_data.username,
+            hashed_password=hashed_password,
+            full_name=user_data.full_name
+        )
+        return await self.user_repository.create_user(new_user_entity)
+    # -------------------------------------------------------------------------------------------
+
+
+    # --------------------------- CREAR TOKEN DE ACCESO -----------------------------------------
+    def create_access_token(self, user_id: int) -> Token:
+        """
+        Crea un Token JWT (Token DTO) para el usuario autenticado (no hace E/S).
+        """
+        return Token(access_token=self.jwt_handler.create_access_token(user_id=user_id))
+    # -------------------------------------------------------------------------------------------
+
+
+    # ------------------- DEVOLVEMOS AL USUARIO SEGUN SU TOKEN (PROTECCIÓN) ---------------------
+    async def get_user_from_token(self, token: str) -> Optional[User]:
+        """
+        Decodifica el token, verifica su validez y busca al usuario (primero en la caché, luego en la DB).
+        """
+        # Decodificar el token para obtener el user_id (y su expiración).
+        payload = self.jwt_handler.decode_payload(token)
+        
+        if payload is None:
+            return None # Token inválido, expirado o mal formado.
+        # Otro token del mismo usuario ya lo trajo de la DB: evitamos el round trip.
+        user = self.user_cache.get_by_user_id(payload.sub) if self.user_cache else None
+        if user is None:
+            user = await self.user_repository.get_by_id(payload.sub)
+        
+        if user is None or not user.is_active:
+            return None # Usuario no existe o no está activo.
+
+        if self.user_cache:
+            self.user_cache.put(token, user, token_exp=payload.exp)
+        # Devolver la Entidad User.
+        return user
+    # -------------------------------------------------------------------------------------------
+
+
+    # ------------------------------ DESACTIVAR UN USUARIO --------------------------------------
+    async def deactivate_user(self, user_id: int) -> bool:
+        """
+        Caso de Uso: Desactiva al usuario y lo saca de la caché, así sus tokens dejan de valer al instante.
+        """
+        desactivado = await self.user_repository.set_active(user_id, False)
+        if self.user_cache:
+            self.user_cache.invalidate_user(user_id)
+        return desactivado
+    # -------------------------------------------------------------------------------------------
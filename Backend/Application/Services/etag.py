@@ -0,0 +1,29 @@
+from typing import Optional
+
+# Prefijo de los ETags de rutinas: cambiarlo si cambia la forma de RutinaResponse,
+# así los clientes no revalidan contra una representación vieja.
+ETAG_PREFIJO = "r1"
+
+# Las respuestas son por usuario: solo las guarda el navegador, y siempre revalida con If-None-Match.
+CACHE_CONTROL_RUTINAS = "private, no-cache"
+
+
+# ------------------------------------- ETAG DE RUTINAS -----------------------------------------
+def etag_rutinas(user_id: int, version: int) -> str:
+    """ETag fuerte de las lecturas de rutinas del usuario: depende solo de su versión de cambios."""
+    return f'"{ETAG_PREFIJO}-{user_id}-{version}"'
+# -----------------------------------------------------------------------------------------------
+
+
+# ------------------------------------- IF-NONE-MATCH -------------------------------------------
+def no_modificado(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    True si el header If-None-Match incluye el ETag (o es '*').
+    Para If-None-Match la comparación es débil (RFC 9110): se ignora el prefijo W/.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(candidato.strip().removeprefix("W/") == etag for candidato in if_none_match.split(","))
+# -----------------------------------------------------------------------------------------------
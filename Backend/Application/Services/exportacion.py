@@ -0,0 +1,62 @@
+import io
+import csv
+import orjson
+from enum import Enum
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Mapping
+from Application.Services.serializacion import AgrupadorRutinas
+
+# Columnas del CSV: una fila por ejercicio (las rutinas sin ejercicios salen con las columnas de ejercicio vacías).
+COLUMNAS_CSV = ["rutina_id", "rutina_nombre", "descripcion", "fecha_creacion", "ejercicio_id", "ejercicio_nombre",
+                "dia_semana", "series", "repeticiones", "peso", "notas", "orden"]
+
+FORMATOS_EXPORT = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _valor(valor: Any) -> Any:
+    """Convierte los tipos de la DB a su representación de texto (igual que RutinaResponse)."""
+    if isinstance(valor, Enum):
+        return valor.value
+    if isinstance(valor, datetime):
+        return valor.isoformat()
+    return valor
+
+
+# ------------------------------------- EXPORTAR EN CSV -----------------------------------------
+async def exportar_csv(particiones: AsyncIterator[List[Mapping[str, Any]]]) -> AsyncIterator[str]:
+    """Codifica cada partición de filas a CSV apenas llega (un chunk por partición)."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMNAS_CSV)
+    yield buffer.getvalue()
+
+    async for particion in particiones:
+        buffer.seek(0)
+        buffer.truncate()
+        for fila in particion:
+            writer.writerow([_valor(fila[columna]) for columna in COLUMNAS_CSV])
+        yield buffer.getvalue()
+# -----------------------------------------------------------------------------------------------
+
+
+# ------------------------------------- EXPORTAR EN NDJSON --------------------------------------
+async def exportar_ndjson(particiones: AsyncIterator[List[Mapping[str, Any]]]) -> AsyncIterator[bytes]:
+    """
+    Una línea JSON por rutina, con la misma forma que RutinaResponse (codificada con orjson, igual que a_json).
+    Las filas llegan ordenadas por rutina: solo se mantiene en memoria la rutina que se está armando.
+    """
+    agrupador = AgrupadorRutinas()
+
+    async for particion in particiones:
+        lineas = [_linea(rutina) for rutina in map(agrupador.agregar, particion) if rutina is not None]
+        if lineas:
+            yield b"".join(lineas)
+
+    ultima = agrupador.terminar()
+    if ultima is not None:
+        yield _linea(ultima)
+
+
+def _linea(rutina: Dict[str, Any]) -> bytes:
+    return orjson.dumps(rutina, option=orjson.OPT_APPEND_NEWLINE)
+# -----------------------------------------------------------------------------------------------
@@ -0,0 +1,42 @@
+import json
+import base64
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from Application.Exceptions.rutina_exception import CursorInvalidoError
+
+# Header con el que GET /api/rutinas devuelve el cursor de la página siguiente.
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+# ------------------------------------- CODIFICAR CURSOR ----------------------------------------
+def encode_cursor(fecha_creacion: datetime, rutina_id: int) -> str:
+    """Codifica la posición (fecha_creacion, id) como un cursor opaco (base64 url-safe)."""
+    crudo = json.dumps([fecha_creacion.isoformat(), rutina_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(crudo.encode("utf-8")).decode("ascii").rstrip("=")
+# -----------------------------------------------------------------------------------------------
+
+
+# ------------------------------------- DECODIFICAR CURSOR --------------------------------------
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Devuelve la posición (fecha_creacion, id) del cursor o lanza CursorInvalidoError."""
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        fecha, rutina_id = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+        return datetime.fromisoformat(fecha), int(rutina_id)
+    except Exception:
+        raise CursorInvalidoError("El cursor de paginación no es válido.")
+# -----------------------------------------------------------------------------------------------
+
+
+# ------------------------------------- RECORTAR PÁGINA -----------------------------------------
+def recortar_pagina(rutinas: List[Dict[str, Any]], limit: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Las páginas se piden con limit + 1 rutinas (dicts de respuesta): si llegó la de más, hay página
+    siguiente y su cursor es la última rutina devuelta. Una página justa de 'limit' no genera cursor.
+    """
+    next_cursor = None
+    if len(rutinas) > limit:
+        rutinas = rutinas[:limit]
+        next_cursor = encode_cursor(rutinas[-1]["fecha_creacion"], rutinas[-1]["id"])
+    return rutinas, next_cursor
+# -----------------------------------------------------------------------------------------------
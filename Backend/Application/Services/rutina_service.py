@@ -1,12 +1,20 @@
-from typing import List
+from typing import List, Optional, Tuple, Union, Iterator, Mapping, Any, Dict, Callable, TypeVar
 from Domain.Entities.rutina import Rutina
 from Domain.Entities.ejercicio import Ejercicio
-from Domain.Exceptions.domain_exception import ValueError, DomainError
+from Domain.Exceptions.domain_exception import ValueError, DomainError, NombreDuplicadoError
 from Domain.Interfaces.rutina_service_interface import RutinaServiceInterface
 from Domain.Interfaces.rutina_repository_interface import RutinaRepositoryInterface
 from Application.DTOs.ejercicio_dto import EjercicioCreate, EjercicioUpdate
 from Application.DTOs.rutina_dto import RutinaConEjerciciosCreate, RutinaModificarRequest
-from Application.Exceptions.rutina_exception import RutinaAlreadyExistsError, RutinaNotFoundError
+from Application.DTOs.batch_dto import OperacionLote, OperacionAgregarEjercicio, OperacionActualizarEjercicio
+from Application.Exceptions.rutina_exception import RutinaAlreadyExistsError, RutinaNotFoundError, LoteRevertidoError
+from Application.Services.paginacion import decode_cursor, encode_cursor, recortar_pagina
+from Application.Services.serializacion import agrupar_rutinas, agrupar_por_dia, agrupar_resumenes
+
+# Errores de negocio de una operación del lote (los de la DB o inesperados no se capturan).
+ERRORES_DE_OPERACION = (RutinaNotFoundError, RutinaAlreadyExistsError, ValueError, DomainError)
+
+T = TypeVar("T")
 
 
 class RutinaService(RutinaServiceInterface):
@@ -15,18 +23,38 @@ class RutinaService(RutinaServiceInterface):
     def __init__(self, rutina_repository: RutinaRepositoryInterface): 
         self.repository = rutina_repository
 
+
+    def _escribir(self, user_id: int, escritura: Callable[[], T]) -> T:
+        """
+        Ejecuta la escritura e incrementa la versión de las rutinas en UNA transacción:
+        la versión (y el ETag) cambia si y solo si la escritura se confirmó.
+        """
+        def trabajo() -> T:
+            resultado = escritura()
+            self.repository.incrementar_version(user_id)
+            return resultado
+        return self.repository.en_transaccion(trabajo)
+
     
     # ------------------------------------- ALTA RUTINA ---------------------------------------------------
     def alta_rutina(self, rutina_completa: RutinaConEjerciciosCreate, user_id: int) -> Rutina:
         """
         Caso de Uso: Dar de alta y persiste una nueva rutina y sus ejercicios.
         """
-        # Validación de Regla de Negocio: Nombre Único.
-        if self.repository.get_by_nombre(rutina_completa.nombre, user_id):
+        # Regla de Negocio: Nombre Único. La garantiza el índice único de la DB en el mismo INSERT
+        # (sin consulta previa): el repositorio lanza NombreDuplicadoError si el nombre ya existe.
+        try:
+            # El Repositorio se encarga de traducir Rutina -> RutinaDB y guardar.
+            rutina = self._crear_rutina(rutina_completa, user_id)
+            return self._escribir(user_id, lambda: self.repository.save(rutina))
+        except NombreDuplicadoError:
             raise RutinaAlreadyExistsError(
                 f"Ya existe una rutina con el nombre: {rutina_completa.nombre}"
             )
-    
+
+
+    def _crear_rutina(self, rutina_completa: RutinaConEjerciciosCreate, user_id: int) -> Rutina:
+        """Mapea el DTO de alta a la Entidad Raíz del Agregado (sin persistirla)."""
         # Mapeamos DTOs (Ejercicios) a Entidades de Dominio Puras.
         ejercicios_domain: List[Ejercicio] = []
         # Solo procesar ejercicios si la lista existe y no está vacía.
@@ -44,17 +72,45 @@ class RutinaService(RutinaServiceInterface):
                         user_id=user_id
                     )
                 )
-    
+
         # Crear la Entidad Raíz del Agregado (Rutina).
-        rutina_domain = Rutina(
+        return Rutina(
             user_id=user_id,
             nombre=rutina_completa.nombre,
             descripcion=rutina_completa.descripcion,
             ejercicios=ejercicios_domain
         )
-        # El Repositorio se encarga de traducir Rutina -> RutinaDB y guardar.
-        rutina_guardada = self.repository.save(rutina_domain)
-        return rutina_guardada
+    # -----------------------------------------------------------------------------------------------------
+
+
+    # ------------------------------------- ALTA MASIVA DE RUTINAS ----------------------------------------
+    def alta_rutinas_lote(self, rutinas: List[RutinaConEjerciciosCreate], user_id: int) -> List[Union[Rutina, RutinaAlreadyExistsError]]:
+        """
+        Caso de Uso: Alta de un lote de rutinas (importación masiva).
+        La unicidad del nombre se valida con una sola consulta para todo el lote (y también dentro del lote);
+        las rutinas válidas se insertan en una única transacción.
+        Devuelve, en el mismo orden de entrada, la Rutina creada o el error de esa rutina.
+        """
+        nombres_usados = self.repository.get_nombres_existentes([r.nombre for r in rutinas], user_id)
+
+        resultados: List[Union[Rutina, RutinaAlreadyExistsError]] = []
+        nuevas: List[Rutina] = []
+        for rutina_completa in rutinas:
+            if rutina_completa.nombre in nombres_usados:
+                resultados.append(RutinaAlreadyExistsError(f"Ya existe una rutina con el nombre: {rutina_completa.nombre}"))
+                continue
+            nombres_usados.add(rutina_completa.nombre)
+            rutina = self._crear_rutina(rutina_completa, user_id)
+            resultados.append(rutina)
+            nuevas.append(rutina)
+
+        if nuevas:
+            try:
+                self._escribir(user_id, lambda: self.repository.save_many(nuevas))
+            except NombreDuplicadoError:
+                # Otro request creó uno de los nombres después de la consulta: el lote completo se revirtió.
+                raise RutinaAlreadyExistsError("Otra rutina del lote se creó con el mismo nombre mientras se guardaba.")
+        return resultados
     # -----------------------------------------------------------------------------------------------------
 
 
@@ -65,6 +121,87 @@ class RutinaService(RutinaServiceInterface):
     # -----------------------------------------------------------------------------------------------------
 
 
+    # ------------------------------------- LISTAR RUTINA (CURSOR) ----------------------------------------
+    def listar_rutinas_cursor(self, limit: int, cursor: Optional[str], user_id: int) -> Tuple[List[Rutina], Optional[str]]:
+        """
+        Paginación keyset: continúa después de la posición codificada en el cursor.
+        Pide una rutina de más para saber si existe una página siguiente.
+        """
+        despues_de = decode_cursor(cursor) if cursor else None
+        rutinas = self.repository.get_page_by_user(user_id=user_id, limit=limit + 1, despues_de=despues_de)
+
+        next_cursor = None
+        if len(rutinas) > limit:
+            rutinas = rutinas[:limit]
+            next_cursor = encode_cursor(rutinas[-1].fecha_creacion, rutinas[-1].id)
+        return rutinas, next_cursor
+    # -----------------------------------------------------------------------------------------------------
+
+
+    # ------------------------------------- LECTURAS PARA SERIALIZAR --------------------------------------
+    # Mismos Casos de Uso que listar_rutinas / listar_rutinas_cursor / obtener_detalle_rutina, pero devuelven
+    # las rutinas como dicts con la forma de RutinaResponse, listos para codificar a JSON en una pasada.
+    def listar_rutinas_filas(self, skip: int, limit: int, user_id: int) -> List[Dict[str, Any]]:
+        return agrupar_rutinas(self.repository.get_filas_by_user(user_id=user_id, skip=skip, limit=limit))
+
+
+    def listar_rutinas_cursor_filas(self, limit: int, cursor: Optional[str], user_id: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        despues_de = decode_cursor(cursor) if cursor else None
+        rutinas = agrupar_rutinas(self.repository.get_filas_page_by_user(user_id=user_id, limit=limit + 1, despues_de=despues_de))
+        return recortar_pagina(rutinas, limit)
+
+
+    def obtener_detalle_rutina_filas(self, rutina_id: int, user_id: int) -> Dict[str, Any]:
+        rutinas = agrupar_rutinas(self.repository.get_filas_by_id(rutina_id, user_id))
+        if not rutinas:
+            raise RutinaNotFoundError(f"Rutina con ID {rutina_id} no encontrada.")
+        return rutinas[0]
+
+
+    def obtener_rutina_por_dia(self, rutina_id: int, user_id: int) -> Dict[str, Any]:
+        """Detalle con los ejercicios agrupados por día: el orden (semana y 'orden') lo resuelve la consulta."""
+        rutina = agrupar_por_dia(self.repository.get_filas_dias_by_id(rutina_id, user_id))
+        if rutina is None:
+            raise RutinaNotFoundError(f"Rutina con ID {rutina_id} no encontrada.")
+        return rutina
+    # -----------------------------------------------------------------------------------------------------
+
+
+    # ------------------------------------- RESUMEN DE RUTINAS --------------------------------------------
+    # Mismas páginas que listar_rutinas_filas / listar_rutinas_cursor_filas, pero sin los ejercicios:
+    # solo la cantidad por día, contada en la DB (forma de RutinaResumenResponse).
+    def listar_rutinas_resumen(self, skip: int, limit: int, user_id: int) -> List[Dict[str, Any]]:
+        return agrupar_resumenes(self.repository.get_resumen_by_user(user_id=user_id, skip=skip, limit=limit))
+
+
+    def listar_rutinas_cursor_resumen(self, limit: int, cursor: Optional[str], user_id: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        despues_de = decode_cursor(cursor) if cursor else None
+        resumenes = agrupar_resumenes(self.repository.get_resumen_page_by_user(user_id=user_id, limit=limit + 1, despues_de=despues_de))
+        return recortar_pagina(resumenes, limit)
+    # -----------------------------------------------------------------------------------------------------
+
+
+    # ------------------------------------- EXPORTAR RUTINAS ----------------------------------------------
+    def exportar_rutinas(self, user_id: int, tamano_lote: int = 1000) -> Iterator[List[Mapping[str, Any]]]:
+        """
+        Caso de Uso: Exportación de todas las rutinas del usuario.
+        Devuelve las filas tal como llegan de la DB (sin construir Entidades), de a 'tamano_lote'.
+        """
+        return self.repository.iter_export_by_user(user_id, tamano_lote)
+    # -----------------------------------------------------------------------------------------------------
+
+
+    # ------------------------------------- VERSION DE LAS RUTINAS ----------------------------------------
+    def version_rutinas(self, user_id: int) -> int:
+        """
+        Versión de las rutinas del usuario: la incrementan todos los Casos de Uso que escriben,
+        en la misma transacción que la escritura. Se lee antes que las rutinas: como mucho, una lectura
+        concurrente queda asociada a la versión anterior y el cliente vuelve a pedirla (nunca al revés).
+        """
+        return self.repository.get_version(user_id)
+    # -----------------------------------------------------------------------------------------------------
+
+
     # ------------------------------------- BUSCAR POR ID -------------------------------------------------
     def obtener_detalle_rutina(self, rutina_id: int, user_id: int) -> Rutina:
         """Obtiene la rutina y realiza la agrupación de ejercicios."""
@@ -86,7 +223,7 @@ class RutinaService(RutinaServiceInterface):
 
 
     # ------------------------------------ BUSQUEDA PARCIAL POR NOMBRE ------------------------------------
-    def buscar_rutinas_por_nombre(self, termino: str, user_id: int) -> List[Rutina]:
+    def buscar_rutinas_por_nombre(self, termino: str, user_id: int, limit: int = 50) -> List[Rutina]:
         """
         Caso de Uso: Búsqueda de rutinas.
         Llama al repositorio y devuelve las Entidades de Dominio.
@@ -95,7 +232,7 @@ class RutinaService(RutinaServiceInterface):
         if not clean_termino:
             return []
             
-        return self.repository.search_by_name(clean_termino, user_id)
+        return self.repository.search_by_name(clean_termino, user_id, limit=limit)
     # -----------------------------------------------------------------------------------------------------
 
     
@@ -113,11 +250,6 @@ class RutinaService(RutinaServiceInterface):
             raise DomainError("No tiene permisos para modificar esta rutina.")
 
         # LÓGICA DE NEGOCIO: Actualización de la Rutina Base.
-        # Si el nombre cambia, validar unicidad (regla de aplicación/persistencia).
-        if data.nombre is not None and data.nombre != rutina.nombre:
-            if self.repository.get_by_nombre(data.nombre, user_id):
-                raise RutinaAlreadyExistsError(f"Ya existe otra rutina con el nombre: {data.nombre}")
-
         # Llamar al método de Dominio para actualizar los datos base.
         rutina.actualizar_datos_base(data.nombre, data.descripcion)
 
@@ -129,8 +261,11 @@ class RutinaService(RutinaServiceInterface):
         # Llamar al método de Dominio para la eliminación.
         rutina.eliminar_ejercicios(data.ids_ejercicios_a_eliminar)
         # PERSISTIR EL AGREGADO.
-        rutina_guardada = self.repository.save(rutina)
-        return rutina_guardada
+        # Si el nombre cambia, la unicidad la valida el índice único en el mismo UPDATE.
+        try:
+            return self._escribir(user_id, lambda: self.repository.save(rutina))
+        except NombreDuplicadoError:
+            raise RutinaAlreadyExistsError(f"Ya existe otra rutina con el nombre: {data.nombre}")
     # -----------------------------------------------------------------------------------------------------
 
 
@@ -141,7 +276,7 @@ class RutinaService(RutinaServiceInterface):
         """
         try:
             # Si el usuario no es el dueño, delete_by_id lanzará ValueError (porque no la encontrará con ese user_id)
-            self.repository.delete_by_id(rutina_id, user_id) 
+            self._escribir(user_id, lambda: self.repository.delete_by_id(rutina_id, user_id))
         except ValueError:
             # Mapeamos la excepción de la Infraestructura a un error de Aplicación/Dominio
             raise RutinaNotFoundError(f"Rutina con ID {rutina_id} no encontrada para eliminar.")
@@ -160,7 +295,7 @@ class RutinaService(RutinaServiceInterface):
         ejercicio_data = data.model_dump()
         rutina.agregar_ejercicio(ejercicio_data)
 
-        return self.repository.save(rutina)
+        return self._escribir(user_id, lambda: self.repository.save(rutina))
     # -----------------------------------------------------------------------------------------------------
 
     
@@ -170,14 +305,15 @@ class RutinaService(RutinaServiceInterface):
         Caso de Uso: Actualiza un ejercicio individual usando el nuevo EjercicioRepository.
         """
         ejercicio_data = data.model_dump(exclude_none=True)
-        
-        # DELEGAMOS al nuevo repositorio de ejercicio
-        ejercicio_actualizado = self.repository.update_by_id(ejercicio_id, ejercicio_data, user_id)
-        
-        if not ejercicio_actualizado:
-            raise RutinaNotFoundError(f"Ejercicio con ID {ejercicio_id} no encontrado para actualizar.")
-            
-        return ejercicio_actualizado
+
+        def actualizar() -> Ejercicio:
+            # DELEGAMOS al nuevo repositorio de ejercicio
+            ejercicio_actualizado = self.repository.update_by_id(ejercicio_id, ejercicio_data, user_id)
+            if not ejercicio_actualizado:
+                # Se revierte la transacción: sin cambios, la versión no se incrementa.
+                raise RutinaNotFoundError(f"Ejercicio con ID {ejercicio_id} no encontrado para actualizar.")
+            return ejercicio_actualizado
+        return self._escribir(user_id, actualizar)
     # -----------------------------------------------------------------------------------------------------
     
 
@@ -186,9 +322,45 @@ class RutinaService(RutinaServiceInterface):
         """
         Caso de Uso: Elimina un ejercicio individual usando el nuevo EjercicioRepository.
         """
-        # DELEGAMOS al nuevo repositorio de ejercicio
-        eliminado = self.repository.delete_by_ejercicio_id(ejercicio_id, user_id)
-        
-        if not eliminado:
-            raise RutinaNotFoundError(f"Ejercicio con ID {ejercicio_id} no encontrado para eliminar.")
-    # -----------------------------------------------------------------------------------------------------
\ No newline at end of file
+        def eliminar():
+            # DELEGAMOS al nuevo repositorio de ejercicio
+            if not self.repository.delete_by_ejercicio_id(ejercicio_id, user_id):
+                raise RutinaNotFoundError(f"Ejercicio con ID {ejercicio_id} no encontrado para eliminar.")
+        self._escribir(user_id, eliminar)
+    # -----------------------------------------------------------------------------------------------------
+
+
+    # ------------------------------------ LOTE DE OPERACIONES --------------------------------------------
+    def ejecutar_lote(self, operaciones: List[OperacionLote], user_id: int, atomico: bool = True) -> List[Union[Rutina, Ejercicio, None, Exception]]:
+        """
+        Caso de Uso: varias modificaciones de ejercicios en orden, con los mismos Casos de Uso que las rutas individuales.
+        atomico=True: una sola transacción; si una operación falla se revierten todas y se lanza LoteRevertidoError.
+        atomico=False: cada operación se confirma por separado; devuelve por posición su resultado o su error.
+        """
+        resultados: List[Union[Rutina, Ejercicio, None, Exception]] = []
+        if not atomico:
+            for operacion in operaciones:
+                try:
+                    resultados.append(self._ejecutar_operacion(operacion, user_id))
+                except ERRORES_DE_OPERACION as e:
+                    resultados.append(e)
+            return resultados
+
+        def trabajo():
+            for operacion in operaciones:
+                resultados.append(self._ejecutar_operacion(operacion, user_id))
+        try:
+            self.repository.en_transaccion(trabajo)
+        except ERRORES_DE_OPERACION as e:
+            # La operación que falló es la siguiente a la última que terminó.
+            raise LoteRevertidoError(len(resultados), e)
+        return resultados
+
+
+    def _ejecutar_operacion(self, operacion: OperacionLote, user_id: int) -> Union[Rutina, Ejercicio, None]:
+        if isinstance(operacion, OperacionAgregarEjercicio):
+            return self.agregar_ejercicio_a_rutina(operacion.rutina_id, operacion.datos, user_id)
+        if isinstance(operacion, OperacionActualizarEjercicio):
+            return self.actualizar_ejercicio(operacion.ejercicio_id, operacion.datos, user_id)
+        return self.eliminar_ejercicio(operacion.ejercicio_id, user_id)
+    # -----------------------------------------------------------------------------------------------------
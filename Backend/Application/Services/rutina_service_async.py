@@ -0,0 +1,113 @@
+from typing import List, Optional, Tuple, Union, AsyncIterator, Mapping, Any, Dict
+from Domain.Entities.rutina import Rutina
+from Domain.Entities.ejercicio import Ejercicio
+from Domain.Interfaces.rutina_service_async_interface import AsyncRutinaServiceInterface
+from Domain.Interfaces.rutina_repository_async_interface import AsyncRutinaRepositoryInterface
+from Application.DTOs.ejercicio_dto import EjercicioCreate, EjercicioUpdate
+from Application.DTOs.rutina_dto import RutinaConEjerciciosCreate, RutinaModificarRequest
+from Application.DTOs.batch_dto import OperacionLote
+from Application.Exceptions.rutina_exception import RutinaNotFoundError
+from Application.Services.paginacion import decode_cursor, encode_cursor, recortar_pagina
+from Application.Services.serializacion import agrupar_rutinas, agrupar_por_dia, agrupar_resumenes
+from Application.Services.rutina_service import RutinaService
+
+
+class AsyncRutinaService(AsyncRutinaServiceInterface):
+    """
+    Implementacion asíncrona de la interfaz (modo DB_ASYNC_MODE).
+    Las lecturas esperan al repositorio directamente. Los Casos de Uso que escriben son los de RutinaService,
+    ejecutados completos en una sola unidad de trabajo sobre la conexión asíncrona: las reglas de negocio no se duplican.
+    """
+
+    def __init__(self, rutina_repository: AsyncRutinaRepositoryInterface):
+        self.repository = rutina_repository
+
+
+    async def alta_rutina(self, rutina_completa: RutinaConEjerciciosCreate, user_id: int) -> Rutina:
+        return await self.repository.ejecutar(lambda repo: RutinaService(repo).alta_rutina(rutina_completa, user_id))
+
+    async def alta_rutinas_lote(self, rutinas: List[RutinaConEjerciciosCreate], user_id: int) -> List[Union[Rutina, Exception]]:
+        return await self.repository.ejecutar(lambda repo: RutinaService(repo).alta_rutinas_lote(rutinas, user_id))
+
+    async def listar_rutinas(self, skip: int, limit: int, user_id: int) -> List[Rutina]:
+        return await self.repository.get_all_by_user(skip=skip, limit=limit, user_id=user_id)
+
+    async def listar_rutinas_cursor(self, limit: int, cursor: Optional[str], user_id: int) -> Tuple[List[Rutina], Optional[str]]:
+        despues_de = decode_cursor(cursor) if cursor else None
+        rutinas = await self.repository.get_page_by_user(user_id=user_id, limit=limit + 1, despues_de=despues_de)
+        next_cursor = None
+        if len(rutinas) > limit:
+            rutinas = rutinas[:limit]
+            next_cursor = encode_cursor(rutinas[-1].fecha_creacion, rutinas[-1].id)
+        return rutinas, next_cursor
+
+    async def listar_rutinas_filas(self, skip: int, limit: int, user_id: int) -> List[Dict[str, Any]]:
+        return agrupar_rutinas(await self.repository.get_filas_by_user(user_id=user_id, skip=skip, limit=limit))
+
+    async def listar_rutinas_cursor_filas(self, limit: int, cursor: Optional[str], user_id: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        despues_de = decode_cursor(cursor) if cursor else None
+        rutinas = agrupar_rutinas(await self.repository.get_filas_page_by_user(user_id=user_id, limit=limit + 1, despues_de=despues_de))
+        return recortar_pagina(rutinas, limit)
+
+    async def listar_rutinas_resumen(self, skip: int, limit: int, user_id: int) -> List[Dict[str, Any]]:
+        return agrupar_resumenes(await self.repository.get_resumen_by_user(user_id=user_id, skip=skip, limit=limit))
+
+    async def listar_rutinas_cursor_resumen(self, limit: int, cursor: Optional[str], user_id: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        despues_de = decode_cursor(cursor) if cursor else None
+        resumenes = agrupar_resumenes(await self.repository.get_resumen_page_by_user(user_id=user_id, limit=limit + 1, despues_de=despues_de))
+        return recortar_pagina(resumenes, limit)
+
+    async def obtener_detalle_rutina_filas(self, rutina_id: int, user_id: int) -> Dict[str, Any]:
+        rutinas = agrupar_rutinas(await self.repository.get_filas_by_id(rutina_id, user_id))
+        if not rutinas:
+            raise RutinaNotFoundError(f"Rutina con ID {rutina_id} no encontrada.")
+        return rutinas[0]
+
+    async def obtener_rutina_por_dia(self, rutina_id: int, user_id: int) -> Dict[str, Any]:
+        rutina = agrupar_por_dia(await self.repository.get_filas_dias_by_id(rutina_id, user_id))
+        if rutina is None:
+            raise RutinaNotFoundError(f"Rutina con ID {rutina_id} no encontrada.")
+        return rutina
+
+    def exportar_rutinas(self, user_id: int, tamano_lote: int = 1000) -> AsyncIterator[List[Mapping[str, Any]]]:
+        # Streaming: no pasa por run_sync, las particiones se leen directamente de la conexión asíncrona.
+        return self.repository.iter_export_by_user(user_id, tamano_lote)
+
+    async def version_rutinas(self, user_id: int) -> int:
+        return await self.repository.get_version(user_id)
+
+    async def obtener_detalle_rutina(self, rutina_id: int, user_id: int) -> Rutina:
+        rutina = await self.repository.get_by_id(rutina_id, user_id)
+        if not rutina:
+            raise RutinaNotFoundError(f"Rutina con ID {rutina_id} no encontrada.")
+        return rutina
+
+    async def buscar_por_nombre(self, nombre: str, user_id: int) -> Rutina:
+        rutina = await self.repository.get_by_nombre(nombre, user_id)
+        if not rutina:
+            raise RutinaNotFoundError(f"Rutina con Nombre {nombre} no encontrada.")
+        return rutina
+
+    async def buscar_rutinas_por_nombre(self, termino: str, user_id: int, limit: int = 50) -> List[Rutina]:
+        clean_termino = termino.strip()
+        if not clean_termino:
+            return []
+        return await self.repository.search_by_name(clean_termino, user_id, limit=limit)
+
+    async def modificar_rutina(self, rutina_id: int, data: RutinaModificarRequest, user_id: int) -> Rutina:
+        return await self.repository.ejecutar(lambda repo: RutinaService(repo).modificar_rutina(rutina_id, data, user_id))
+
+    async def dar_baja_rutina(self, rutina_id: int, user_id: int):
+        return await self.repository.ejecutar(lambda repo: RutinaService(repo).dar_baja_rutina(rutina_id, user_id))
+
+    async def agregar_ejercicio_a_rutina(self, rutina_id: int, data: EjercicioCreate, user_id: int) -> Rutina:
+        return await self.repository.ejecutar(lambda repo: RutinaService(repo).agregar_ejercicio_a_rutina(rutina_id, data, user_id))
+
+    async def actualizar_ejercicio(self, ejercicio_id: int, data: EjercicioUpdate, user_id: int) -> Ejercicio:
+        return await self.repository.ejecutar(lambda repo: RutinaService(repo).actualizar_ejercicio(ejercicio_id, data, user_id))
+
+    async def eliminar_ejercicio(self, ejercicio_id: int, user_id: int):
+        return await self.repository.ejecutar(lambda repo: RutinaService(repo).eliminar_ejercicio(ejercicio_id, user_id))
+
+    async def ejecutar_lote(self, operaciones: List[OperacionLote], user_id: int, atomico: bool = True) -> List[Union[Rutina, Ejercicio, None, Exception]]:
+        return await self.repository.ejecutar(lambda repo: RutinaService(repo).ejecutar_lote(operaciones, user_id, atomico))
@@ -0,0 +1,109 @@
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+import orjson
+
+# --------------------------------------------------------------------------------------------
+# Camino rápido de las lecturas: filas (rutina LEFT JOIN ejercicio) -> dicts -> bytes JSON.
+# Sin ORM, sin Entidades y sin DTOs: los dicts ya tienen la forma (y el orden de campos) de
+# RutinaResponse y orjson los codifica en una pasada. La salida es la misma que la de
+# response_model=RutinaResponse + JSONResponse.
+# --------------------------------------------------------------------------------------------
+
+
+class AgrupadorRutinas:
+    """
+    Arma las rutinas a partir de filas ordenadas por rutina. Solo mantiene la rutina que se está armando,
+    así sirve tanto para una página como para la exportación en streaming.
+    Los valores quedan como llegan de la DB (datetime, DiaSemana): cada codificador los convierte.
+    """
+
+    def __init__(self):
+        self.actual: Optional[Dict[str, Any]] = None
+
+    def agregar(self, fila: Mapping[str, Any]) -> Optional[Dict[str, Any]]:
+        """Suma la fila; devuelve la rutina anterior si esta fila empieza una nueva."""
+        terminada = None
+        if self.actual is None or self.actual["id"] != fila["rutina_id"]:
+            terminada = self.actual
+            self.actual = {
+                "id": fila["rutina_id"],
+                "nombre": fila["rutina_nombre"],
+                "descripcion": fila["descripcion"],
+                "fecha_creacion": fila["fecha_creacion"],
+                "ejercicios": [],
+            }
+        if fila["ejercicio_id"] is not None:
+            self.actual["ejercicios"].append({
+                "id": fila["ejercicio_id"],
+                "rutina_id": fila["rutina_id"],
+                "nombre": fila["ejercicio_nombre"],
+                "dia_semana": fila["dia_semana"],
+                "series": fila["series"],
+                "repeticiones": fila["repeticiones"],
+                "peso": fila["peso"],
+                "notas": fila["notas"],
+                "orden": fila["orden"],
+            })
+        return terminada
+
+    def terminar(self) -> Optional[Dict[str, Any]]:
+        """Devuelve la última rutina (o None si no hubo filas)."""
+        terminada, self.actual = self.actual, None
+        return terminada
+
+
+def agrupar_rutinas(filas: Iterable[Mapping[str, Any]]) -> List[Dict[str, Any]]:
+    """Todas las rutinas de un conjunto de filas (una página)."""
+    agrupador = AgrupadorRutinas()
+    rutinas = [r for r in map(agrupador.agregar, filas) if r is not None]
+    ultima = agrupador.terminar()
+    if ultima is not None:
+        rutinas.append(ultima)
+    return rutinas
+
+
+def agrupar_por_dia(filas: Iterable[Mapping[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Una rutina con sus ejercicios agrupados por día (forma de RutinaPorDiaResponse), o None si no hubo filas.
+    Las filas ya llegan ordenadas por día y 'orden': los grupos se cortan al cambiar el día, sin reordenar.
+    """
+    rutinas = agrupar_rutinas(filas)
+    if not rutinas:
+        return None
+    rutina = rutinas[0]
+    dias: List[Dict[str, Any]] = []
+    for ejercicio in rutina.pop("ejercicios"):
+        if not dias or dias[-1]["dia"] != ejercicio["dia_semana"]:
+            dias.append({"dia": ejercicio["dia_semana"], "ejercicios": []})
+        dias[-1]["ejercicios"].append(ejercicio)
+    rutina["dias"] = dias
+    return rutina
+
+
+def agrupar_resumenes(filas: Iterable[Mapping[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Resúmenes de rutinas (forma de RutinaResumenResponse) a partir de filas (rutina, día, cantidad)
+    ordenadas por rutina y día. La fila de una rutina sin ejercicios (día NULL) deja 'dias' vacío.
+    """
+    resumenes: List[Dict[str, Any]] = []
+    for fila in filas:
+        if not resumenes or resumenes[-1]["id"] != fila["rutina_id"]:
+            resumenes.append({
+                "id": fila["rutina_id"],
+                "nombre": fila["rutina_nombre"],
+                "descripcion": fila["descripcion"],
+                "fecha_creacion": fila["fecha_creacion"],
+                "total_ejercicios": 0,
+                "dias": [],
+            })
+        if fila["dia_semana"] is not None:
+            resumenes[-1]["total_ejercicios"] += fila["cantidad"]
+            resumenes[-1]["dias"].append({"dia": fila["dia_semana"], "ejercicios": fila["cantidad"]})
+    return resumenes
+
+
+def a_json(valor: Any) -> bytes:
+    """
+    Codifica con orjson. Las fechas salen en ISO 8601 y los Enum por su valor, igual que Pydantic.
+    Única diferencia posible con json.dumps: floats con exponente (1e16 en lugar de 1e+16), fuera del rango de 'peso'.
+    """
+    return orjson.dumps(valor)
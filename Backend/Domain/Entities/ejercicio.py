@@ -1,8 +1,11 @@
 from typing import Optional
-from Domain.ValueObjects.dias import DiaSemana
+from Domain.ValueObjects.dias import DiaSemana, dia_semana as _dia_semana
 
 class Ejercicio: # Creamos la entidad Ejercicio pura.
     """Entidad de Dominio Ejercicio"""
+    # Sin __dict__ por instancia: una página grande arma miles de ejercicios.
+    __slots__ = ("id", "rutina_id", "user_id", "nombre", "dia_semana", "series", "repeticiones", "peso", "notas", "orden")
+
     def __init__(self, nombre: str, dia_semana: DiaSemana, series: int, repeticiones: int, orden: int,
         peso: Optional[float] = None, notas: Optional[str] = None, id: Optional[int] = None, rutina_id: Optional[int] = None, user_id: Optional[int] = None):
 
@@ -14,7 +17,7 @@ class Ejercicio: # Creamos la entidad Ejercicio pura.
         self.rutina_id = rutina_id
         self.user_id = user_id
         self.nombre = nombre
-        self.dia_semana = dia_semana
+        self.dia_semana = _dia_semana(dia_semana) # Siempre el miembro compartido del Enum, nunca una copia del texto.
         self.series = series
         self.repeticiones = repeticiones
         self.peso = peso
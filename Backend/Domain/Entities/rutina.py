@@ -5,6 +5,8 @@ from Domain.Exceptions.domain_exception import ValueError
 
 class Rutina: # Elegiremos rutina como el Agregado de nuestro dominio.
     """Entidad Raíz del Agregado Rutina"""
+    __slots__ = ("id", "user_id", "nombre", "descripcion", "fecha_creacion", "ejercicios")
+
     def __init__( self, id: Optional[int] = None, user_id: Optional[int] = None, nombre: Optional[str] = None, descripcion: Optional[str] = None,
         fecha_creacion: Optional[datetime] = None, ejercicios: List[Ejercicio] = None ):
         self.id = id
@@ -6,6 +6,8 @@ class User:
     Entidad de Dominio Pura User.
     Representa un usuario del sistema.
     """                             # El hash (bcrypt) de la contraseña.
+    __slots__ = ("id", "username", "hashed_password", "full_name", "is_active", "date_created")
+
     def __init__(self, username: str, hashed_password: str, id: Optional[int] = None, full_name: Optional[str] = None, is_active: bool = True, 
                     date_created: Optional[datetime] = None):
         # Validaciones de Dominio.
@@ -9,4 +9,6 @@ class DomainError(Exception):
 	"""Excepción lanzada cuando un usuario con el mismo nombre ya existe."""
 	pass
 
-
+class NombreDuplicadoError(Exception):
+	"""Excepción lanzada por el repositorio cuando la DB rechaza un nombre de rutina repetido (índice único)."""
+	pass
@@ -0,0 +1,39 @@
+from abc import ABC, abstractmethod
+from typing import Optional, Union
+from Domain.Entities.user import User
+from Domain.Interfaces.auth_service_interface import AuthServiceInterface
+from Application.DTOs.auth_dto import Token, UserLogin, UserCreate
+
+class AsyncAuthServiceInterface(ABC):
+    """
+    Interfaz asíncrona del Servicio de autenticación (modo DB_ASYNC_MODE).
+    Mismos Casos de Uso que AuthServiceInterface; los que hacen E/S se esperan (await).
+    """
+    @abstractmethod
+    async def authenticate_user(self, user_login: UserLogin) -> Optional[User]:
+        """Verifica las credenciales y devuelve la Entidad User si son válidas."""
+        pass
+
+    @abstractmethod
+    async def register_user(self, user_data: UserCreate) -> User:
+        """Caso de Uso: Registra un nuevo usuario en el sistema, asegurando unicidad."""
+        pass
+
+    @abstractmethod
+    def create_access_token(self, user_id: int) -> Token:
+        """Crea un Token JWT para un ID de usuario dado (no hace E/S)."""
+        pass
+
+    @abstractmethod
+    async def get_user_from_token(self, token: str) -> Optional[User]:
+        """Decodifica el token y devuelve la Entidad User correspondiente."""
+        pass
+
+    @abstractmethod
+    async def deactivate_user(self, user_id: int) -> bool:
+        """Desactiva al usuario e invalida sus credenciales cacheadas."""
+        pass
+
+
+# Lo que reciben los Controladores: la implementación síncrona o la asíncrona, según DB_ASYNC_MODE.
+ServicioAuth = Union[AuthServiceInterface, AsyncAuthServiceInterface]
@@ -25,4 +25,9 @@ class AuthServiceInterface(ABC):
     @abstractmethod
     def get_user_from_token(self, token: str) -> Optional[User]:
         """Decodifica el token y devuelve la Entidad User correspondiente."""
-        pass
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    def deactivate_user(self, user_id: int) -> bool:
+        """Desactiva al usuario e invalida sus credenciales cacheadas."""
+        pass
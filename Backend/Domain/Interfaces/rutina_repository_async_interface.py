@@ -0,0 +1,84 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Optional, List, Any, Tuple, AsyncIterator, Mapping, Callable, TypeVar
+from Domain.Entities.rutina import Rutina
+from Domain.Interfaces.rutina_repository_interface import RutinaRepositoryInterface
+
+T = TypeVar("T")
+
+class AsyncRutinaRepositoryInterface(ABC):
+    """
+    Interfaz (Puerto) asíncrona del Agregado Rutina (modo DB_ASYNC_MODE).
+    Las lecturas se esperan directamente. Las escrituras no tienen métodos propios: un Caso de Uso
+    que escribe se ejecuta completo con ejecutar(), sobre el repositorio síncrono, en una unidad de trabajo.
+    """
+
+    @abstractmethod
+    async def ejecutar(self, operacion: Callable[[RutinaRepositoryInterface], T]) -> T:
+        """Ejecuta 'operacion' con el repositorio síncrono sobre la misma conexión (Casos de Uso que escriben)."""
+        pass
+
+    @abstractmethod
+    async def get_all_by_user(self, user_id: int, skip: int = 0, limit: int = 100) -> List[Rutina]:
+        """Lista las rutinas con paginación, devolviendo solo las del user_id."""
+        pass
+
+    @abstractmethod
+    async def get_page_by_user(self, user_id: int, limit: int, despues_de: Optional[Tuple[datetime, int]] = None) -> List[Rutina]:
+        """Lista las rutinas del user_id posteriores a (fecha_creacion, id), ordenadas por esa clave (keyset)."""
+        pass
+
+    @abstractmethod
+    def iter_export_by_user(self, user_id: int, tamano_lote: int = 1000) -> AsyncIterator[List[Mapping[str, Any]]]:
+        """Recorre en particiones las filas (rutina + ejercicio) de todas las rutinas del user_id, sin cargarlas completas."""
+        pass
+
+    @abstractmethod
+    async def get_filas_by_user(self, user_id: int, skip: int = 0, limit: int = 100) -> List[Mapping[str, Any]]:
+        """Igual que get_all_by_user, pero como filas planas (rutina LEFT JOIN ejercicio) en una consulta."""
+        pass
+
+    @abstractmethod
+    async def get_filas_page_by_user(self, user_id: int, limit: int, despues_de: Optional[Tuple[datetime, int]] = None) -> List[Mapping[str, Any]]:
+        """Igual que get_page_by_user, pero como filas planas en una consulta."""
+        pass
+
+    @abstractmethod
+    async def get_filas_by_id(self, rutina_id: int, user_id: int) -> List[Mapping[str, Any]]:
+        """Filas planas de una rutina del user_id (lista vacía si no existe)."""
+        pass
+
+    @abstractmethod
+    async def get_filas_dias_by_id(self, rutina_id: int, user_id: int) -> List[Mapping[str, Any]]:
+        """Filas planas de una rutina ordenadas por día de la semana y 'orden' (lista vacía si no existe)."""
+        pass
+
+    @abstractmethod
+    async def get_resumen_by_user(self, user_id: int, skip: int = 0, limit: int = 100) -> List[Mapping[str, Any]]:
+        """Página por offset con una fila por (rutina, día) y la cantidad de ejercicios, agregada en la DB."""
+        pass
+
+    @abstractmethod
+    async def get_resumen_page_by_user(self, user_id: int, limit: int, despues_de: Optional[Tuple[datetime, int]] = None) -> List[Mapping[str, Any]]:
+        """Igual que get_resumen_by_user, pero paginando por keyset."""
+        pass
+
+    @abstractmethod
+    async def get_by_id(self, rutina_id: int, user_id: int) -> Optional[Rutina]:
+        """Busca una Rutina por ID, asegurando que pertenezca al user_id."""
+        pass
+
+    @abstractmethod
+    async def get_by_nombre(self, nombre: str, user_id: int) -> Optional[Rutina]:
+        """Busca una Rutina por nombre, asegurando que pertenezca al user_id."""
+        pass
+
+    @abstractmethod
+    async def search_by_name(self, termino: str, user_id: int, limit: int = 50) -> List[Rutina]:
+        """Busca rutinas por coincidencia parcial en el nombre, filtrando por user_id."""
+        pass
+
+    @abstractmethod
+    async def get_version(self, user_id: int) -> int:
+        """Devuelve la versión de las rutinas del user_id (cambia con cada escritura)."""
+        pass
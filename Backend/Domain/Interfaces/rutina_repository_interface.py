@@ -1,14 +1,27 @@
 from abc import ABC, abstractmethod
-from typing import Optional, List, Dict, Any
+from datetime import datetime
+from typing import Optional, List, Dict, Any, Tuple, Set, Iterator, Mapping, Callable, TypeVar
 from Domain.Entities.rutina import Rutina # Importa la Entidad Pura
 from Domain.Entities.ejercicio import Ejercicio
 
+T = TypeVar("T")
+
 class RutinaRepositoryInterface(ABC):
     """Interfaz (Puerto) que define las operaciones de persistencia del Agregado Rutina."""
 
     @abstractmethod
     def save(self, rutina: Rutina) -> Rutina:
-        """Guarda o actualiza la Rutina completa (incluyendo sus Ejercicios)."""
+        """Guarda o actualiza la Rutina completa (incluyendo sus Ejercicios). Lanza NombreDuplicadoError si el nombre ya existe."""
+        pass
+
+    @abstractmethod
+    def save_many(self, rutinas: List[Rutina]) -> List[Rutina]:
+        """Da de alta varias Rutinas nuevas (con sus Ejercicios) en una sola transacción. Lanza NombreDuplicadoError si algún nombre ya existe."""
+        pass
+
+    @abstractmethod
+    def get_nombres_existentes(self, nombres: List[str], user_id: int) -> Set[str]:
+        """Devuelve el subconjunto de nombres que ya usan rutinas del user_id."""
         pass
 
     @abstractmethod
@@ -16,6 +29,46 @@ class RutinaRepositoryInterface(ABC):
         """Lista las rutinas con paginación, devolviendo solo las del user_id."""
         pass
 
+    @abstractmethod
+    def get_page_by_user(self, user_id: int, limit: int, despues_de: Optional[Tuple[datetime, int]] = None) -> List[Rutina]:
+        """Lista las rutinas del user_id posteriores a (fecha_creacion, id), ordenadas por esa clave (keyset)."""
+        pass
+
+    @abstractmethod
+    def iter_export_by_user(self, user_id: int, tamano_lote: int = 1000) -> Iterator[List[Mapping[str, Any]]]:
+        """Recorre en particiones las filas (rutina + ejercicio) de todas las rutinas del user_id, sin cargarlas completas."""
+        pass
+
+    @abstractmethod
+    def get_filas_by_user(self, user_id: int, skip: int = 0, limit: int = 100) -> List[Mapping[str, Any]]:
+        """Misma página que get_all_by_user, como filas planas (rutina + ejercicio) ordenadas por rutina."""
+        pass
+
+    @abstractmethod
+    def get_filas_page_by_user(self, user_id: int, limit: int, despues_de: Optional[Tuple[datetime, int]] = None) -> List[Mapping[str, Any]]:
+        """Misma página que get_page_by_user, como filas planas (rutina + ejercicio) ordenadas por rutina."""
+        pass
+
+    @abstractmethod
+    def get_filas_by_id(self, rutina_id: int, user_id: int) -> List[Mapping[str, Any]]:
+        """Filas planas de una rutina (vacío si no existe o no es del user_id)."""
+        pass
+
+    @abstractmethod
+    def get_filas_dias_by_id(self, rutina_id: int, user_id: int) -> List[Mapping[str, Any]]:
+        """Filas planas de una rutina ordenadas por día de la semana (Lunes..Domingo) y por 'orden'."""
+        pass
+
+    @abstractmethod
+    def get_resumen_by_user(self, user_id: int, skip: int = 0, limit: int = 100) -> List[Mapping[str, Any]]:
+        """Misma página que get_filas_by_user, pero una fila por (rutina, día) con la cantidad de ejercicios."""
+        pass
+
+    @abstractmethod
+    def get_resumen_page_by_user(self, user_id: int, limit: int, despues_de: Optional[Tuple[datetime, int]] = None) -> List[Mapping[str, Any]]:
+        """Misma página que get_filas_page_by_user, pero una fila por (rutina, día) con la cantidad de ejercicios."""
+        pass
+
     @abstractmethod
     def get_by_id(self, rutina_id: int, user_id: int) -> Optional[Rutina]:
         """Obtiene el detalle completo de una rutina por ID, verificando propiedad."""
@@ -27,8 +80,8 @@ class RutinaRepositoryInterface(ABC):
         pass
 
     @abstractmethod
-    def search_by_name(self, termino: str, user_id: int) -> List[Rutina]:
-        """Busca rutinas por coincidencia parcial, filtrando por user_id."""
+    def search_by_name(self, termino: str, user_id: int, limit: int = 50) -> List[Rutina]:
+        """Busca rutinas por coincidencia parcial, filtrando por user_id (las 'limit' más relevantes)."""
         pass
 
     @abstractmethod
@@ -44,4 +97,22 @@ class RutinaRepositoryInterface(ABC):
     @abstractmethod
     def delete_by_ejercicio_id(self, ejercicio_id: int, user_id: int) -> bool:
         """Elimina un Ejercicio por su ID. Devuelve True si fue eliminado."""
-        pass
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    def get_version(self, user_id: int) -> int:
+        """Devuelve la versión de las rutinas del user_id (cambia con cada escritura)."""
+        pass
+
+    @abstractmethod
+    def incrementar_version(self, user_id: int):
+        """Marca que las rutinas del user_id cambiaron. No confirma: va en la misma transacción que la escritura."""
+        pass
+
+    @abstractmethod
+    def en_transaccion(self, trabajo: Callable[[], T]) -> T:
+        """
+        Ejecuta varias escrituras del repositorio en una sola transacción: se confirman todas o ninguna.
+        Llamado dentro de otra en_transaccion, se suma a la transacción abierta.
+        """
+        pass
@@ -1,9 +1,10 @@
 from abc import ABC, abstractmethod
-from typing import Optional, List, Any, Dict
+from typing import Optional, List, Any, Dict, Tuple, Union, Iterator, Mapping
 from Domain.Entities.rutina import Rutina
 from Domain.Entities.ejercicio import Ejercicio
 from Application.DTOs.ejercicio_dto import EjercicioCreate, EjercicioUpdate
 from Application.DTOs.rutina_dto import RutinaConEjerciciosCreate, RutinaModificarRequest
+from Application.DTOs.batch_dto import OperacionLote
 
 class RutinaServiceInterface(ABC):
     """
@@ -14,12 +15,62 @@ class RutinaServiceInterface(ABC):
     def alta_rutina(self, data: RutinaConEjerciciosCreate, user_id: int) -> Rutina:
         """Contrato para dar de alta una rutina completa."""
         pass
+
+    @abstractmethod
+    def alta_rutinas_lote(self, rutinas: List[RutinaConEjerciciosCreate], user_id: int) -> List[Union[Rutina, Exception]]:
+        """Da de alta un lote de rutinas; devuelve por posición la Rutina creada o el error de esa rutina."""
+        pass
     
     @abstractmethod
     def listar_rutinas(self, skip: int, limit: int, user_id: int) -> List[Rutina]:
         """Lista las rutinas con paginación, devolviendo Entidades de Dominio."""
         pass
 
+    @abstractmethod
+    def listar_rutinas_cursor(self, limit: int, cursor: Optional[str], user_id: int) -> Tuple[List[Rutina], Optional[str]]:
+        """Lista las rutinas a partir de un cursor opaco, devolviendo también el cursor de la página siguiente."""
+        pass
+
+    @abstractmethod
+    def listar_rutinas_filas(self, skip: int, limit: int, user_id: int) -> List[Dict[str, Any]]:
+        """Igual que listar_rutinas, pero cada rutina es un dict con la forma de la respuesta (sin Entidades)."""
+        pass
+
+    @abstractmethod
+    def listar_rutinas_cursor_filas(self, limit: int, cursor: Optional[str], user_id: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Igual que listar_rutinas_cursor, pero cada rutina es un dict con la forma de la respuesta."""
+        pass
+
+    @abstractmethod
+    def listar_rutinas_resumen(self, skip: int, limit: int, user_id: int) -> List[Dict[str, Any]]:
+        """Página de resúmenes de rutinas (sin ejercicios, con la cantidad por día) como dicts de RutinaResumenResponse."""
+        pass
+
+    @abstractmethod
+    def listar_rutinas_cursor_resumen(self, limit: int, cursor: Optional[str], user_id: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Igual que listar_rutinas_resumen, con paginación keyset; devuelve también el cursor siguiente."""
+        pass
+
+    @abstractmethod
+    def obtener_detalle_rutina_filas(self, rutina_id: int, user_id: int) -> Dict[str, Any]:
+        """Igual que obtener_detalle_rutina, pero la rutina es un dict con la forma de la respuesta."""
+        pass
+
+    @abstractmethod
+    def obtener_rutina_por_dia(self, rutina_id: int, user_id: int) -> Dict[str, Any]:
+        """Detalle de una rutina con los ejercicios agrupados por día de la semana y ordenados por 'orden'."""
+        pass
+
+    @abstractmethod
+    def exportar_rutinas(self, user_id: int, tamano_lote: int = 1000) -> Iterator[List[Mapping[str, Any]]]:
+        """Devuelve en particiones las filas de exportación de todas las rutinas del usuario."""
+        pass
+
+    @abstractmethod
+    def version_rutinas(self, user_id: int) -> int:
+        """Versión de las rutinas del usuario; cambia con cada escritura (se usa para el ETag)."""
+        pass
+
     @abstractmethod
     def obtener_detalle_rutina(self, rutina_id: int, user_id: int) -> Optional[Rutina]:
         """Obtiene el detalle completo de una rutina por ID."""
@@ -31,7 +82,7 @@ class RutinaServiceInterface(ABC):
         pass
     
     @abstractmethod
-    def buscar_rutinas_por_nombre(self, termino: str, user_id: int) -> List[Rutina]:
+    def buscar_rutinas_por_nombre(self, termino: str, user_id: int, limit: int = 50) -> List[Rutina]:
         """Busca rutinas por coincidencia parcial en el nombre, sin distinguir mayúsculas/minúsculas."""
         pass
 
@@ -59,4 +110,8 @@ class RutinaServiceInterface(ABC):
     def eliminar_ejercicio(self, ejercicio_id: int, user_id: int):
         """Elimina un ejercicio existente por ID de Ejercicio."""
         pass
-    
+
+    @abstractmethod
+    def ejecutar_lote(self, operaciones: List[OperacionLote], user_id: int, atomico: bool = True) -> List[Union[Rutina, Ejercicio, None, Exception]]:
+        """Ejecuta en orden un lote de operaciones sobre ejercicios; con atomico=True, todas o ninguna (LoteRevertidoError)."""
+        pass
@@ -0,0 +1,33 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+from Domain.Entities.user import User
+
+class AsyncUserRepositoryInterface(ABC):
+    """
+    Interfaz asíncrona del Repositorio que maneja la persistencia de la Entidad User (modo DB_ASYNC_MODE).
+    Mismas operaciones que UserRepositoryInterface, pero se esperan (await).
+    """
+    @abstractmethod
+    async def create_user(self, user_entity: User) -> User:
+        """Persiste una Entidad User en la base de datos."""
+        pass
+
+    @abstractmethod
+    async def get_by_username(self, username: str) -> Optional[User]:
+        """Busca una Entidad User por nombre de usuario."""
+        pass
+
+    @abstractmethod
+    async def get_by_id(self, user_id: int) -> Optional[User]:
+        """Busca una Entidad User por id de usuario."""
+        pass
+
+    @abstractmethod
+    async def set_active(self, user_id: int, is_active: bool) -> bool:
+        """Activa o desactiva un usuario. Devuelve False si no existe."""
+        pass
+
+    @abstractmethod
+    async def update_password(self, user_id: int, hashed_password: str) -> bool:
+        """Reemplaza el hash de la contraseña (rehash con parámetros nuevos). Devuelve False si no existe."""
+        pass
@@ -20,3 +20,13 @@ class UserRepositoryInterface(ABC):
     def get_by_id(self, user_id: int) -> Optional[User]:
         """Busca una Entidad User por id de usuario."""
         pass
+
+    @abstractmethod
+    def set_active(self, user_id: int, is_active: bool) -> bool:
+        """Activa o desactiva un usuario. Devuelve False si no existe."""
+        pass
+
+    @abstractmethod
+    def update_password(self, user_id: int, hashed_password: str) -> bool:
+        """Reemplaza el hash de la contraseña (rehash con parámetros nuevos). Devuelve False si no existe."""
+        pass
@@ -1,4 +1,5 @@
 from enum import Enum
+from typing import Dict, Union
 
 class DiaSemana(str, Enum):
     """Días válidos de la semana"""
@@ -8,4 +9,19 @@ class DiaSemana(str, Enum):
     JUEVES = "Jueves"
     VIERNES = "Viernes"
     SABADO = "Sabado"
-    DOMINGO = "Domingo"
\ No newline at end of file
+    DOMINGO = "Domingo"
+
+
+# Cada valor apunta a su miembro: un dict acepta tanto "Lunes" como DiaSemana.LUNES (mismo hash e igualdad).
+_DIAS: Dict[str, DiaSemana] = {dia.value: dia for dia in DiaSemana}
+
+
+def dia_semana(valor: Union[str, DiaSemana]) -> DiaSemana:
+    """
+    Devuelve el miembro compartido de DiaSemana para un valor (texto de la DB, JSON de la caché o el propio miembro).
+    Es una búsqueda en un dict, más barata que DiaSemana(valor); si el valor no es un día válido lanza ValueError igual que el Enum.
+    """
+    try:
+        return _DIAS[valor]
+    except KeyError:
+        return DiaSemana(valor)
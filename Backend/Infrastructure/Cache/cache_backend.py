@@ -0,0 +1,38 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Optional
+
+
+class CacheBackend(ABC):
+    """
+    Almacén de la caché de lecturas. Las entradas se agrupan por espacio (p. ej. las rutinas de un usuario)
+    y cada espacio tiene una generación: invalidar es pasar a la generación siguiente, así una lectura
+    que empezó antes de una escritura nunca puede volver a dejar datos viejos visibles.
+    """
+
+    # False si cada operación bloquea (red): en modo async no se usa dentro del event loop.
+    es_local: bool = True
+
+    @abstractmethod
+    def generacion(self, espacio: str) -> int:
+        """Generación actual del espacio (0 si nunca se invalidó)."""
+        pass
+
+    @abstractmethod
+    def get(self, espacio: str, generacion: int, clave: str) -> Optional[str]:
+        """Valor guardado para la clave en esa generación, o None."""
+        pass
+
+    @abstractmethod
+    def set(self, espacio: str, generacion: int, clave: str, valor: str):
+        """Guarda el valor; se descarta si el espacio ya pasó a otra generación."""
+        pass
+
+    @abstractmethod
+    def invalidar(self, espacio: str):
+        """Invalida todas las entradas del espacio."""
+        pass
+
+    @abstractmethod
+    def stats(self) -> Dict[str, float]:
+        """Aciertos, fallos, tasa de acierto y tamaño (si se conoce)."""
+        pass
@@ -0,0 +1,106 @@
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
+from Infrastructure.Cache.cache_backend import CacheBackend
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    Backend en memoria (LRU + TTL), único por proceso.
+    Con varios workers cada proceso tiene su copia y solo ve sus propias invalidaciones: por eso
+    CachedRutinaRepository agrega a la clave la versión de las rutinas leída de la DB (es_local).
+    Las generaciones también están acotadas (LRU de 'max_espacios'): un espacio olvidado vuelve
+    con la generación 'piso', que nunca es menor que ninguna generación ya entregada.
+    """
+
+    def __init__(self, max_entries: int = 10_000, ttl_seconds: float = 60.0, max_espacios: Optional[int] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_espacios = max_espacios or max_entries
+        self._entradas: "OrderedDict[Tuple[str, str], Tuple[str, float]]" = OrderedDict()  # (espacio, clave) -> (valor, expira)
+        self._claves_por_espacio: Dict[str, Set[str]] = {}
+        self._generaciones: "OrderedDict[str, int]" = OrderedDict()  # Solo los espacios invalidados hace poco.
+        self._ultima_generacion = 0  # Contador global: cada invalidación usa un número nuevo.
+        self._piso = 0               # Generación de los espacios que no están en _generaciones.
+        self._lock = threading.Lock()  # Las rutas síncronas corren en el threadpool.
+        self.hits = 0
+        self.misses = 0
+
+
+    # ---------------------------------- LEER -----------------------------------------------------
+    def generacion(self, espacio: str) -> int:
+        with self._lock:
+            return self._generaciones.get(espacio, self._piso)
+
+    def get(self, espacio: str, generacion: int, clave: str) -> Optional[str]:
+        with self._lock:
+            entrada = self._entradas.get((espacio, clave))
+            if entrada is not None and entrada[1] <= time.monotonic():
+                self._quitar(espacio, clave)
+                entrada = None
+            if entrada is None or generacion != self._generaciones.get(espacio, self._piso):
+                self.misses += 1
+                return None
+            self._entradas.move_to_end((espacio, clave))
+            self.hits += 1
+            return entrada[0]
+    # ---------------------------------------------------------------------------------------------
+
+
+    # ---------------------------------- GUARDAR --------------------------------------------------
+    def set(self, espacio: str, generacion: int, clave: str, valor: str):
+        with self._lock:
+            # Hubo una escritura mientras se leía de la DB: el valor ya es viejo.
+            if generacion != self._generaciones.get(espacio, self._piso):
+                return
+            self._entradas[(espacio, clave)] = (valor, time.monotonic() + self.ttl_seconds)
+            self._entradas.move_to_end((espacio, clave))
+            self._claves_por_espacio.setdefault(espacio, set()).add(clave)
+
+            # Desalojo LRU cuando se supera el tamaño máximo.
+            while len(self._entradas) > self.max_entries:
+                (espacio_viejo, clave_vieja), _ = self._entradas.popitem(last=False)
+                self._quitar(espacio_viejo, clave_vieja)
+    # ---------------------------------------------------------------------------------------------
+
+
+    # ---------------------------------- INVALIDAR ------------------------------------------------
+    def invalidar(self, espacio: str):
+        with self._lock:
+            # Mayor que cualquier generación leída antes (la del espacio o el piso): los set en curso se descartan.
+            self._ultima_generacion += 1
+            self._generaciones[espacio] = self._ultima_generacion
+            self._generaciones.move_to_end(espacio)
+            while len(self._generaciones) > self.max_espacios:
+                _, olvidada = self._generaciones.popitem(last=False)
+                # Un set en curso del espacio olvidado se descarta (o se acepta si no hubo escrituras nuevas).
+                self._piso = max(self._piso, olvidada)
+            for clave in self._claves_por_espacio.pop(espacio, set()):
+                self._entradas.pop((espacio, clave), None)
+
+    def clear(self):
+        with self._lock:
+            self._entradas.clear()
+            self._claves_por_espacio.clear()
+            self._generaciones.clear()
+            self._piso = self._ultima_generacion  # Las generaciones ya entregadas no vuelven a ser válidas.
+            self.hits = 0
+            self.misses = 0
+    # ---------------------------------------------------------------------------------------------
+
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses,
+                    "hit_rate": (self.hits / total) if total else 0.0, "size": len(self._entradas)}
+
+    def _quitar(self, espacio: str, clave: str):
+        """Quita una entrada de los índices (se llama con el lock tomado)."""
+        self._entradas.pop((espacio, clave), None)
+        claves = self._claves_por_espacio.get(espacio)
+        if claves is not None:
+            claves.discard(clave)
+            if not claves:
+                del self._claves_por_espacio[espacio]
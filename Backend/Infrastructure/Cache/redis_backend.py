@@ -0,0 +1,49 @@
+import threading
+from typing import Dict, Optional
+import redis
+from Infrastructure.Cache.cache_backend import CacheBackend
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Backend sobre un servidor con protocolo Redis (Redis, Valkey, KeyDB, ...), compartido por todos los workers.
+    Claves:  {prefijo}:{espacio}:gen            -> generación actual (INCR al invalidar).
+             {prefijo}:{espacio}:{gen}:{clave}  -> valor, con TTL.
+    Las entradas de generaciones viejas no se borran: expiran solas por TTL. El tamaño lo acota
+    el servidor (configurar maxmemory con una política allkeys-lru).
+    """
+    es_local = False
+
+    def __init__(self, url: str, ttl_seconds: float = 60.0, prefijo: str = "pokegym"):
+        # Timeouts cortos: si el servidor no responde, la lectura sigue contra la DB en lugar de colgarse.
+        self.cliente = redis.Redis.from_url(url, decode_responses=True, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self.ttl_ms = int(ttl_seconds * 1000)
+        self.prefijo = prefijo
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+
+    def generacion(self, espacio: str) -> int:
+        return int(self.cliente.get(f"{self.prefijo}:{espacio}:gen") or 0)
+
+    def get(self, espacio: str, generacion: int, clave: str) -> Optional[str]:
+        valor = self.cliente.get(f"{self.prefijo}:{espacio}:{generacion}:{clave}")
+        with self._lock:
+            if valor is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return valor
+
+    def set(self, espacio: str, generacion: int, clave: str, valor: str):
+        # Una lectura que terminó después de una invalidación escribe en una generación que ya nadie lee.
+        self.cliente.set(f"{self.prefijo}:{espacio}:{generacion}:{clave}", valor, px=self.ttl_ms)
+
+    def invalidar(self, espacio: str):
+        self.cliente.incr(f"{self.prefijo}:{espacio}:gen")
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "hit_rate": (self.hits / total) if total else 0.0}
@@ -0,0 +1,181 @@
+import time
+from typing import List, Tuple
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest, REGISTRY
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool, NullPool
+from Infrastructure.Monitoring.query_counter import consultas_del_request, conexiones_del_request
+
+# --------------------------------------------------------------------------------------------
+# Métricas en formato Prometheus (GET /metrics).
+# Todo lo que es "estado" (pool, caché, hashing) se lee recién al momento del scrape (collectors),
+# y por request solo se hacen 5 observaciones en memoria: el costo es bajo para dejarlo siempre activo.
+# --------------------------------------------------------------------------------------------
+
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HTTP_REQUESTS = Counter("http_requests_total", "Requests atendidos.", ["method", "route", "status"])
+HTTP_LATENCIA = Histogram("http_request_duration_seconds", "Duración de cada request (incluye el envío del body).",
+                          ["method", "route"], buckets=BUCKETS_LATENCIA)
+DB_CONSULTAS = Histogram("db_queries_per_request", "Consultas SQL ejecutadas por request.",
+                         ["method", "route"], buckets=(0, 1, 2, 3, 4, 5, 8, 13, 21, 50, 100))
+DB_CHECKOUTS = Histogram("db_pool_checkouts_per_request", "Conexiones tomadas del pool por request (una por transacción).",
+                         ["method", "route"], buckets=(0, 1, 2, 3, 4, 5, 8, 13))
+POOL_ESPERA = Histogram("db_pool_checkout_wait_seconds", "Tiempo hasta obtener una conexión del pool.",
+                        ["engine"], buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0))
+POOL_TIMEOUTS = Counter("db_pool_timeouts_total", "Checkouts que superaron DB_POOL_TIMEOUT sin obtener conexión.", ["engine"])
+HASHING_SEGUNDOS = Histogram("password_hashing_seconds", "Tiempo de hash/verificación argon2 (incluye la espera en el pool).",
+                             ["operacion"], buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0))
+DB_SESIONES = Counter("db_sessions_total", "Sesiones abiertas por destino (primario o réplica).", ["destino"])
+HASHING_RECHAZOS = Counter("password_hashing_rejected_total", "Trabajos de hashing rechazados por pool saturado.")
+
+
+# ------------------------------- Pools instrumentados ----------------------------------------
+class _EsperaInstrumentada:
+    """
+    Mide la espera de cada checkout y cuenta los que vencen por pool_timeout (pool agotado).
+    En NullPool la "espera" es abrir la conexión (contra el pooler externo). El nombre del motor se asigna con registrar_engine().
+    """
+    nombre_engine = "sync"
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            POOL_TIMEOUTS.labels(self.nombre_engine).inc()
+            raise
+        finally:
+            POOL_ESPERA.labels(self.nombre_engine).observe(time.perf_counter() - inicio)
+
+
+class InstrumentedQueuePool(_EsperaInstrumentada, QueuePool):
+    """QueuePool que mide la espera de cada checkout."""
+
+
+class InstrumentedAsyncAdaptedQueuePool(_EsperaInstrumentada, AsyncAdaptedQueuePool):
+    """Versión para el motor asíncrono (misma métrica, engine="async")."""
+    nombre_engine = "async"
+
+
+class InstrumentedNullPool(_EsperaInstrumentada, NullPool):
+    """NullPool (DB_POOL_MODE=null) con la misma métrica: mide lo que tarda en abrir cada conexión."""
+# --------------------------------------------------------------------------------------------
+
+
+# ------------------------------- Collectors (se leen en cada scrape) ------------------------
+class _EstadoCollector:
+    """Expone el estado de los pools de conexiones, la caché de usuarios y el pool de hashing."""
+
+    def __init__(self):
+        self.engines: List[Tuple[str, object]] = []
+        self.user_cache = None
+        self.rutina_cache = None
+        self.hashing_pool = None
+
+    def collect(self):
+        checked_out = GaugeMetricFamily("db_pool_checked_out", "Conexiones en uso.", labels=["engine"])
+        overflow = GaugeMetricFamily("db_pool_overflow", "Conexiones por encima de pool_size (negativo = aún no se llenó el pool).", labels=["engine"])
+        size = GaugeMetricFamily("db_pool_size", "Tamaño configurado del pool.", labels=["engine"])
+        for nombre, engine in self.engines:
+            pool = engine.pool
+            if isinstance(pool, QueuePool):
+                checked_out.add_metric([nombre], pool.checkedout())
+                overflow.add_metric([nombre], pool.overflow())
+                size.add_metric([nombre], pool.size())
+        yield checked_out
+        yield overflow
+        yield size
+
+        if self.user_cache is not None:
+            stats = self.user_cache.stats()
+            yield CounterMetricFamily("auth_cache_hits", "Aciertos de la caché de usuarios autenticados.", value=stats["hits"])
+            yield CounterMetricFamily("auth_cache_misses", "Fallos de la caché de usuarios autenticados.", value=stats["misses"])
+            yield GaugeMetricFamily("auth_cache_hit_ratio", "Proporción de aciertos de la caché.", value=stats["hit_rate"])
+            yield GaugeMetricFamily("auth_cache_size", "Tokens cacheados.", value=stats["size"])
+
+        if self.rutina_cache is not None:
+            stats = self.rutina_cache.stats()
+            yield CounterMetricFamily("rutina_cache_hits", "Lecturas de rutinas servidas desde la caché.", value=stats["hits"])
+            yield CounterMetricFamily("rutina_cache_misses", "Lecturas de rutinas que fueron a la DB.", value=stats["misses"])
+            yield GaugeMetricFamily("rutina_cache_hit_ratio", "Proporción de aciertos de la caché de rutinas.", value=stats["hit_rate"])
+
+        if self.hashing_pool is not None:
+            stats = self.hashing_pool.stats()
+            yield GaugeMetricFamily("password_hashing_pending", "Trabajos de hashing en curso o en cola.", value=stats["pendientes"])
+            yield GaugeMetricFamily("password_hashing_capacity", "Trabajos de hashing admitidos a la vez.", value=stats["capacidad"])
+
+
+_ESTADO = _EstadoCollector()
+REGISTRY.register(_ESTADO)
+
+
+def registrar_engine(nombre: str, engine) -> None:
+    """Incluye el pool del motor en /metrics y etiqueta sus tiempos de checkout con 'nombre'."""
+    if isinstance(engine.pool, _EsperaInstrumentada):
+        engine.pool.nombre_engine = nombre
+    _ESTADO.engines = [(n, e) for n, e in _ESTADO.engines if n != nombre] + [(nombre, engine)]
+
+
+def contar_sesion(destino: str) -> None:
+    DB_SESIONES.labels(destino).inc()
+
+
+def registrar_user_cache(cache) -> None:
+    _ESTADO.user_cache = cache
+
+
+def registrar_rutina_cache(backend) -> None:
+    _ESTADO.rutina_cache = backend
+
+
+def registrar_hashing_pool(pool) -> None:
+    _ESTADO.hashing_pool = pool
+# --------------------------------------------------------------------------------------------
+
+
+# ------------------------------- Middleware (métricas por ruta) -----------------------------
+class MetricsMiddleware:
+    """
+    Middleware ASGI: cuenta requests y observa la latencia, las consultas SQL y los checkouts del pool por ruta.
+    La ruta es el template (/api/rutinas/{rutina_id}), no la URL, para no crear una serie por ID.
+    Debe ir dentro de QueryCounterMiddleware para leer el contador de consultas del request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        inicio = time.perf_counter()
+        estado = {"status": 500}
+
+        async def send_con_status(message):
+            if message["type"] == "http.response.start":
+                estado["status"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_con_status)
+        finally:
+            ruta = scope.get("route")
+            ruta = ruta.path if ruta is not None else "sin_ruta"
+            metodo = scope["method"]
+            HTTP_REQUESTS.labels(metodo, ruta, str(estado["status"])).inc()
+            HTTP_LATENCIA.labels(metodo, ruta).observe(time.perf_counter() - inicio)
+            DB_CONSULTAS.labels(metodo, ruta).observe(consultas_del_request())
+            DB_CHECKOUTS.labels(metodo, ruta).observe(conexiones_del_request())
+# --------------------------------------------------------------------------------------------
+
+
+# ------------------------------- Endpoint /metrics ------------------------------------------
+router = APIRouter(tags=["Monitoreo"])
+
+@router.get("/metrics", include_in_schema=False)
+def metrics() -> Response:
+    return Response(content=generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
+# --------------------------------------------------------------------------------------------
@@ -0,0 +1,115 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool
+
+# Nombre del header con el que cada respuesta informa cuántas consultas SQL ejecutó.
+QUERY_COUNT_HEADER = "X-DB-Query-Count"
+
+
+class ContadorConsultas:
+    """
+    Cuenta las sentencias SQL ejecutadas dentro de un contexto (un request, un test, etc.)
+    y las conexiones que se tomaron del pool (checkouts) para ejecutarlas.
+    """
+    __slots__ = ("total", "conexiones", "padre")
+
+    def __init__(self, padre: Optional["ContadorConsultas"] = None):
+        self.total = 0
+        self.conexiones = 0
+        self.padre = padre  # Los contadores anidados también suman en el contador externo.
+
+    def incrementar(self):
+        contador = self
+        while contador is not None:
+            contador.total += 1
+            contador = contador.padre
+
+    def incrementar_conexiones(self):
+        contador = self
+        while contador is not None:
+            contador.conexiones += 1
+            contador = contador.padre
+
+
+# El contador activo viaja con el contexto: el threadpool de Starlette y el greenlet de
+# AsyncSession.run_sync copian el contexto, así que las consultas se atribuyen al request correcto.
+_contador_actual: ContextVar[Optional[ContadorConsultas]] = ContextVar("contador_consultas", default=None)
+
+
+# ------------------------------- Listener global de SQLAlchemy ------------------------------
+@event.listens_for(Engine, "before_cursor_execute")
+def _contar_consulta(conn, cursor, statement, parameters, context, executemany):
+    """Se registra sobre la clase Engine: aplica al motor síncrono y al asíncrono (sync_engine)."""
+    contador = _contador_actual.get()
+    if contador is not None:
+        contador.incrementar()
+
+
+@event.listens_for(Pool, "checkout")
+def _contar_conexion(dbapi_connection, connection_record, connection_proxy):
+    """Cada vez que una sesión toma una conexión del pool (al empezar una transacción, no por consulta)."""
+    contador = _contador_actual.get()
+    if contador is not None:
+        contador.incrementar_conexiones()
+# --------------------------------------------------------------------------------------------
+
+
+# ------------------------------- Contar consultas en un bloque ------------------------------
+@contextmanager
+def contar_consultas() -> Iterator[ContadorConsultas]:
+    """
+    Cuenta las consultas ejecutadas dentro del bloque. Pensado para los tests:
+
+        with contar_consultas() as contador:
+            repo.get_all_by_user(user_id=1, limit=1000)
+        assert contador.total == 2
+    """
+    contador = ContadorConsultas(padre=_contador_actual.get())
+    token = _contador_actual.set(contador)
+    try:
+        yield contador
+    finally:
+        _contador_actual.reset(token)
+# --------------------------------------------------------------------------------------------
+
+
+def consultas_del_request() -> int:
+    """Consultas del contador activo (el del request, si lo abrió QueryCounterMiddleware)."""
+    contador = _contador_actual.get()
+    return contador.total if contador is not None else 0
+
+
+def conexiones_del_request() -> int:
+    """Checkouts del pool del contador activo (el del request, si lo abrió QueryCounterMiddleware)."""
+    contador = _contador_actual.get()
+    return contador.conexiones if contador is not None else 0
+
+
+# ------------------------------- Middleware (contador por request) --------------------------
+class QueryCounterMiddleware:
+    """
+    Middleware ASGI: abre un contador por request y lo devuelve en el header X-DB-Query-Count.
+    Es ASGI puro (no BaseHTTPMiddleware) para que el costo por request sea mínimo.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with contar_consultas() as contador:
+            async def send_con_contador(message):
+                if message["type"] == "http.response.start":
+                    headers = list(message.get("headers", []))
+                    headers.append((QUERY_COUNT_HEADER.lower().encode("latin-1"), str(contador.total).encode("latin-1")))
+                    message["headers"] = headers
+                await send(message)
+
+            await self.app(scope, receive, send_con_contador)
+# --------------------------------------------------------------------------------------------
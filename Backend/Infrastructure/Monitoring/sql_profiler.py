@@ -0,0 +1,179 @@
+import sys
+import json
+import time
+import logging
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Iterator
+from greenlet import getcurrent
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from config import settings
+
+# --------------------------------------------------------------------------------------------
+# Perfilado de consultas SQL (reemplaza a echo=True).
+# Cada consulta se mide con before/after_cursor_execute. Solo se loguean las que superan
+# SLOW_QUERY_MS, y el perfil de un request se pide con el header X-Debug-SQL.
+# --------------------------------------------------------------------------------------------
+
+# Header que pide el detalle (request) y header con el resumen (response).
+SQL_DEBUG_HEADER = "X-Debug-SQL"
+SQL_PROFILE_HEADER = "X-DB-Profile"
+
+# Tope del header X-DB-Profile: nginx y muchos proxies cortan los headers de más de 4-8 KB.
+MAX_HEADER_BYTES = 4096
+
+logger = logging.getLogger("pokegym.sql")
+
+_MODULO_REPOSITORIOS = "Infrastructure.Repositories"
+
+
+class PerfilConsultas:
+    """
+    Consultas de un request. El header lleva solo totales y conteos por método del repositorio;
+    el detalle de cada consulta (duración, filas y SQL) va al log.
+    """
+    __slots__ = ("consultas", "cantidad", "filas", "total_ms", "por_origen")
+
+    def __init__(self):
+        self.consultas: List[dict] = []
+        self.cantidad = 0
+        self.filas = 0
+        self.total_ms = 0.0
+        self.por_origen: Dict[str, List[float]] = {}  # origen -> [consultas, ms]
+
+    def agregar(self, duracion_ms: float, filas: int, origen: str, statement: str):
+        self.cantidad += 1
+        self.filas += max(filas, 0)  # rowcount -1: el driver no lo informa.
+        self.total_ms += duracion_ms
+        acumulado = self.por_origen.setdefault(origen, [0, 0.0])
+        acumulado[0] += 1
+        acumulado[1] += duracion_ms
+        if len(self.consultas) < settings.SQL_PROFILE_MAX_QUERIES:
+            self.consultas.append({"ms": round(duracion_ms, 3), "filas": filas, "origen": origen,
+                                   "sql": " ".join(statement.split())[:settings.SQL_PROFILE_MAX_SQL_CHARS]})
+
+    def to_header(self) -> str:
+        """Resumen en JSON, nunca más largo que MAX_HEADER_BYTES (se descartan los orígenes que menos tardaron)."""
+        origenes = sorted(self.por_origen.items(), key=lambda item: item[1][1], reverse=True)
+        resumen = {"total_ms": round(self.total_ms, 3), "consultas": self.cantidad, "filas": self.filas,
+                   "por_origen": {origen: {"consultas": n, "ms": round(ms, 3)} for origen, (n, ms) in origenes}}
+        while True:
+            # ensure_ascii: el valor del header tiene que ser latin-1.
+            valor = json.dumps(resumen, separators=(",", ":"), ensure_ascii=True)
+            if len(valor) <= MAX_HEADER_BYTES or not resumen["por_origen"]:
+                return valor
+            resumen["por_origen"].pop(next(reversed(resumen["por_origen"])))
+            resumen["origenes_omitidos"] = resumen.get("origenes_omitidos", 0) + 1
+
+    def loguear(self, metodo: str, ruta: str):
+        """Detalle de cada consulta del request en el logger 'pokegym.sql' (incluye las hechas durante el streaming)."""
+        logger.info("%s %s: %d consultas, %.1f ms", metodo, ruta, self.cantidad, self.total_ms)
+        for i, consulta in enumerate(self.consultas, start=1):
+            logger.info("  #%d %.1f ms, %s filas, %s: %s", i, consulta["ms"], consulta["filas"], consulta["origen"], consulta["sql"])
+        if self.cantidad > len(self.consultas):
+            logger.info("  ... %d consultas más sin detalle (SQL_PROFILE_MAX_QUERIES)", self.cantidad - len(self.consultas))
+
+
+def configurar_logger():
+    """
+    Muestra el detalle (INFO) de 'pokegym.sql': sin configuración de logging, Python solo imprime WARNING o más.
+    Si la aplicación ya configuró handlers (propios o del root), se respetan y solo se baja el nivel.
+    """
+    logger.setLevel(logging.INFO)
+    if not logger.hasHandlers():
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+        logger.addHandler(handler)
+
+
+# Perfil del request actual: solo existe si el request lo pidió (y está habilitado).
+_perfil_actual: ContextVar[Optional[PerfilConsultas]] = ContextVar("perfil_consultas", default=None)
+
+
+def _origen() -> str:
+    """
+    Método del repositorio que ejecutó la consulta (p. ej. 'rutina_repository.RutinaRepository.get_by_id').
+    Se recorre la pila solo para las consultas lentas o perfiladas. Se prefiere el método público
+    más interno, así los helpers privados (_insertar_ejercicios) y los lambdas de run_sync no lo tapan.
+    """
+    primero = None
+    for frame in _pila(sys._getframe(2)):
+        modulo = frame.f_globals.get("__name__", "")
+        if modulo.startswith(_MODULO_REPOSITORIOS):
+            nombre = f"{modulo.rsplit('.', 1)[-1]}.{frame.f_code.co_qualname}"
+            if not frame.f_code.co_name.startswith(("_", "<")):
+                return nombre
+            primero = primero or nombre
+    return primero or "desconocido"
+
+
+def _pila(frame) -> Iterator:
+    """
+    Frames desde 'frame' hacia afuera. Con AsyncSession el driver corre en un greenlet hijo: cuando se termina
+    su pila se sigue por la del greenlet padre, donde está suspendido el repositorio que hizo el await.
+    """
+    actual = getcurrent()
+    while actual is not None:
+        while frame is not None:
+            yield frame
+            frame = frame.f_back
+        actual = actual.parent
+        frame = actual.gr_frame if actual is not None else None
+
+
+# ------------------------------- Listeners globales de SQLAlchemy ---------------------------
+@event.listens_for(Engine, "before_cursor_execute")
+def _inicio_consulta(conn, cursor, statement, parameters, context, executemany):
+    conn.info["inicio_consulta"] = time.perf_counter()  # Una conexión ejecuta una sola consulta a la vez.
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _fin_consulta(conn, cursor, statement, parameters, context, executemany):
+    duracion_ms = (time.perf_counter() - conn.info["inicio_consulta"]) * 1000
+    perfil = _perfil_actual.get()
+    lenta = duracion_ms >= settings.SLOW_QUERY_MS
+    if perfil is None and not lenta:
+        return
+
+    origen = _origen()
+    filas = cursor.rowcount  # -1 si el driver no lo informa (p. ej. cursores del lado del servidor).
+    if perfil is not None:
+        perfil.agregar(duracion_ms, filas, origen, statement)
+    if lenta:
+        logger.warning("Consulta lenta (%.1f ms, %s filas) en %s: %s", duracion_ms, filas, origen,
+                       " ".join(statement.split())[:settings.SQL_PROFILE_MAX_SQL_CHARS])
+# --------------------------------------------------------------------------------------------
+
+
+# ------------------------------- Middleware (detalle por request) ---------------------------
+class SqlProfilerMiddleware:
+    """
+    Middleware ASGI: si el request trae 'X-Debug-SQL: 1', devuelve el resumen de sus consultas
+    en el header X-DB-Profile (JSON) y loguea el detalle al terminar. En las respuestas en streaming
+    el header sale antes que el body, así que solo cuenta las consultas hechas hasta ese momento.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or (SQL_DEBUG_HEADER.lower().encode("latin-1"), b"1") not in scope["headers"]:
+            await self.app(scope, receive, send)
+            return
+
+        perfil = PerfilConsultas()
+        token = _perfil_actual.set(perfil)
+
+        async def send_con_perfil(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((SQL_PROFILE_HEADER.lower().encode("latin-1"), perfil.to_header().encode("latin-1")))
+                message["headers"] = headers
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_con_perfil)
+        finally:
+            _perfil_actual.reset(token)
+            perfil.loguear(scope["method"], scope["path"])
+# --------------------------------------------------------------------------------------------
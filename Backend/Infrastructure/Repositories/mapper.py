@@ -1,3 +1,4 @@
+from typing import Any, Dict
 from Domain.Entities.user import User
 from Domain.Entities.rutina import Rutina
 from Domain.Entities.ejercicio import Ejercicio
@@ -65,6 +66,37 @@ class Mapper():
     # ---------------------------------------------------------------------------------------------------
 
 
+    # ------------------------------------ Mapeo de Rutina a fila (columnas) ----------------------------
+    @staticmethod
+    def to_rutina_row(rutina_domain: Rutina) -> Dict[str, Any]:
+        """Columnas de la tabla rutina (sin id) para INSERT/UPDATE directos, sin construir un RutinaDB."""
+        return {
+            "user_id": rutina_domain.user_id,
+            "nombre": rutina_domain.nombre,
+            "descripcion": rutina_domain.descripcion,
+            "fecha_creacion": rutina_domain.fecha_creacion,
+        }
+    # ---------------------------------------------------------------------------------------------------
+
+
+    # ------------------------------------ Mapeo de Ejercicio a fila (columnas) -------------------------
+    @staticmethod
+    def to_ejercicio_row(ejercicio_domain: Ejercicio, rutina_domain: Rutina) -> Dict[str, Any]:
+        """Columnas de la tabla ejercicio (sin id). Se usan para escribir y para detectar cambios."""
+        return {
+            "rutina_id": rutina_domain.id,
+            "user_id": rutina_domain.user_id,
+            "nombre": ejercicio_domain.nombre,
+            "dia_semana": ejercicio_domain.dia_semana,
+            "series": ejercicio_domain.series,
+            "repeticiones": ejercicio_domain.repeticiones,
+            "peso": ejercicio_domain.peso,
+            "notas": ejercicio_domain.notas,
+            "orden": ejercicio_domain.orden,
+        }
+    # ---------------------------------------------------------------------------------------------------
+
+
     # ------------------------------------ Mapeo de EjercicioDB a Ejercicio -----------------------------
     @staticmethod
     def to_domain_entity_ejercicio(ejercicio_db: EjercicioDB) -> Ejercicio:
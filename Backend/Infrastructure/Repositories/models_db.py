@@ -1,4 +1,5 @@
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index, DDL, event, func
 from typing import Optional, List
 from datetime import datetime
 from Domain.ValueObjects.dias import DiaSemana # Se pueden importar Value Objects
@@ -22,9 +23,15 @@ class UserDB(SQLModel, table=True):
 # MODELO DE TABLA (DB) - Ejercicio
 class EjercicioDB(SQLModel, table=True):
     __tablename__ = "ejercicio"
+    __table_args__ = (
+        # Ejercicios de una rutina ya ordenados: JOIN de las lecturas en filas / exportación y selectinload.
+        Index("ix_ejercicio_rutina_orden_id", "rutina_id", "orden", "id"),
+        # Vista por día (GET /rutinas/{id}/dias): en PostgreSQL el ENUM se ordena Lunes..Domingo.
+        Index("ix_ejercicio_rutina_dia_orden", "rutina_id", "dia_semana", "orden", "id"),
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
-    rutina_id: int = Field(foreign_key="rutina.id")
+    rutina_id: int = Field(foreign_key="rutina.id", ondelete="CASCADE") # Borrar una rutina borra sus ejercicios en la DB.
     user_id: int = Field(foreign_key="users.id", index=True)
     nombre: str 
     dia_semana: DiaSemana 
@@ -40,6 +47,12 @@ class EjercicioDB(SQLModel, table=True):
 # MODELO DE TABLA (DB) - Rutina
 class RutinaDB(SQLModel, table=True):
     __tablename__ = "rutina"
+    __table_args__ = (
+        # Paginación por cursor (keyset): WHERE user_id = ? AND (fecha_creacion, id) > (?, ?) ORDER BY fecha_creacion, id.
+        Index("ix_rutina_user_fecha_id", "user_id", "fecha_creacion", "id"),
+        # Nombre único por usuario: búsqueda exacta (get_by_nombre) y ON CONFLICT de las altas.
+        Index("ix_rutina_user_nombre", "user_id", "nombre", unique=True),
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="users.id", index=True)
@@ -48,9 +61,29 @@ class RutinaDB(SQLModel, table=True):
     fecha_creacion: datetime = Field(default_factory=datetime.now)
     ejercicios: List["EjercicioDB"] = Relationship(
         back_populates="rutina", 
-        # Envolvemos el argumento 'cascade' dentro de sa_relationship_kwargs
-        sa_relationship_kwargs={"cascade": "all, delete-orphan"} 
+        # Envolvemos el argumento 'cascade' dentro de sa_relationship_kwargs.
+        # 'order_by' hace que los ejercicios lleguen siempre ordenados por 'orden' (también con selectinload).
+        # 'passive_deletes': el borrado de los ejercicios lo hace la DB (ON DELETE CASCADE), sin cargarlos.
+        sa_relationship_kwargs={"cascade": "all, delete-orphan", "order_by": "EjercicioDB.orden", "passive_deletes": True} 
     )
     owner: "UserDB" = Relationship(back_populates="rutinas")
 
-    
+
+# MODELO DE TABLA (DB) - Versión de las rutinas de cada usuario
+class RutinaVersionDB(SQLModel, table=True):
+    """Contador de cambios de las rutinas de un usuario: se incrementa en cada escritura (ETag de las lecturas)."""
+    __tablename__ = "rutina_version"
+
+    user_id: int = Field(foreign_key="users.id", primary_key=True)
+    version: int = 0
+
+
+# ÍNDICE TRIGRAMA (solo PostgreSQL) - Búsqueda parcial por nombre
+# Permite que lower(nombre) LIKE '%termino%' use un índice GIN (pg_trgm) en lugar de recorrer toda la tabla.
+event.listen(SQLModel.metadata, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"))
+Index(
+    "ix_rutina_nombre_trgm",
+    func.lower(RutinaDB.__table__.c.nombre).label("nombre_lower"),
+    postgresql_using="gin",
+    postgresql_ops={"nombre_lower": "gin_trgm_ops"},
+).ddl_if(dialect="postgresql")
@@ -1,34 +1,243 @@
 from sqlmodel import Session, select, Relationship, func
-from typing import Optional, List, Any, Dict
+from sqlalchemy import tuple_, insert, update, delete, case
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from datetime import datetime
+from typing import Optional, List, Any, Dict, Tuple, Set, Iterator, Mapping, Callable, TypeVar
 from Domain.Entities.rutina import Rutina
 from Domain.Entities.ejercicio import Ejercicio
-from Domain.Exceptions.domain_exception import ValueError
+from Domain.ValueObjects.dias import DiaSemana
+from Domain.Exceptions.domain_exception import ValueError, NombreDuplicadoError
 from Domain.Interfaces.rutina_repository_interface import RutinaRepositoryInterface
-from Infrastructure.Repositories.models_db import RutinaDB, EjercicioDB 
+from Infrastructure.Repositories.models_db import RutinaDB, EjercicioDB, RutinaVersionDB
 from Infrastructure.Repositories.mapper import Mapper
 
+T = TypeVar("T")
+
 class RutinaRepository(RutinaRepositoryInterface):
     """Implementación concreta del Repositorio de Rutinas usando SQLModel/PostgreSQL."""
+
+    # Columnas de ejercicio que puede cambiar update_by_id.
+    _CAMPOS_EJERCICIO_EDITABLES = frozenset({"nombre", "dia_semana", "series", "repeticiones", "peso", "notas", "orden"})
     
     def __init__(self, session: Session):
         self.session = session
+        # Estado persistido de cada agregado cargado con get_by_id: {rutina_id: (fila_rutina, {ejercicio_id: fila})}.
+        # save() lo compara con el agregado para escribir solo lo que cambió.
+        self._snapshots: Dict[int, Tuple[Optional[Dict[str, Any]], Dict[int, Dict[str, Any]]]] = {}
+        self._en_transaccion = False # True dentro de en_transaccion(): las escrituras no confirman por su cuenta.
+
+
+    # --------------------------------- CONSULTA BASE DEL AGREGADO --------------------------
+    @staticmethod
+    def _select_rutinas():
+        """
+        SELECT de RutinaDB con los ejercicios precargados (selectinload).
+        Carga todos los ejercicios de la página en UNA consulta extra (WHERE rutina_id IN (...)),
+        en lugar de una consulta por rutina al mapear (N+1).
+        """
+        return select(RutinaDB).options(selectinload(RutinaDB.ejercicios))
+
+
+    def _dialecto(self) -> str:
+        return self.session.get_bind().dialect.name
+
+
+    def _insert(self, modelo):
+        """INSERT del dialecto de la sesión (PostgreSQL o SQLite): ambos soportan ON CONFLICT."""
+        return (pg_insert if self._dialecto() == "postgresql" else sqlite_insert)(modelo)
+
+
+    def _confirmar(self):
+        """Confirma la escritura, salvo dentro de en_transaccion(), que confirma una sola vez al final."""
+        if not self._en_transaccion:
+            self.session.commit()
+
+
+    @staticmethod
+    def _es_nombre_duplicado(error: IntegrityError) -> bool:
+        """True si la violación es la del índice único (user_id, nombre) de rutina."""
+        mensaje = str(error.orig)
+        # PostgreSQL (psycopg2 y asyncpg) nombra el índice; SQLite, las columnas.
+        return "ix_rutina_user_nombre" in mensaje or "rutina.user_id, rutina.nombre" in mensaje
+    # ---------------------------------------------------------------------------------------
     
 
+    # --------------------------------- UNIDAD DE TRABAJO ----------------------------------
+    def en_transaccion(self, trabajo: Callable[[], T]) -> T:
+        """
+        Ejecuta 'trabajo' (varias escrituras de este repositorio) en UNA transacción: se confirma al terminar
+        o, si lanza una excepción, se revierte completo (también lo que ya se había escrito).
+        Si ya hay una transacción abierta (un Caso de Uso dentro de un lote atómico), 'trabajo' se suma a ella.
+        """
+        if self._en_transaccion:
+            return trabajo()
+        self._en_transaccion = True
+        try:
+            resultado = trabajo()
+            self._en_transaccion = False
+            self._confirmar()
+        except Exception:
+            self.session.rollback()
+            self._snapshots.clear() # Los agregados recordados pueden tener cambios que no quedaron.
+            raise
+        finally:
+            self._en_transaccion = False
+        return resultado
+    # ---------------------------------------------------------------------------------------
+
+
     # --------------------------------- ALTA Y MODIFICACION DE RUTINA ----------------------
     def save(self, rutina: Rutina) -> Rutina:
-        """Implementa el guardado/actualizado del Agregado."""
-        rutina_db = Mapper.to_db_model(rutina)
+        """
+        Implementa el guardado/actualizado del Agregado de forma diferencial:
+        solo se escriben la rutina y los ejercicios que cambiaron, con sentencias en lote
+        (sin session.merge del grafo completo ni refresh posterior).
+        El nombre único lo garantiza la DB: si ya existe, lanza NombreDuplicadoError sin haber escrito nada.
+        """
+        try:
+            if rutina.id is None:
+                self._insertar_rutina(rutina)
+            else:
+                self._actualizar_rutina(rutina)
+        except IntegrityError as e:
+            self.session.rollback()
+            if self._es_nombre_duplicado(e):
+                raise NombreDuplicadoError(rutina.nombre) from e
+            raise
+        except NombreDuplicadoError:
+            self.session.rollback()
+            raise
 
-        if rutina_db.id is not None:
-             # Si ya tiene ID, usamos merge para asegurar que actualiza.
-             rutina_db = self.session.merge(rutina_db)
-        else:
-             # Si el ID es None (nueva creación), usamos add.
-             self.session.add(rutina_db)
-    
-        self.session.commit()
-        self.session.refresh(rutina_db)
-        return Mapper.to_domain_entity(rutina_db)
+        self._confirmar()
+        self._recordar(rutina)
+        # Mismo orden que al leer el agregado desde la DB.
+        rutina.ejercicios.sort(key=lambda e: (e.orden, e.id))
+        return rutina
+
+
+    def _insertar_rutina(self, rutina: Rutina):
+        """
+        INSERT de la rutina y de todos sus ejercicios (un único INSERT multi-fila).
+        La rutina se inserta con ON CONFLICT (user_id, nombre) DO NOTHING: si el nombre ya existe no devuelve
+        ningún id y no se inserta nada (sin consulta previa y sin carrera entre requests concurrentes).
+        """
+        rutina_id = self.session.execute(
+            self._insert(RutinaDB).values(**Mapper.to_rutina_row(rutina))
+            .on_conflict_do_nothing(index_elements=[RutinaDB.user_id, RutinaDB.nombre]).returning(RutinaDB.id)
+        ).scalar_one_or_none()
+        if rutina_id is None:
+            raise NombreDuplicadoError(rutina.nombre)
+        rutina.id = rutina_id
+        self._insertar_ejercicios([(e, rutina) for e in rutina.ejercicios])
+
+
+    def _actualizar_rutina(self, rutina: Rutina):
+        """Calcula el diff contra el estado persistido y escribe INSERT/UPDATE/DELETE solo de lo necesario."""
+        fila_rutina_anterior, filas_anteriores = self._snapshots.get(rutina.id) or self._cargar_snapshot(rutina.id)
+
+        # Datos base de la rutina (si no se conocen, se actualizan siempre: es un UPDATE de una fila).
+        # Un nombre repetido lo rechaza el índice único (IntegrityError, que save() traduce).
+        fila_rutina = Mapper.to_rutina_row(rutina)
+        if fila_rutina != fila_rutina_anterior:
+            self.session.execute(
+                update(RutinaDB).where(RutinaDB.id == rutina.id, RutinaDB.user_id == rutina.user_id)
+                .values(nombre=rutina.nombre, descripcion=rutina.descripcion)
+            )
+
+        nuevos = [e for e in rutina.ejercicios if e.id is None]
+        actuales = {e.id: Mapper.to_ejercicio_row(e, rutina) for e in rutina.ejercicios if e.id is not None}
+
+        # Solo se modifican ejercicios que pertenecen al agregado persistido.
+        modificados = [{"id": ejercicio_id, **fila} for ejercicio_id, fila in actuales.items()
+                       if ejercicio_id in filas_anteriores and filas_anteriores[ejercicio_id] != fila]
+        eliminados = [ejercicio_id for ejercicio_id in filas_anteriores if ejercicio_id not in actuales]
+
+        if eliminados:
+            self.session.execute(
+                delete(EjercicioDB).where(EjercicioDB.rutina_id == rutina.id, EjercicioDB.id.in_(eliminados)),
+                execution_options={"synchronize_session": False}
+            )
+        if modificados:
+            # UPDATE por clave primaria en lote (executemany).
+            self.session.execute(update(EjercicioDB), modificados)
+        self._insertar_ejercicios([(e, rutina) for e in nuevos])
+
+
+    def _insertar_ejercicios(self, pares: List[Tuple[Ejercicio, Rutina]]):
+        """INSERT multi-fila de ejercicios nuevos (con su rutina); asigna los IDs generados a las Entidades."""
+        if not pares:
+            return
+        ids = self.session.execute(
+            insert(EjercicioDB).returning(EjercicioDB.id, sort_by_parameter_order=True),
+            [Mapper.to_ejercicio_row(e, rutina) for e, rutina in pares]
+        ).scalars().all()
+        for (ejercicio, rutina), ejercicio_id in zip(pares, ids):
+            ejercicio.id = ejercicio_id
+            ejercicio.rutina_id = rutina.id
+            ejercicio.user_id = rutina.user_id
+
+
+    def _cargar_snapshot(self, rutina_id: int):
+        """Estado persistido de los ejercicios cuando el agregado no se cargó con este repositorio."""
+        filas = self.session.execute(
+            select(EjercicioDB.id, EjercicioDB.rutina_id, EjercicioDB.user_id, EjercicioDB.nombre, EjercicioDB.dia_semana,
+                   EjercicioDB.series, EjercicioDB.repeticiones, EjercicioDB.peso, EjercicioDB.notas, EjercicioDB.orden)
+            .where(EjercicioDB.rutina_id == rutina_id)
+        ).mappings().all()
+        return None, {fila["id"]: {k: v for k, v in fila.items() if k != "id"} for fila in filas}
+
+
+    def _recordar(self, rutina: Rutina):
+        """Guarda una copia del estado persistido del agregado para el próximo save()."""
+        self._snapshots[rutina.id] = (
+            Mapper.to_rutina_row(rutina),
+            {e.id: Mapper.to_ejercicio_row(e, rutina) for e in rutina.ejercicios},
+        )
+    # ---------------------------------------------------------------------------------------
+
+
+    # --------------------------------- ALTA MASIVA DE RUTINAS -----------------------------
+    def save_many(self, rutinas: List[Rutina]) -> List[Rutina]:
+        """
+        Alta de varios Agregados nuevos en UNA transacción: un INSERT multi-fila para las rutinas
+        y otro para todos sus ejercicios. No guarda snapshots (importaciones grandes).
+        Si falla, se hace rollback y no queda ninguna rutina del lote (también si otro request
+        creó uno de los nombres después de get_nombres_existentes: NombreDuplicadoError).
+        """
+        if not rutinas:
+            return rutinas
+        try:
+            ids = self.session.execute(
+                insert(RutinaDB).returning(RutinaDB.id, sort_by_parameter_order=True),
+                [Mapper.to_rutina_row(r) for r in rutinas]
+            ).scalars().all()
+            for rutina, rutina_id in zip(rutinas, ids):
+                rutina.id = rutina_id
+            self._insertar_ejercicios([(e, rutina) for rutina in rutinas for e in rutina.ejercicios])
+            self._confirmar()
+        except IntegrityError as e:
+            self.session.rollback()
+            if self._es_nombre_duplicado(e):
+                raise NombreDuplicadoError() from e
+            raise
+        except Exception:
+            self.session.rollback()
+            raise
+
+        for rutina in rutinas:
+            rutina.ejercicios.sort(key=lambda e: (e.orden, e.id))
+        return rutinas
+
+
+    def get_nombres_existentes(self, nombres: List[str], user_id: int) -> Set[str]:
+        """Devuelve cuáles de los nombres ya están usados por rutinas del usuario (una sola consulta)."""
+        if not nombres:
+            return set()
+        statement = select(RutinaDB.nombre).where(RutinaDB.user_id == user_id, RutinaDB.nombre.in_(set(nombres)))
+        return set(self.session.exec(statement).all())
     # ---------------------------------------------------------------------------------------
 
 
@@ -36,20 +245,184 @@ class RutinaRepository(RutinaRepositoryInterface):
     # Implementación del nuevo método get_all_by_user
     def get_all_by_user(self, user_id: int, skip: int = 0, limit: int = 100) -> List[Rutina]:
         """Devuelve una lista paginada de rutinas, solo del usuario especificado."""
-        query = select(RutinaDB).where(RutinaDB.user_id == user_id).offset(skip).limit(limit)
-        rutinas = self.session.exec(query).all()
+        rutinas = self.session.exec(self._select_lista(user_id, skip, limit)).all()
+        return [Mapper.to_domain_entity(r) for r in rutinas]
+
+
+    # Las consultas de lectura se arman en métodos estáticos: AsyncRutinaRepository las ejecuta con await.
+    @classmethod
+    def _select_lista(cls, user_id: int, skip: int, limit: int):
+        return (cls._select_rutinas().where(RutinaDB.user_id == user_id)
+            .order_by(RutinaDB.fecha_creacion, RutinaDB.id) # Orden estable (mismo que el cursor).
+            .offset(skip).limit(limit))
+    # ---------------------------------------------------------------------------------------
+
+
+    # -------------------------------------- LISTAR RUTINAS (KEYSET) ------------------------
+    def get_page_by_user(self, user_id: int, limit: int, despues_de: Optional[Tuple[datetime, int]] = None) -> List[Rutina]:
+        """
+        Página de rutinas posteriores a la posición (fecha_creacion, id) dada.
+        Usa el índice ix_rutina_user_fecha_id: el costo no crece con la profundidad de la página (sin OFFSET).
+        """
+        rutinas = self.session.exec(self._select_pagina(user_id, limit, despues_de)).all()
         return [Mapper.to_domain_entity(r) for r in rutinas]
+
+
+    @classmethod
+    def _select_pagina(cls, user_id: int, limit: int, despues_de: Optional[Tuple[datetime, int]]):
+        query = cls._select_rutinas().where(RutinaDB.user_id == user_id)
+        if despues_de is not None:
+            query = query.where(tuple_(RutinaDB.fecha_creacion, RutinaDB.id) > tuple_(*despues_de))
+        return query.order_by(RutinaDB.fecha_creacion, RutinaDB.id).limit(limit)
+    # ---------------------------------------------------------------------------------------
+
+
+    # -------------------------------------- EXPORTAR RUTINAS (STREAMING) -------------------
+    @staticmethod
+    def _select_export(user_id: int):
+        """
+        Filas planas rutina LEFT JOIN ejercicio del usuario (solo columnas, sin entidades ORM),
+        ordenadas por rutina para poder agruparlas mientras se leen.
+        """
+        return (
+            select(RutinaDB.id.label("rutina_id"), RutinaDB.nombre.label("rutina_nombre"), RutinaDB.descripcion, RutinaDB.fecha_creacion,
+                   EjercicioDB.id.label("ejercicio_id"), EjercicioDB.nombre.label("ejercicio_nombre"), EjercicioDB.dia_semana,
+                   EjercicioDB.series, EjercicioDB.repeticiones, EjercicioDB.peso, EjercicioDB.notas, EjercicioDB.orden)
+            .select_from(RutinaDB)
+            .outerjoin(EjercicioDB, EjercicioDB.rutina_id == RutinaDB.id)
+            .where(RutinaDB.user_id == user_id)
+            .order_by(RutinaDB.fecha_creacion, RutinaDB.id, EjercicioDB.orden, EjercicioDB.id)
+        )
+
+
+    def iter_export_by_user(self, user_id: int, tamano_lote: int = 1000) -> Iterator[List[Mapping[str, Any]]]:
+        """
+        Recorre todas las filas de exportación del usuario con un cursor del lado del servidor (yield_per):
+        en memoria solo hay una partición de 'tamano_lote' filas a la vez.
+        """
+        resultado = self.session.execute(self._select_export(user_id), execution_options={"yield_per": tamano_lote})
+        try:
+            for particion in resultado.mappings().partitions():
+                yield particion
+        finally:
+            resultado.close()
+    # ---------------------------------------------------------------------------------------
+
+
+    # -------------------------------------- LECTURAS EN FILAS (CAMINO RÁPIDO) --------------
+    # Mismas páginas que get_all_by_user / get_page_by_user / get_by_id, pero como filas planas
+    # (la proyección de la exportación) en UNA consulta: sin objetos ORM ni Entidades.
+    def get_filas_by_user(self, user_id: int, skip: int = 0, limit: int = 100) -> List[Mapping[str, Any]]:
+        return self.session.execute(self._select_filas(user_id, self._ids_lista(user_id, skip, limit))).mappings().all()
+
+
+    def get_filas_page_by_user(self, user_id: int, limit: int, despues_de: Optional[Tuple[datetime, int]] = None) -> List[Mapping[str, Any]]:
+        return self.session.execute(self._select_filas(user_id, self._ids_pagina(user_id, limit, despues_de))).mappings().all()
+
+
+    def get_filas_by_id(self, rutina_id: int, user_id: int) -> List[Mapping[str, Any]]:
+        return self.session.execute(self._select_filas_por_id(rutina_id, user_id)).mappings().all()
+
+
+    def get_filas_dias_by_id(self, rutina_id: int, user_id: int) -> List[Mapping[str, Any]]:
+        return self.session.execute(self._select_filas_dias(rutina_id, user_id, self._dialecto())).mappings().all()
+
+
+    @staticmethod
+    def _ids_lista(user_id: int, skip: int, limit: int):
+        """IDs de una página por OFFSET (subconsulta que ya tiene el LIMIT)."""
+        return (select(RutinaDB.id).where(RutinaDB.user_id == user_id)
+            .order_by(RutinaDB.fecha_creacion, RutinaDB.id).offset(skip).limit(limit))
+
+
+    @staticmethod
+    def _ids_pagina(user_id: int, limit: int, despues_de: Optional[Tuple[datetime, int]]):
+        """IDs de una página keyset, posteriores a (fecha_creacion, id)."""
+        pagina = select(RutinaDB.id).where(RutinaDB.user_id == user_id)
+        if despues_de is not None:
+            pagina = pagina.where(tuple_(RutinaDB.fecha_creacion, RutinaDB.id) > tuple_(*despues_de))
+        return pagina.order_by(RutinaDB.fecha_creacion, RutinaDB.id).limit(limit)
+
+
+    @classmethod
+    def _select_filas(cls, user_id: int, pagina):
+        """Filas de las rutinas cuyos IDs devuelve la subconsulta 'pagina'."""
+        return cls._select_export(user_id).where(RutinaDB.id.in_(pagina.scalar_subquery()))
+
+
+    @classmethod
+    def _select_filas_por_id(cls, rutina_id: int, user_id: int):
+        return cls._select_export(user_id).where(RutinaDB.id == rutina_id)
+
+
+    @classmethod
+    def _select_filas_dias(cls, rutina_id: int, user_id: int, dialecto: str):
+        """
+        Filas de una rutina ordenadas por día de la semana y 'orden' en la DB (índice ix_ejercicio_rutina_dia_orden).
+        En PostgreSQL dia_semana es un ENUM nativo, que se ordena como se declararon los días (Lunes..Domingo):
+        el índice entrega las filas ya ordenadas. En otros motores la columna es texto y se ordena con un CASE.
+        """
+        return (cls._select_export(user_id).where(RutinaDB.id == rutina_id)
+            .order_by(None).order_by(cls._orden_dia(dialecto), EjercicioDB.orden, EjercicioDB.id))
+
+
+    @staticmethod
+    def _orden_dia(dialecto: str):
+        """Expresión que ordena dia_semana como la semana (Lunes..Domingo) en el motor indicado."""
+        if dialecto == "postgresql":
+            return EjercicioDB.dia_semana
+        # Se compara contra la columna para que cada día pase por el tipo Enum (se guarda el nombre, no el valor).
+        return case(*[(EjercicioDB.dia_semana == dia, posicion) for posicion, dia in enumerate(DiaSemana)])
+    # ---------------------------------------------------------------------------------------
+
+
+    # -------------------------------------- RESUMEN DE RUTINAS (AGREGADOS) -----------------
+    # Mismas páginas que get_filas_by_user / get_filas_page_by_user, pero sin columnas de ejercicio:
+    # una fila por (rutina, día) con la cantidad de ejercicios, agregada en la DB (GROUP BY).
+    def get_resumen_by_user(self, user_id: int, skip: int = 0, limit: int = 100) -> List[Mapping[str, Any]]:
+        consulta = self._select_resumen(user_id, self._ids_lista(user_id, skip, limit), self._dialecto())
+        return self.session.execute(consulta).mappings().all()
+
+
+    def get_resumen_page_by_user(self, user_id: int, limit: int, despues_de: Optional[Tuple[datetime, int]] = None) -> List[Mapping[str, Any]]:
+        consulta = self._select_resumen(user_id, self._ids_pagina(user_id, limit, despues_de), self._dialecto())
+        return self.session.execute(consulta).mappings().all()
+
+
+    @classmethod
+    def _select_resumen(cls, user_id: int, pagina, dialecto: str):
+        """
+        Conteo de ejercicios por día de las rutinas de la página, en UNA consulta.
+        El conteo por (rutina_id, dia_semana) lo resuelve el índice ix_ejercicio_rutina_dia_orden sin leer las filas de ejercicio.
+        Una rutina sin ejercicios devuelve una sola fila con dia_semana NULL y cantidad 0.
+        """
+        return (
+            select(RutinaDB.id.label("rutina_id"), RutinaDB.nombre.label("rutina_nombre"), RutinaDB.descripcion, RutinaDB.fecha_creacion,
+                   EjercicioDB.dia_semana, func.count(EjercicioDB.id).label("cantidad"))
+            .select_from(RutinaDB)
+            .outerjoin(EjercicioDB, EjercicioDB.rutina_id == RutinaDB.id)
+            .where(RutinaDB.user_id == user_id, RutinaDB.id.in_(pagina.scalar_subquery()))
+            .group_by(RutinaDB.id, RutinaDB.nombre, RutinaDB.descripcion, RutinaDB.fecha_creacion, EjercicioDB.dia_semana)
+            .order_by(RutinaDB.fecha_creacion, RutinaDB.id, cls._orden_dia(dialecto))
+        )
     # ---------------------------------------------------------------------------------------
 
 
     # ------------------------------------- BUSCAR POR ID (FILTRADO) ------------------------
     # CLAVE: Ahora requiere user_id para verificar la propiedad en la DB
     def get_by_id(self, rutina_id: int, user_id: int) -> Optional[Rutina]:
-        rutina_db = self.session.exec( select(RutinaDB).where(RutinaDB.id == rutina_id).where(RutinaDB.user_id == user_id)).first()
+        rutina_db = self.session.exec(self._select_por_id(rutina_id, user_id)).first()
     
         if rutina_db is None:
             return None # Si no encuentra la rutina O no pertenece al usuario, devuelve None.
-        return Mapper.to_domain_entity(rutina_db)
+        rutina = Mapper.to_domain_entity(rutina_db)
+        self._recordar(rutina) # Punto de partida para el guardado diferencial.
+        return rutina
+
+
+    @classmethod
+    def _select_por_id(cls, rutina_id: int, user_id: int):
+        return cls._select_rutinas().where(RutinaDB.id == rutina_id).where(RutinaDB.user_id == user_id)
     # ----------------------------------------------------------------------------------------
 
 
@@ -57,81 +430,120 @@ class RutinaRepository(RutinaRepositoryInterface):
     # CLAVE: Ahora requiere user_id para buscar unicidad solo dentro de las rutinas del usuario
     def get_by_nombre(self, nombre: str, user_id: int) -> Optional[Rutina]:
         """Implementa la búsqueda por nombre, filtrando por user_id."""
-        statement = select(RutinaDB).where( RutinaDB.nombre == nombre, RutinaDB.user_id == user_id)
-        rutina_db = self.session.exec(statement).first()
+        rutina_db = self.session.exec(self._select_por_nombre(nombre, user_id)).first()
         if rutina_db:
             return Mapper.to_domain_entity(rutina_db)
         return None
+
+
+    @classmethod
+    def _select_por_nombre(cls, nombre: str, user_id: int):
+        return cls._select_rutinas().where( RutinaDB.nombre == nombre, RutinaDB.user_id == user_id)
     # -----------------------------------------------------------------------------------------
 
 
     # -------------------------------- BUSQUEDA PARCIAL POR NOMBRE (FILTRADO) -----------------
     # CLAVE: Ahora requiere user_id para buscar solo dentro de las rutinas del usuario
-    def search_by_name(self, termino: str, user_id: int) -> List[Rutina]:
-        """Busca rutinas cuyo nombre contenga el término de búsqueda, filtrando por user_id."""
+    def search_by_name(self, termino: str, user_id: int, limit: int = 50) -> List[Rutina]:
+        """
+        Busca rutinas cuyo nombre contenga el término de búsqueda, filtrando por user_id.
+        En PostgreSQL el LIKE usa el índice trigrama (ix_rutina_nombre_trgm) y los resultados
+        se ordenan por similitud; en SQLite (tests) se ordena por la posición de la coincidencia.
+        """
         if not termino:
-            # Si el término está vacío, devolvemos todas las rutinas del usuario.
-            return self.get_all_by_user(user_id=user_id) 
-        
-        search_pattern = f"%{termino.lower()}%"
-
-        statement = select(RutinaDB).where(func.lower(RutinaDB.nombre).like(search_pattern), RutinaDB.user_id == user_id)
-        rutinas_db = self.session.exec(statement).all()
+            # Si el término está vacío, devolvemos las rutinas del usuario.
+            return self.get_all_by_user(user_id=user_id, limit=limit) 
 
+        rutinas_db = self.session.exec(self._select_busqueda(termino, user_id, limit, self._dialecto())).all()
         return [Mapper.to_domain_entity(r) for r in rutinas_db]
+
+
+    @classmethod
+    def _select_busqueda(cls, termino: str, user_id: int, limit: int, dialecto: str):
+        termino_lower = termino.lower()
+        # Escapamos los comodines para que '%' o '_' en el término se busquen literalmente.
+        search_pattern = "%" + termino_lower.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        nombre_lower = func.lower(RutinaDB.nombre)
+
+        statement = cls._select_rutinas().where(nombre_lower.like(search_pattern, escape="\\"), RutinaDB.user_id == user_id)
+
+        if dialecto == "postgresql":
+            statement = statement.order_by(func.similarity(nombre_lower, termino_lower).desc(), RutinaDB.id)
+        else:
+            statement = statement.order_by(func.instr(nombre_lower, termino_lower), func.length(RutinaDB.nombre), RutinaDB.id)
+        return statement.limit(limit)
     # -----------------------------------------------------------------------------------------
 
 
     # ------------------------------------- DAR DE BAJA UNA RUTINA (FILTRADO) -----------------
     # CLAVE: Ahora requiere user_id para asegurar que solo el dueño puede eliminar
     def delete_by_id(self, rutina_id: int, user_id: int):
-        """Busca el modelo DB por ID y user_id y lo elimina. El ORM debe manejar la cascada."""
-    
-        # Buscar el modelo DB por ID Y user_id
-        statement = select(RutinaDB).where(RutinaDB.id == rutina_id, RutinaDB.user_id == user_id)
-        rutina_db = self.session.exec(statement).first()
-    
-        if not rutina_db:
+        """
+        Elimina la rutina con un único DELETE ... RETURNING filtrado por ID y user_id.
+        Los ejercicios los borra la DB (ON DELETE CASCADE): no se cargan, tenga la rutina 5 o 500.
+        """
+        statement = delete(RutinaDB).where(RutinaDB.id == rutina_id, RutinaDB.user_id == user_id).returning(RutinaDB.id)
+        eliminada = self.session.execute(statement, execution_options={"synchronize_session": False}).scalar_one_or_none()
+
+        if eliminada is None:
             # Usamos ValueError ya que el servicio debe capturar esto y mapear a 404.
+            self.session.rollback()
             raise ValueError(f"Rutina con ID {rutina_id} no encontrada.")
-    
-        self.session.delete(rutina_db)
-        self.session.commit()
+
+        self._confirmar()
+        self._snapshots.pop(rutina_id, None)
     # -----------------------------------------------------------------------------------------
 
     
     # ------------------------------------ ACTUALIZAR EJERCICIO -------------------------------
     def update_by_id(self, ejercicio_id: int, data: dict,  user_id: int) -> Optional[Ejercicio]:
-        """Actualiza un Ejercicio por su ID."""
-        ejercicio_db = self.session.exec(select(EjercicioDB).where(EjercicioDB.id == ejercicio_id).where(EjercicioDB.user_id == user_id)).first()
-        
-        if not ejercicio_db:
-            return None
-
-        for key, value in data.items():
-            if hasattr(ejercicio_db, key) and value is not None:
-                setattr(ejercicio_db, key, value)
-        
-        self.session.add(ejercicio_db)
-        self.session.commit()
-        self.session.refresh(ejercicio_db)
+        """
+        Actualiza un Ejercicio por su ID con un único UPDATE ... RETURNING (sin SELECT previo ni refresh).
+        Solo se escriben los campos editables con valor: id, rutina_id y user_id no se pueden cambiar.
+        """
+        valores = {k: v for k, v in data.items() if k in self._CAMPOS_EJERCICIO_EDITABLES and v is not None}
+        filtro = (EjercicioDB.id == ejercicio_id, EjercicioDB.user_id == user_id)
+        if valores:
+            statement = update(EjercicioDB).where(*filtro).values(**valores).returning(*EjercicioDB.__table__.c)
+        else:
+            statement = select(*EjercicioDB.__table__.c).where(*filtro)
+        fila = self.session.execute(statement, execution_options={"synchronize_session": False}).first()
+        self._confirmar()
 
-        return Mapper.to_domain_entity_ejercicio(ejercicio_db)
+        if fila is None:
+            return None
+        return Mapper.to_domain_entity_ejercicio(fila) # La fila tiene los mismos atributos que EjercicioDB.
     # -----------------------------------------------------------------------------------------
 
     
     # ------------------------------------ ELIMINAR EJERCICIO ---------------------------------
     def delete_by_ejercicio_id(self, ejercicio_id: int, user_id: int) -> bool:
-        """Elimina un Ejercicio por su ID."""
-        ejercicio_db = self.session.exec(select(EjercicioDB).where(EjercicioDB.id == ejercicio_id).where(EjercicioDB.user_id == user_id)).first()
-        
-        if not ejercicio_db:
-            return False
-
-        self.session.delete(ejercicio_db)
-        self.session.commit()
-        return True
+        """Elimina un Ejercicio por su ID con un único DELETE ... RETURNING."""
+        statement = delete(EjercicioDB).where(EjercicioDB.id == ejercicio_id, EjercicioDB.user_id == user_id).returning(EjercicioDB.id)
+        eliminado = self.session.execute(statement, execution_options={"synchronize_session": False}).scalar_one_or_none()
+        self._confirmar()
+        return eliminado is not None
     # -----------------------------------------------------------------------------------------
-        
 
 
+    # ------------------------------------ VERSION DE LAS RUTINAS -----------------------------
+    def get_version(self, user_id: int) -> int:
+        """Versión actual de las rutinas del usuario (0 si todavía no escribió nada). Lectura por PK."""
+        version = self.session.exec(self._select_version(user_id)).first()
+        return version or 0
+
+
+    @staticmethod
+    def _select_version(user_id: int):
+        return select(RutinaVersionDB.version).where(RutinaVersionDB.user_id == user_id)
+
+
+    def incrementar_version(self, user_id: int):
+        """
+        Incrementa la versión con un único upsert (INSERT ... ON CONFLICT DO UPDATE), sin leerla antes.
+        No confirma: se llama dentro de en_transaccion(), junto con la escritura que versiona.
+        """
+        statement = self._insert(RutinaVersionDB).values(user_id=user_id, version=1).on_conflict_do_update(
+            index_elements=[RutinaVersionDB.user_id], set_={"version": RutinaVersionDB.version + 1})
+        self.session.execute(statement)
+    # -----------------------------------------------------------------------------------------
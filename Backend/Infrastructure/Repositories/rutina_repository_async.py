@@ -0,0 +1,138 @@
+from datetime import datetime
+from typing import Optional, List, Any, Dict, Callable, TypeVar, Tuple, AsyncIterator, Awaitable, Mapping
+from sqlmodel.ext.asyncio.session import AsyncSession
+from Domain.Entities.rutina import Rutina
+from Domain.Interfaces.rutina_repository_interface import RutinaRepositoryInterface
+from Domain.Interfaces.rutina_repository_async_interface import AsyncRutinaRepositoryInterface
+from Infrastructure.Repositories.rutina_repository import RutinaRepository
+from Infrastructure.Repositories.rutina_repository_cache import (
+    CachedRutinaRepository, clave_posicion, rutina_a_dict, rutina_desde_dict, fila_a_dict, fila_desde_dict,
+)
+from Infrastructure.Repositories.mapper import Mapper
+from Infrastructure.Cache.cache_backend import CacheBackend
+
+T = TypeVar("T")
+
+class AsyncRutinaRepository(AsyncRutinaRepositoryInterface):
+    """
+    Implementación asíncrona del Repositorio de Rutinas (AsyncSession/asyncpg).
+    Las lecturas esperan la consulta directamente (await session.exec / execute): las sentencias
+    las arma RutinaRepository, así el SQL vive en un solo lugar.
+    Las escrituras se ejecutan con ejecutar(), sobre el repositorio síncrono y la misma conexión.
+    """
+
+    def __init__(self, session: AsyncSession, cache: Optional[CacheBackend] = None, guardar_en_cache: bool = True):
+        self.session = session
+        # Un único repositorio síncrono sobre la sync_session: conserva su estado entre llamadas.
+        self._repositorio: RutinaRepositoryInterface = RutinaRepository(session.sync_session)
+        self._cache: Optional[CachedRutinaRepository] = None
+        if cache is not None:
+            # Las escrituras invalidan a través del decorador; las lecturas de acá usan su misma caché.
+            self._repositorio = self._cache = CachedRutinaRepository(self._repositorio, cache, guardar=guardar_en_cache)
+
+
+    # --------------------------------- UNIDAD DE TRABAJO ---------------------------------
+    async def ejecutar(self, operacion: Callable[[RutinaRepositoryInterface], T]) -> T:
+        """Ejecuta una operación síncrona del repositorio sobre la conexión asíncrona (run_sync)."""
+        return await self.session.run_sync(lambda sync_session: operacion(self._repositorio))
+    # ---------------------------------------------------------------------------------------
+
+
+    def _dialecto(self) -> str:
+        return self.session.sync_session.get_bind().dialect.name
+
+
+    async def _leer(self, user_id: int, clave: str, cargar: Callable[[], Awaitable[Any]],
+                    a_dict: Callable[[Any], Dict[str, Any]] = rutina_a_dict, desde_dict: Callable[[Dict[str, Any]], Any] = rutina_desde_dict) -> Any:
+        """Mismo read-through que CachedRutinaRepository._leer, pero cargando de la DB con await."""
+        if self._cache is None:
+            return await cargar()
+        version = None
+        if self._cache.backend.es_local:
+            version = self._cache.version_recordada(user_id)
+            if version is None:
+                version = await self.get_version(user_id)
+        lectura = self._cache.buscar(user_id, clave, version)
+        if lectura is None:
+            return await cargar()
+        if lectura.valor is not None:
+            return self._cache.decodificar(lectura.valor, desde_dict)
+        resultado = await cargar()
+        self._cache.guardar_lectura(lectura, resultado, a_dict)
+        return resultado
+
+
+    async def _entidades(self, consulta) -> List[Rutina]:
+        return [Mapper.to_domain_entity(r) for r in (await self.session.exec(consulta)).all()]
+
+
+    async def _filas(self, consulta) -> List[Mapping[str, Any]]:
+        return (await self.session.execute(consulta)).mappings().all()
+
+
+    # --------------------------------- LECTURAS ------------------------------------------
+    async def get_all_by_user(self, user_id: int, skip: int = 0, limit: int = 100) -> List[Rutina]:
+        return await self._leer(user_id, f"lista:{skip}:{limit}",
+                                lambda: self._entidades(RutinaRepository._select_lista(user_id, skip, limit)))
+
+    async def get_page_by_user(self, user_id: int, limit: int, despues_de: Optional[Tuple[datetime, int]] = None) -> List[Rutina]:
+        return await self._entidades(RutinaRepository._select_pagina(user_id, limit, despues_de))
+
+    async def iter_export_by_user(self, user_id: int, tamano_lote: int = 1000) -> AsyncIterator[List[Mapping[str, Any]]]:
+        """Misma consulta que RutinaRepository, leída con session.stream (cursor del lado del servidor en asyncpg)."""
+        resultado = await self.session.stream(RutinaRepository._select_export(user_id), execution_options={"yield_per": tamano_lote})
+        try:
+            async for particion in resultado.mappings().partitions():
+                yield particion
+        finally:
+            await resultado.close()
+
+    async def get_filas_by_user(self, user_id: int, skip: int = 0, limit: int = 100) -> List[Mapping[str, Any]]:
+        consulta = RutinaRepository._select_filas(user_id, RutinaRepository._ids_lista(user_id, skip, limit))
+        return await self._leer(user_id, f"filas:lista:{skip}:{limit}", lambda: self._filas(consulta), fila_a_dict, fila_desde_dict)
+
+    async def get_filas_page_by_user(self, user_id: int, limit: int, despues_de: Optional[Tuple[datetime, int]] = None) -> List[Mapping[str, Any]]:
+        consulta = RutinaRepository._select_filas(user_id, RutinaRepository._ids_pagina(user_id, limit, despues_de))
+        return await self._leer(user_id, f"filas:pagina:{limit}:{clave_posicion(despues_de)}", lambda: self._filas(consulta),
+                                fila_a_dict, fila_desde_dict)
+
+    async def get_filas_by_id(self, rutina_id: int, user_id: int) -> List[Mapping[str, Any]]:
+        consulta = RutinaRepository._select_filas_por_id(rutina_id, user_id)
+        return await self._leer(user_id, f"filas:id:{rutina_id}", lambda: self._filas(consulta), fila_a_dict, fila_desde_dict)
+
+    async def get_filas_dias_by_id(self, rutina_id: int, user_id: int) -> List[Mapping[str, Any]]:
+        consulta = RutinaRepository._select_filas_dias(rutina_id, user_id, self._dialecto())
+        return await self._leer(user_id, f"filas:dias:{rutina_id}", lambda: self._filas(consulta), fila_a_dict, fila_desde_dict)
+
+    async def get_resumen_by_user(self, user_id: int, skip: int = 0, limit: int = 100) -> List[Mapping[str, Any]]:
+        consulta = RutinaRepository._select_resumen(user_id, RutinaRepository._ids_lista(user_id, skip, limit), self._dialecto())
+        return await self._leer(user_id, f"resumen:lista:{skip}:{limit}", lambda: self._filas(consulta), fila_a_dict, fila_desde_dict)
+
+    async def get_resumen_page_by_user(self, user_id: int, limit: int, despues_de: Optional[Tuple[datetime, int]] = None) -> List[Mapping[str, Any]]:
+        consulta = RutinaRepository._select_resumen(user_id, RutinaRepository._ids_pagina(user_id, limit, despues_de), self._dialecto())
+        return await self._leer(user_id, f"resumen:pagina:{limit}:{clave_posicion(despues_de)}", lambda: self._filas(consulta),
+                                fila_a_dict, fila_desde_dict)
+
+    async def get_by_id(self, rutina_id: int, user_id: int) -> Optional[Rutina]:
+        async def cargar() -> Optional[Rutina]:
+            rutina_db = (await self.session.exec(RutinaRepository._select_por_id(rutina_id, user_id))).first()
+            return Mapper.to_domain_entity(rutina_db) if rutina_db is not None else None
+        return await self._leer(user_id, f"id:{rutina_id}", cargar)
+
+    async def get_by_nombre(self, nombre: str, user_id: int) -> Optional[Rutina]:
+        async def cargar() -> Optional[Rutina]:
+            rutina_db = (await self.session.exec(RutinaRepository._select_por_nombre(nombre, user_id))).first()
+            return Mapper.to_domain_entity(rutina_db) if rutina_db is not None else None
+        return await self._leer(user_id, f"nombre:{nombre}", cargar)
+
+    async def search_by_name(self, termino: str, user_id: int, limit: int = 50) -> List[Rutina]:
+        if not termino:
+            return await self.get_all_by_user(user_id=user_id, limit=limit) # Igual que RutinaRepository.
+        return await self._entidades(RutinaRepository._select_busqueda(termino, user_id, limit, self._dialecto()))
+
+    async def get_version(self, user_id: int) -> int:
+        version = (await self.session.exec(RutinaRepository._select_version(user_id))).first() or 0
+        if self._cache is not None:
+            self._cache.recordar_version(user_id, version) # La clave de caché de este request usa la misma versión.
+        return version
+    # ---------------------------------------------------------------------------------------
@@ -0,0 +1,267 @@
+import json
+import logging
+from datetime import datetime
+from typing import Optional, List, Any, Dict, Tuple, Set, Iterator, Mapping, Callable, TypeVar
+from Domain.Entities.rutina import Rutina
+from Domain.Entities.ejercicio import Ejercicio
+from Domain.ValueObjects.dias import dia_semana
+from Domain.Interfaces.rutina_repository_interface import RutinaRepositoryInterface
+from Infrastructure.Cache.cache_backend import CacheBackend
+
+logger = logging.getLogger("pokegym.cache")
+T = TypeVar("T")
+
+
+# ------------------------------------- SERIALIZACION DEL AGREGADO ------------------------------
+# Se guarda JSON (no pickle): el backend puede ser un servidor compartido.
+def rutina_a_dict(rutina: Rutina) -> Dict[str, Any]:
+    return {
+        "id": rutina.id, "user_id": rutina.user_id, "nombre": rutina.nombre, "descripcion": rutina.descripcion,
+        "fecha_creacion": rutina.fecha_creacion.isoformat(),
+        "ejercicios": [{"id": e.id, "rutina_id": e.rutina_id, "user_id": e.user_id, "nombre": e.nombre,
+                        "dia_semana": e.dia_semana.value, "series": e.series, "repeticiones": e.repeticiones,
+                        "peso": e.peso, "notas": e.notas, "orden": e.orden} for e in rutina.ejercicios],
+    }
+
+
+def rutina_desde_dict(datos: Dict[str, Any]) -> Rutina:
+    ejercicios = [Ejercicio(**e) for e in datos["ejercicios"]] # Ejercicio convierte el texto del día al miembro del Enum.
+    return Rutina(id=datos["id"], user_id=datos["user_id"], nombre=datos["nombre"], descripcion=datos["descripcion"],
+                  fecha_creacion=datetime.fromisoformat(datos["fecha_creacion"]), ejercicios=ejercicios)
+
+
+def fila_a_dict(fila: Mapping[str, Any]) -> Dict[str, Any]:
+    datos = dict(fila)
+    datos["fecha_creacion"] = datos["fecha_creacion"].isoformat()
+    if datos["dia_semana"] is not None:
+        datos["dia_semana"] = datos["dia_semana"].value
+    return datos
+
+
+def fila_desde_dict(datos: Dict[str, Any]) -> Dict[str, Any]:
+    datos["fecha_creacion"] = datetime.fromisoformat(datos["fecha_creacion"])
+    if datos["dia_semana"] is not None:
+        datos["dia_semana"] = dia_semana(datos["dia_semana"])
+    return datos
+
+
+def clave_posicion(despues_de: Optional[Tuple[datetime, int]]) -> str:
+    """Parte de la clave de caché de una página keyset."""
+    return f"{despues_de[0].isoformat()}:{despues_de[1]}" if despues_de is not None else "inicio"
+# -----------------------------------------------------------------------------------------------
+
+
+class LecturaCacheada:
+    """Resultado de buscar(): dónde guardar lo que se cargue de la DB y el valor cacheado (None si no estaba)."""
+    __slots__ = ("espacio", "generacion", "clave", "valor")
+
+    def __init__(self, espacio: str, generacion: int, clave: str, valor: Optional[str]):
+        self.espacio = espacio
+        self.generacion = generacion
+        self.clave = clave
+        self.valor = valor
+
+
+class CachedRutinaRepository(RutinaRepositoryInterface):
+    """
+    Decorador de cualquier RutinaRepositoryInterface que cachea get_by_id, get_by_nombre, get_all_by_user
+    y las lecturas en filas y de resumen por usuario (read-through). Toda escritura invalida las entradas del usuario después de confirmarse.
+    Cada lectura devuelve Entidades nuevas (se deserializan), así los Casos de Uso pueden modificarlas.
+    Si el backend falla, se lee directo del repositorio envuelto: la caché nunca corta un request.
+    Con guardar=False solo lee de la caché: se usa cuando el repositorio lee de una réplica, cuyos datos
+    pueden estar atrasados respecto de la última invalidación y no deben quedar cacheados.
+    Dentro de en_transaccion() las lecturas van al repositorio y las invalidaciones se difieren hasta el final.
+    Con un backend local (por proceso), la clave incluye la versión de las rutinas leída de la DB: otro worker
+    no ve las invalidaciones de este, pero sus escrituras cambian la versión, así que un cuerpo viejo nunca
+    sale con el ETag nuevo. La versión se lee una vez por request (la misma que arma el ETag).
+    """
+
+    def __init__(self, repositorio: RutinaRepositoryInterface, backend: CacheBackend, guardar: bool = True):
+        self.repositorio = repositorio
+        self.backend = backend
+        self.guardar = guardar
+        self._pendientes: Optional[Set[int]] = None # Usuarios escritos dentro de en_transaccion() (None = fuera de una).
+        self._versiones: Dict[int, int] = {} # Versión de la DB ya leída en este request, por usuario.
+
+
+    # --------------------------------- LECTURAS CACHEADAS --------------------------------------
+    def get_by_id(self, rutina_id: int, user_id: int) -> Optional[Rutina]:
+        return self._leer(user_id, f"id:{rutina_id}", lambda: self.repositorio.get_by_id(rutina_id, user_id))
+
+    def get_by_nombre(self, nombre: str, user_id: int) -> Optional[Rutina]:
+        return self._leer(user_id, f"nombre:{nombre}", lambda: self.repositorio.get_by_nombre(nombre, user_id))
+
+    def get_all_by_user(self, user_id: int, skip: int = 0, limit: int = 100) -> List[Rutina]:
+        return self._leer(user_id, f"lista:{skip}:{limit}", lambda: self.repositorio.get_all_by_user(user_id=user_id, skip=skip, limit=limit))
+
+    def get_filas_by_user(self, user_id: int, skip: int = 0, limit: int = 100) -> List[Mapping[str, Any]]:
+        return self._leer(user_id, f"filas:lista:{skip}:{limit}", lambda: self.repositorio.get_filas_by_user(user_id, skip, limit),
+                          fila_a_dict, fila_desde_dict)
+
+    def get_filas_page_by_user(self, user_id: int, limit: int, despues_de: Optional[Tuple[datetime, int]] = None) -> List[Mapping[str, Any]]:
+        return self._leer(user_id, f"filas:pagina:{limit}:{clave_posicion(despues_de)}", lambda: self.repositorio.get_filas_page_by_user(user_id, limit, despues_de),
+                          fila_a_dict, fila_desde_dict)
+
+    def get_filas_by_id(self, rutina_id: int, user_id: int) -> List[Mapping[str, Any]]:
+        return self._leer(user_id, f"filas:id:{rutina_id}", lambda: self.repositorio.get_filas_by_id(rutina_id, user_id),
+                          fila_a_dict, fila_desde_dict)
+
+    def get_filas_dias_by_id(self, rutina_id: int, user_id: int) -> List[Mapping[str, Any]]:
+        return self._leer(user_id, f"filas:dias:{rutina_id}", lambda: self.repositorio.get_filas_dias_by_id(rutina_id, user_id),
+                          fila_a_dict, fila_desde_dict)
+
+    def get_resumen_by_user(self, user_id: int, skip: int = 0, limit: int = 100) -> List[Mapping[str, Any]]:
+        return self._leer(user_id, f"resumen:lista:{skip}:{limit}", lambda: self.repositorio.get_resumen_by_user(user_id, skip, limit),
+                          fila_a_dict, fila_desde_dict)
+
+    def get_resumen_page_by_user(self, user_id: int, limit: int, despues_de: Optional[Tuple[datetime, int]] = None) -> List[Mapping[str, Any]]:
+        return self._leer(user_id, f"resumen:pagina:{limit}:{clave_posicion(despues_de)}", lambda: self.repositorio.get_resumen_page_by_user(user_id, limit, despues_de),
+                          fila_a_dict, fila_desde_dict)
+
+
+    def _leer(self, user_id: int, clave: str, cargar: Callable[[], Any],
+              a_dict: Callable[[Any], Dict[str, Any]] = rutina_a_dict, desde_dict: Callable[[Dict[str, Any]], Any] = rutina_desde_dict) -> Any:
+        """Devuelve el valor cacheado o lo carga del repositorio y lo guarda. Los None no se cachean."""
+        version = None
+        if self._pendientes is None and self.backend.es_local:
+            # Se lee ANTES que los datos: lo cargado es de esta versión o de una posterior, nunca anterior.
+            version = self.version_recordada(user_id)
+            if version is None:
+                version = self.get_version(user_id)
+        lectura = self.buscar(user_id, clave, version)
+        if lectura is None:
+            return cargar()
+        if lectura.valor is not None:
+            return self.decodificar(lectura.valor, desde_dict)
+        resultado = cargar()
+        self.guardar_lectura(lectura, resultado, a_dict)
+        return resultado
+
+
+    # Pasos de _leer, públicos para AsyncRutinaRepository (que carga de la DB con await).
+    def version_recordada(self, user_id: int) -> Optional[int]:
+        """Versión de la DB ya leída en este request (None si hay que leerla)."""
+        return self._versiones.get(user_id)
+
+
+    def recordar_version(self, user_id: int, version: int):
+        self._versiones[user_id] = version
+
+
+    def buscar(self, user_id: int, clave: str, version: Optional[int] = None) -> Optional[LecturaCacheada]:
+        """
+        Busca la clave en la caché. Devuelve None si hay que leer de la DB sin guardar: dentro de una
+        transacción (la caché no tiene lo escrito y todavía no confirmado, y lo leído podría revertirse)
+        o si el backend falló. Con un backend local, 'version' es la versión de la DB (se lee antes que los datos).
+        """
+        if self._pendientes is not None:
+            return None
+        espacio = f"rutinas:{user_id}"
+        if version is not None:
+            clave = f"v{version}:{clave}"
+        try:
+            # La generación se lee ANTES de ir a la DB: si hay una escritura en el medio, el set se descarta.
+            generacion = self.backend.generacion(espacio)
+            return LecturaCacheada(espacio, generacion, clave, self.backend.get(espacio, generacion, clave))
+        except Exception as e:
+            logger.warning("Caché de rutinas no disponible (%s): se lee de la DB.", e)
+            return None
+
+
+    @staticmethod
+    def decodificar(valor: str, desde_dict: Callable[[Dict[str, Any]], Any] = rutina_desde_dict) -> Any:
+        datos = json.loads(valor)
+        return [desde_dict(d) for d in datos] if isinstance(datos, list) else desde_dict(datos)
+
+
+    def guardar_lectura(self, lectura: LecturaCacheada, resultado: Any, a_dict: Callable[[Any], Dict[str, Any]] = rutina_a_dict):
+        """Guarda lo cargado de la DB en el lugar que reservó buscar()."""
+        if resultado is None or not self.guardar:
+            return
+        datos = [a_dict(r) for r in resultado] if isinstance(resultado, list) else a_dict(resultado)
+        try:
+            self.backend.set(lectura.espacio, lectura.generacion, lectura.clave, json.dumps(datos, separators=(",", ":")))
+        except Exception as e:
+            logger.warning("No se pudo guardar en la caché de rutinas (%s).", e)
+    # -------------------------------------------------------------------------------------------
+
+
+    # --------------------------------- ESCRITURAS (INVALIDAN) ----------------------------------
+    def save(self, rutina: Rutina) -> Rutina:
+        resultado = self.repositorio.save(rutina)
+        self._invalidar(rutina.user_id)
+        return resultado
+
+    def save_many(self, rutinas: List[Rutina]) -> List[Rutina]:
+        resultado = self.repositorio.save_many(rutinas)
+        for user_id in {r.user_id for r in rutinas}:
+            self._invalidar(user_id)
+        return resultado
+
+    def delete_by_id(self, rutina_id: int, user_id: int):
+        try:
+            return self.repositorio.delete_by_id(rutina_id, user_id)
+        finally:
+            self._invalidar(user_id)
+
+    def update_by_id(self, ejercicio_id: int, data: Dict[str, Any], user_id: int) -> Optional[Ejercicio]:
+        resultado = self.repositorio.update_by_id(ejercicio_id, data, user_id)
+        if resultado is not None:
+            self._invalidar(user_id)
+        return resultado
+
+    def delete_by_ejercicio_id(self, ejercicio_id: int, user_id: int) -> bool:
+        eliminado = self.repositorio.delete_by_ejercicio_id(ejercicio_id, user_id)
+        if eliminado:
+            self._invalidar(user_id)
+        return eliminado
+
+
+    def en_transaccion(self, trabajo: Callable[[], T]) -> T:
+        """Las invalidaciones se hacen al terminar la transacción, cuando los cambios ya son visibles para los demás."""
+        if self._pendientes is not None:
+            return trabajo() # Transacción ya abierta: invalida quien la abrió.
+        self._pendientes = set()
+        try:
+            return self.repositorio.en_transaccion(trabajo)
+        finally:
+            pendientes, self._pendientes = self._pendientes, None
+            for user_id in pendientes:
+                self._invalidar(user_id)
+
+
+    def _invalidar(self, user_id: int):
+        self._versiones.pop(user_id, None) # La escritura incrementa la versión: se vuelve a leer.
+        if self._pendientes is not None:
+            self._pendientes.add(user_id)
+            return
+        try:
+            self.backend.invalidar(f"rutinas:{user_id}")
+        except Exception as e:
+            # La escritura ya se confirmó: no se falla el request, las entradas vencen por TTL.
+            logger.error("No se pudo invalidar la caché de rutinas del usuario %s (%s).", user_id, e)
+    # -------------------------------------------------------------------------------------------
+
+
+    # --------------------------------- SIN CACHÉ (DELEGAN) -------------------------------------
+    def get_nombres_existentes(self, nombres: List[str], user_id: int) -> Set[str]:
+        return self.repositorio.get_nombres_existentes(nombres, user_id)
+
+    def get_page_by_user(self, user_id: int, limit: int, despues_de: Optional[Tuple[datetime, int]] = None) -> List[Rutina]:
+        return self.repositorio.get_page_by_user(user_id, limit, despues_de)
+
+    def iter_export_by_user(self, user_id: int, tamano_lote: int = 1000) -> Iterator[List[Mapping[str, Any]]]:
+        return self.repositorio.iter_export_by_user(user_id, tamano_lote)
+
+    def search_by_name(self, termino: str, user_id: int, limit: int = 50) -> List[Rutina]:
+        return self.repositorio.search_by_name(termino, user_id, limit)
+
+    def get_version(self, user_id: int) -> int:
+        version = self.repositorio.get_version(user_id)
+        self.recordar_version(user_id, version)
+        return version
+
+    def incrementar_version(self, user_id: int):
+        self._versiones.pop(user_id, None)
+        return self.repositorio.incrementar_version(user_id)
+    # -------------------------------------------------------------------------------------------
@@ -1,4 +1,5 @@
 from sqlmodel import Session, select
+from sqlalchemy import update
 from typing import Optional, List
 from Domain.Entities.user import User
 from Domain.Interfaces.user_repository_interface import UserRepositoryInterface
@@ -46,4 +47,30 @@ class UserRepository(UserRepositoryInterface):
         if user_db:
             return Mapper.to_domain_entity_user(user_db)
         return None
-    # --------------------------------------------------------------------------------------
\ No newline at end of file
+    # --------------------------------------------------------------------------------------
+
+
+    # ---------------------------------- ACTIVAR / DESACTIVAR USUARIO ----------------------
+    def set_active(self, user_id: int, is_active: bool) -> bool:
+        """Cambia el estado is_active del usuario. Devuelve False si no existe."""
+        user_db = self.session.get(UserDB, user_id)
+
+        if not user_db:
+            return False
+
+        user_db.is_active = is_active
+        self.session.add(user_db)
+        self.session.commit()
+        return True
+    # --------------------------------------------------------------------------------------
+
+
+    # ---------------------------------- ACTUALIZAR HASH DE LA CONTRASEÑA ------------------
+    def update_password(self, user_id: int, hashed_password: str) -> bool:
+        """UPDATE directo del hash (sin cargar el usuario). Devuelve False si no existe."""
+        resultado = self.session.execute(
+            update(UserDB).where(UserDB.id == user_id).values(hashed_password=hashed_password)
+        )
+        self.session.commit()
+        return resultado.rowcount > 0
+    # --------------------------------------------------------------------------------------
@@ -0,0 +1,65 @@
+from sqlmodel import select
+from sqlalchemy import update
+from typing import Optional
+from sqlmodel.ext.asyncio.session import AsyncSession
+from Domain.Entities.user import User
+from Domain.Interfaces.user_repository_async_interface import AsyncUserRepositoryInterface
+from Infrastructure.Repositories.models_db import UserDB
+from Infrastructure.Repositories.mapper import Mapper
+
+class AsyncUserRepository(AsyncUserRepositoryInterface):
+    """
+    Implementación asíncrona del Repositorio de Usuarios (AsyncSession/asyncpg).
+    Mismas consultas que UserRepository, esperadas directamente sobre la sesión asíncrona.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+
+    # ---------------------------------- CREAR USUARIO -------------------------------------
+    async def create_user(self, user_entity: User) -> User:
+        """Persiste una Entidad User en la base de datos."""
+        user_db = Mapper.to_db_model_user(user_entity)
+        self.session.add(user_db)
+        await self.session.commit()
+        await self.session.refresh(user_db)
+        return Mapper.to_domain_entity_user(user_db)
+    # --------------------------------------------------------------------------------------
+
+
+    # ---------------------------------- BUSCAR USUARIO ------------------------------------
+    async def get_by_username(self, username: str) -> Optional[User]:
+        """Busca una Entidad User por nombre de usuario."""
+        user_db = (await self.session.exec(select(UserDB).where(UserDB.username == username))).first()
+        return Mapper.to_domain_entity_user(user_db) if user_db else None
+
+    async def get_by_id(self, user_id: int) -> Optional[User]:
+        """Busca una Entidad User por ID (necesario para la verificación de JWT)."""
+        user_db = await self.session.get(UserDB, user_id)
+        return Mapper.to_domain_entity_user(user_db) if user_db else None
+    # --------------------------------------------------------------------------------------
+
+
+    # ---------------------------------- ACTIVAR / DESACTIVAR USUARIO ----------------------
+    async def set_active(self, user_id: int, is_active: bool) -> bool:
+        """Cambia el estado is_active del usuario. Devuelve False si no existe."""
+        user_db = await self.session.get(UserDB, user_id)
+        if not user_db:
+            return False
+        user_db.is_active = is_active
+        self.session.add(user_db)
+        await self.session.commit()
+        return True
+    # --------------------------------------------------------------------------------------
+
+
+    # ---------------------------------- ACTUALIZAR HASH DE LA CONTRASEÑA ------------------
+    async def update_password(self, user_id: int, hashed_password: str) -> bool:
+        """UPDATE directo del hash (sin cargar el usuario). Devuelve False si no existe."""
+        resultado = await self.session.execute(
+            update(UserDB).where(UserDB.id == user_id).values(hashed_password=hashed_password)
+        )
+        await self.session.commit()
+        return resultado.rowcount > 0
+    # --------------------------------------------------------------------------------------
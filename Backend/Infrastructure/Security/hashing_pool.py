@@ -0,0 +1,99 @@
+import asyncio
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+from passlib.context import CryptContext
+from Infrastructure.Monitoring.metrics import HASHING_RECHAZOS
+
+
+class HashingPoolSaturadoError(Exception):
+    """Excepción lanzada cuando el pool de hashing no acepta más trabajos (se responde 503 de inmediato)."""
+    pass
+
+
+# ------------------------------------ CÓDIGO QUE CORRE EN LOS WORKERS --------------------------
+# Cada proceso del pool arma su propio CryptContext una sola vez (initializer).
+_CONTEXTO_WORKER: Optional[CryptContext] = None
+
+def _inicializar_worker(config_contexto: Dict[str, Any]):
+    global _CONTEXTO_WORKER
+    _CONTEXTO_WORKER = CryptContext(**config_contexto)
+
+def hash_en_worker(password: str) -> str:
+    return _CONTEXTO_WORKER.hash(password)
+
+def verify_and_update_en_worker(password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return _CONTEXTO_WORKER.verify_and_update(password, hashed_password)
+# -----------------------------------------------------------------------------------------------
+
+
+class HashingPool:
+    """
+    Pool de procesos dedicado al hashing argon2 (CPU intensivo), separado de los workers de la API.
+    Acepta como máximo 'workers + max_queue' trabajos en curso: si está lleno, rechaza al instante
+    con HashingPoolSaturadoError en lugar de encolar y dejar que la latencia crezca sin límite.
+    """
+
+    def __init__(self, workers: int, max_queue: int, config_contexto: Dict[str, Any]):
+        self.workers = workers
+        self.capacidad = workers + max_queue
+        self._config_contexto = config_contexto
+        self._pendientes = 0
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+
+    # ----------------------------------- ENVIAR UN TRABAJO ----------------------------------------
+    def submit(self, funcion: Callable, *args) -> Future:
+        """Envía el trabajo al pool o lanza HashingPoolSaturadoError si no hay lugar."""
+        with self._lock:
+            if self._pendientes >= self.capacidad:
+                HASHING_RECHAZOS.inc()
+                raise HashingPoolSaturadoError("El servicio de autenticación está saturado, intente nuevamente.")
+            self._pendientes += 1
+            executor = self._get_executor()
+        try:
+            futuro = executor.submit(funcion, *args)
+        except Exception:
+            self._liberar()
+            raise
+        futuro.add_done_callback(self._liberar)
+        return futuro
+
+    def ejecutar(self, funcion: Callable, *args) -> Any:
+        """Versión bloqueante (rutas sync, desde el threadpool)."""
+        return self.submit(funcion, *args).result()
+
+    async def ejecutar_async(self, funcion: Callable, *args) -> Any:
+        """Versión asíncrona: espera el resultado sin ocupar un hilo."""
+        return await asyncio.wrap_future(self.submit(funcion, *args))
+    # ----------------------------------------------------------------------------------------------
+
+
+    def stats(self) -> Dict[str, int]:
+        """Trabajos en curso (ejecutándose o en cola) y capacidad máxima."""
+        with self._lock:
+            return {"pendientes": self._pendientes, "capacidad": self.capacidad, "workers": self.workers}
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # Se crea al primer uso. 'spawn' evita hacer fork de un proceso con hilos (threadpool, event loop).
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_inicializar_worker,
+                initargs=(self._config_contexto,),
+            )
+        return self._executor
+
+    def _liberar(self, _futuro: Optional[Future] = None):
+        with self._lock:
+            self._pendientes -= 1
@@ -9,6 +9,10 @@ from datetime import datetime, timedelta, timezone
 from Domain.Entities.user import User
 from Domain.Exceptions.domain_exception import ValueError 
 from Domain.Interfaces.auth_service_interface import AuthServiceInterface
+from Application.DTOs.auth_dto import TokenPayload
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from Infrastructure.database import get_session, get_async_session
 
 
 # El tokenUrl apunta al endpoint que el cliente debe usar para obtener el token.
@@ -17,12 +21,20 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/token") # Definimos el
 
 
 # ----------------------- DECODIFICAR UN TOKEN (DEVOLVEMOS UN USUARIO) ----------------------
-def get_current_user(token: str = Depends(oauth2_scheme) ) -> User:
-    """Decodifica el token y devuelve el objeto User si es válido."""
-    from Infrastructure.deps import get_auth_service 
-    
-    # Llamada directa para obtener la instancia del servicio:
-    auth_service = get_auth_service() 
+def get_current_user(token: str = Depends(oauth2_scheme), session: Session = Depends(get_session)) -> User:
+    """
+    Decodifica el token y devuelve el objeto User si es válido.
+    Usa la sesión del request (compartida con rutinas): un request autenticado toma una sola conexión del pool.
+    """
+    from Infrastructure.deps import get_auth_service, get_user_repository, get_user_cache
+
+    # Token "caliente": ni decodificamos el JWT ni vamos a la DB.
+    user = get_user_cache().get_by_token(token)
+    if user is not None:
+        return user
+
+    # Llamada directa para obtener la instancia del servicio (con la sesión del request):
+    auth_service = get_auth_service(user_repo=get_user_repository(session=session))
 
     user = auth_service.get_user_from_token(token=token)
     
@@ -37,6 +49,30 @@ def get_current_user(token: str = Depends(oauth2_scheme) ) -> User:
 # -------------------------------------------------------------------------------------------
 
 
+# ------------------- DECODIFICAR UN TOKEN EN MODO ASÍNCRONO (DB_ASYNC_MODE) ----------------
+async def get_current_user_async(token: str = Depends(oauth2_scheme), session: AsyncSession = Depends(get_async_session)) -> User:
+    """Igual que get_current_user, pero usando la AsyncSession del request (compartida con rutinas)."""
+    from Infrastructure.deps import get_async_auth_service, get_async_user_repository, get_user_cache
+
+    user = get_user_cache().get_by_token(token)
+    if user is not None:
+        return user
+
+    auth_service = get_async_auth_service(user_repo=get_async_user_repository(session=session))
+
+    user = await auth_service.get_user_from_token(token=token)
+
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Credenciales inválidas o token expirado.",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    return user
+# -------------------------------------------------------------------------------------------
+
+
 class JWTHandler:
     """
     Utilitario de Infraestructura para la codificación y decodificación de JWT.
@@ -74,6 +110,17 @@ class JWTHandler:
         Decodifica y valida el token JWT. 
         Devuelve el ID del usuario (sub) o None/lanza error si no es válido.
         """
+        payload = self.decode_payload(token)
+        return payload.sub if payload else None
+    # -------------------------------------------------------------------------------------------
+
+
+    # ----------------------- DECODIFICAR UN JWT (DEVOLVEMOS EL PAYLOAD) ------------------------
+    def decode_payload(self, token: str) -> Optional[TokenPayload]:
+        """
+        Decodifica y valida el token JWT.
+        Devuelve el payload (sub y exp) o None si no es válido; exp se usa para no cachear más allá del vencimiento.
+        """
         try:
             # Decodificar (Verifica la firma, la expiración y el algoritmo).
             payload = jwt.decode( token, self.secret_key, algorithms=[self.algorithm])
@@ -83,7 +130,7 @@ class JWTHandler:
             if user_id is None:
                 raise ValueError("Token no contiene el ID del sujeto (sub).")
             # user_id se devuelve como string, lo convertimos a int para usarlo en el Servicio.
-            return int(user_id) 
+            return TokenPayload(sub=int(user_id), exp=payload.get("exp"))
 
         except JWTError:
             # Captura errores como token inválido, firma incorrecta, o token expirado.
@@ -92,8 +139,3 @@ class JWTHandler:
             # Captura cualquier otro error, como error de casting.
             return None
     # -------------------------------------------------------------------------------------------
-
-
-
-
-
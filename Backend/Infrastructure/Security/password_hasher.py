@@ -1,19 +1,34 @@
+import asyncio
+from typing import Optional, Tuple
 from passlib.context import CryptContext
+from Infrastructure.Security.hashing_pool import HashingPool, hash_en_worker, verify_and_update_en_worker
+from Infrastructure.Monitoring.metrics import HASHING_SEGUNDOS
 
 class PasswordHasher:
     """
     Utilidad de Infraestructura para manejar las operaciones criptográficas.
+    Si recibe un HashingPool, el trabajo argon2 se ejecuta en ese pool de procesos (y no en el worker de la API).
     """
 
-    def __init__(self, context: CryptContext): # <-- RECIBE EL CONTEXTO INYECTADO
+    def __init__(self, context: CryptContext, pool: Optional[HashingPool] = None): # <-- RECIBE EL CONTEXTO INYECTADO
         self.context = context
+        self.pool = pool
     
     # ---------------------------------- ENCRIPTANDO LA PWD -------------------------------------
     def hash_password(self, password: str) -> str:
         """
         Genera el hash seguro de la contraseña dada.
         """
-        return self.context.hash(password)
+        with HASHING_SEGUNDOS.labels("hash").time():
+            if self.pool is None:
+                return self.context.hash(password)
+            return self.pool.ejecutar(hash_en_worker, password)
+
+    async def hash_password_async(self, password: str) -> str:
+        with HASHING_SEGUNDOS.labels("hash").time():
+            if self.pool is None:
+                return await asyncio.to_thread(self.context.hash, password)
+            return await self.pool.ejecutar_async(hash_en_worker, password)
     # -------------------------------------------------------------------------------------------
 
    
@@ -22,6 +37,22 @@ class PasswordHasher:
         """
         Verifica si la contraseña plana (plain_password) coincide con el hash almacenado.
         """
-        return self.context.verify(plain_password, hashed_password)
-    # -------------------------------------------------------------------------------------------
+        valido, _ = self.verify_and_update(plain_password, hashed_password)
+        return valido
+
+    def verify_and_update(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """
+        Verifica la contraseña y, si el hash fue generado con otros parámetros (needs_update),
+        devuelve también el hash nuevo para guardarlo. Ej: (True, None) o (True, "$argon2id$...").
+        """
+        with HASHING_SEGUNDOS.labels("verify").time():
+            if self.pool is None:
+                return self.context.verify_and_update(plain_password, hashed_password)
+            return self.pool.ejecutar(verify_and_update_en_worker, plain_password, hashed_password)
 
+    async def verify_and_update_async(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        with HASHING_SEGUNDOS.labels("verify").time():
+            if self.pool is None:
+                return await asyncio.to_thread(self.context.verify_and_update, plain_password, hashed_password)
+            return await self.pool.ejecutar_async(verify_and_update_en_worker, plain_password, hashed_password)
+    # -------------------------------------------------------------------------------------------
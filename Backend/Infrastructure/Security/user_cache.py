@@ -0,0 +1,122 @@
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
+from Domain.Entities.user import User
+
+
+class UserCache:
+    """
+    Caché en memoria (LRU + TTL) de usuarios autenticados.
+    Guarda token -> User (evita decodificar el JWT) y user_id -> User (evita ir a la DB).
+    Es por proceso: con varios workers, una desactivación tarda como máximo el TTL en verse en los demás.
+    """
+
+    def __init__(self, max_size: int = 10_000, ttl_seconds: float = 30.0):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._tokens: "OrderedDict[str, Tuple[User, float]]" = OrderedDict()  # token -> (user, expira)
+        self._users: "OrderedDict[int, Tuple[User, float]]" = OrderedDict()   # user_id -> (user, expira)
+        self._tokens_por_usuario: Dict[int, Set[str]] = {}                    # Para invalidar todos los tokens de un usuario.
+        self._lock = threading.Lock() # Las rutas síncronas corren en el threadpool.
+        self.hits = 0
+        self.misses = 0
+
+
+    # ---------------------------------- BUSCAR POR TOKEN ---------------------------------------
+    def get_by_token(self, token: str) -> Optional[User]:
+        """Devuelve el usuario asociado a un token ya validado, o None si no está o expiró."""
+        with self._lock:
+            entrada = self._tokens.get(token)
+            if entrada is None or entrada[1] <= time.time():
+                if entrada is not None:
+                    self._quitar_token(token, entrada[0].id)
+                self.misses += 1
+                return None
+            self._tokens.move_to_end(token)
+            self.hits += 1
+            return entrada[0]
+    # -------------------------------------------------------------------------------------------
+
+
+    # ---------------------------------- BUSCAR POR ID ------------------------------------------
+    def get_by_user_id(self, user_id: int) -> Optional[User]:
+        """Devuelve el usuario por ID (otro token del mismo usuario), o None si no está o expiró."""
+        with self._lock:
+            entrada = self._users.get(user_id)
+            if entrada is None or entrada[1] <= time.time():
+                if entrada is not None:
+                    del self._users[user_id]
+                return None
+            self._users.move_to_end(user_id)
+            return entrada[0]
+    # -------------------------------------------------------------------------------------------
+
+
+    # ---------------------------------- GUARDAR ------------------------------------------------
+    def put(self, token: str, user: User, token_exp: Optional[float] = None):
+        """
+        Guarda el usuario para el token. La entrada nunca vive más que el propio token (exp),
+        así un token vencido no puede seguir autenticando desde la caché.
+        """
+        expira = time.time() + self.ttl_seconds
+        if token_exp is not None:
+            expira = min(expira, token_exp)
+
+        with self._lock:
+            self._tokens[token] = (user, expira)
+            self._tokens.move_to_end(token)
+            self._tokens_por_usuario.setdefault(user.id, set()).add(token)
+            self._users[user.id] = (user, time.time() + self.ttl_seconds)
+            self._users.move_to_end(user.id)
+
+            # Desalojo LRU cuando se supera el tamaño máximo.
+            while len(self._tokens) > self.max_size:
+                token_viejo, (user_viejo, _) = self._tokens.popitem(last=False)
+                self._quitar_token(token_viejo, user_viejo.id)
+            while len(self._users) > self.max_size:
+                self._users.popitem(last=False)
+    # -------------------------------------------------------------------------------------------
+
+
+    # ---------------------------------- INVALIDAR ----------------------------------------------
+    def invalidate_user(self, user_id: int):
+        """Elimina al usuario y todos sus tokens (p. ej. al desactivarlo)."""
+        with self._lock:
+            self._users.pop(user_id, None)
+            for token in self._tokens_por_usuario.pop(user_id, set()):
+                self._tokens.pop(token, None)
+
+
+    def clear(self):
+        with self._lock:
+            self._tokens.clear()
+            self._users.clear()
+            self._tokens_por_usuario.clear()
+            self.hits = 0
+            self.misses = 0
+    # -------------------------------------------------------------------------------------------
+
+
+    # ---------------------------------- ESTADISTICAS -------------------------------------------
+    def stats(self) -> Dict[str, float]:
+        """Aciertos, fallos, tasa de acierto y tamaño actual de la caché."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / total) if total else 0.0,
+                "size": len(self._tokens),
+            }
+    # -------------------------------------------------------------------------------------------
+
+
+    def _quitar_token(self, token: str, user_id: int):
+        """Quita un token de los índices (se llama con el lock tomado)."""
+        self._tokens.pop(token, None)
+        tokens = self._tokens_por_usuario.get(user_id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_por_usuario[user_id]
@@ -0,0 +1,16 @@
+import inspect
+from typing import Any, Callable
+from starlette.concurrency import run_in_threadpool
+
+
+# ------------------------------- Ejecutar un Caso de Uso ------------------------------------
+async def ejecutar(funcion: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Ejecuta un método de Servicio desde una ruta async sin bloquear el event loop.
+    Los servicios asíncronos (DB_ASYNC_MODE) se esperan directamente; los síncronos
+    (psycopg2) se ejecutan en el threadpool, igual que una ruta 'def'.
+    """
+    if inspect.iscoroutinefunction(funcion):
+        return await funcion(*args, **kwargs)
+    return await run_in_threadpool(funcion, *args, **kwargs)
+# --------------------------------------------------------------------------------------------
@@ -1,8 +1,20 @@
 import os
-from typing import Generator
-from sqlalchemy.pool import QueuePool
-from sqlmodel import Session, create_engine, SQLModel
+import time
+import uuid
+import itertools
+import threading
+from typing import Generator, AsyncGenerator, Optional, List, Dict, Union
+from fastapi import Request
+from sqlalchemy import event, make_url
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlmodel import Session, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlmodel.sql.expression import Select, SelectOfScalar
+from config import settings
+from Infrastructure.Monitoring.metrics import InstrumentedQueuePool, InstrumentedAsyncAdaptedQueuePool, InstrumentedNullPool, registrar_engine, contar_sesion
+from Infrastructure.Repositories.models_db import UserDB
+from Infrastructure.migraciones import migrar, revision_actual, revision_esperada
 
 # Deshabilita una advertencia común de SQLModel/SQLAlchemy
 SelectOfScalar.inherit_cache = True
@@ -19,43 +31,232 @@ POSTGRES_DB = os.environ.get("POSTGRES_DB", "BaseRutina")
 # Construcción de la URL de conexión.
 DATABASE_URL = os.environ.get("DATABASE_URL") or f"postgresql+psycopg2://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_SERVER}:{POSTGRES_PORT}/{POSTGRES_DB}"
 
-# El motor debe ser global y creado solo una vez.
-engine = create_engine(DATABASE_URL, echo=True,  
-    poolclass=QueuePool,
-    pool_size=20,           # Aumenta de 5 a 20
-    max_overflow=40,        # Aumenta de 10 a 40
-    pool_pre_ping=True,     # Verifica conexiones antes de usarlas
-    pool_recycle=3600       # Recicla conexiones cada hora
-)
+def _claves_foraneas_sqlite(engine: Engine):
+    """SQLite no aplica las claves foráneas (ni ON DELETE CASCADE) si no se activan en cada conexión."""
+    def activar(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+    if engine.dialect.name == "sqlite":
+        event.listen(engine, "connect", activar)
+
+def _opciones_pool(pool_propio: type) -> Dict[str, object]:
+    """
+    Argumentos de pool de create_engine según DB_POOL_MODE.
+    "queue": pool propio dimensionado por settings. "null": cada sesión abre y cierra su conexión; el pooler externo
+    (PgBouncer en modo transacción) es el que las reutiliza, así el total no crece con la cantidad de workers.
+    """
+    if settings.DB_POOL_MODE == "null":
+        return {"poolclass": InstrumentedNullPool} # pre_ping no aporta: la conexión se acaba de abrir.
+    return {
+        "poolclass": pool_propio,               # QueuePool que además mide la espera por conexión (/metrics).
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": True,                  # Verifica conexiones antes de usarlas
+    }
+
+def _crear_engine(url: str, nombre: str) -> Engine:
+    # echo queda apagado: loguea cada sentencia de forma síncrona. Las consultas lentas las reporta sql_profiler.
+    motor = create_engine(url, echo=settings.DB_ECHO, **_opciones_pool(InstrumentedQueuePool))
+    registrar_engine(nombre, motor)
+    _claves_foraneas_sqlite(motor)
+    return motor
+
+# El motor debe ser global y creado solo una vez. Es el primario: todas las escrituras van a este motor.
+engine = _crear_engine(DATABASE_URL, "sync")
+
+# Réplicas de solo lectura (DB_REPLICA_URLS). Vacío = todo va al primario.
+REPLICA_URLS: List[str] = [url.strip() for url in settings.DB_REPLICA_URLS.split(",") if url.strip()]
+replica_engines: List[Engine] = [_crear_engine(url, f"replica{i}") for i, url in enumerate(REPLICA_URLS)]
+_siguiente_replica = itertools.cycle(replica_engines) # Round-robin entre réplicas.
 # --------------------------------------------------------------------------------------------
 
 
-# ------------------------------- Creamos la BD y sus tablas ------------------------------------
-def create_db_and_tables():
+# ------------------------------- Configuración del Motor Asíncrono --------------------------
+def _to_async_url(url: str) -> str:
+    """Traduce la URL síncrona (psycopg2/sqlite) a su driver asíncrono (asyncpg/aiosqlite)."""
+    if url.startswith("postgresql+psycopg2://"):
+        return url.replace("postgresql+psycopg2://", "postgresql+asyncpg://", 1)
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    if url.startswith("sqlite://"):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    return url
+
+ASYNC_DATABASE_URL = os.environ.get("ASYNC_DATABASE_URL") or _to_async_url(DATABASE_URL)
+
+# El motor asíncrono se crea de forma perezosa: en modo síncrono no hace falta tener asyncpg instalado.
+_async_engine: Optional[AsyncEngine] = None
+
+def get_async_engine() -> AsyncEngine:
+    """Devuelve el motor asíncrono (global), creándolo en el primer uso."""
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = _crear_async_engine(ASYNC_DATABASE_URL, "async")
+    return _async_engine
+
+
+def _crear_async_engine(url: str, nombre: str) -> AsyncEngine:
+    opciones = _opciones_pool(InstrumentedAsyncAdaptedQueuePool)
+    if settings.DB_POOL_MODE == "null" and make_url(url).get_driver_name() == "asyncpg":
+        # PgBouncer en modo transacción no conserva los prepared statements de asyncpg entre transacciones.
+        opciones["connect_args"] = {"statement_cache_size": 0, "prepared_statement_cache_size": 0,
+                                    "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__"}
+    motor = create_async_engine(url, echo=settings.DB_ECHO, **opciones)
+    registrar_engine(nombre, motor.sync_engine)
+    _claves_foraneas_sqlite(motor.sync_engine)
+    return motor
+
+
+_async_replica_engines: Optional[List[AsyncEngine]] = None
+_siguiente_async_replica = None
+
+def get_async_replica_engines() -> List[AsyncEngine]:
+    """Motores asíncronos de las réplicas (misma lista que replica_engines), creados en el primer uso."""
+    global _async_replica_engines, _siguiente_async_replica
+    if _async_replica_engines is None:
+        _async_replica_engines = [_crear_async_engine(_to_async_url(url), f"async_replica{i}") for i, url in enumerate(REPLICA_URLS)]
+        _siguiente_async_replica = itertools.cycle(_async_replica_engines)
+    return _async_replica_engines
+
+
+async def dispose_async_engine():
+    """Cierra las conexiones de los motores asíncronos (se llama al apagar la API)."""
+    global _async_engine, _async_replica_engines
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+    for motor in _async_replica_engines or []:
+        await motor.dispose()
+    _async_replica_engines = None
+# --------------------------------------------------------------------------------------------
+
+
+# ------------------------------- Verificamos el esquema de la BD ----------------------------
+def verificar_esquema():
     """
-    Crea el motor y luego las tablas.
+    Verifica que la base esté en la última migración: una sola lectura de alembic_version,
+    sin inspeccionar las tablas. El esquema lo administra Alembic ('alembic upgrade head').
+    Con DB_AUTO_MIGRATE=true aplica antes las migraciones pendientes (desarrollo y pruebas).
     Esta función se llama durante el 'lifespan' de FastAPI.
     """
-    global engine
-    if not DATABASE_URL:
-        print("ADVERTENCIA: DATABASE_URL no encontrada.")
+    if settings.DB_AUTO_MIGRATE:
+        migrar(engine)
+
+    esperada, actual = revision_esperada(), revision_actual(engine)
+    if actual != esperada:
+        raise RuntimeError(f"El esquema de la base está en la revisión {actual!r} y el código espera {esperada!r}: "
+                           "ejecutar 'alembic upgrade head' desde Backend/ (o iniciar con DB_AUTO_MIGRATE=true).")
+    print(f"Esquema de la base en la revisión {actual}.")
+
+    # Las réplicas reciben el esquema por replicación: solo se avisa si todavía no llegó.
+    for motor in replica_engines:
+        if revision_actual(motor) != esperada:
+            print(f"Advertencia: la réplica {motor.url!r} todavía no está en la revisión {esperada}.")
+# --------------------------------------------------------------------------------------------
+
+
+# ------------------------------- Enrutamiento lectura / escritura ---------------------------
+class EscriturasRecientes:
+    """
+    Tokens que escribieron hace menos de DB_READ_YOUR_WRITES_SECONDS (read-your-writes).
+    Mientras tanto sus lecturas van al primario: una réplica atrasada no puede "deshacer" lo que el cliente acaba de guardar.
+    Es por proceso, como la caché de usuarios.
+    """
+
+    def __init__(self, ventana_segundos: float, max_size: int = 10_000):
+        self.ventana_segundos = ventana_segundos
+        self.max_size = max_size
+        self._hasta: Dict[str, float] = {} # token -> fin de la ventana (time.monotonic)
+        self._lock = threading.Lock()
+
+    def registrar(self, token: str):
+        with self._lock:
+            ahora = time.monotonic()
+            if len(self._hasta) >= self.max_size:
+                self._hasta = {t: hasta for t, hasta in self._hasta.items() if hasta > ahora}
+            self._hasta[token] = ahora + self.ventana_segundos
+
+    def reciente(self, token: str) -> bool:
+        hasta = self._hasta.get(token)
+        return hasta is not None and hasta > time.monotonic()
+
+
+ESCRITURAS_RECIENTES = EscriturasRecientes(settings.DB_READ_YOUR_WRITES_SECONDS)
+METODOS_LECTURA = frozenset({"GET", "HEAD"})
+
+
+def _es_lectura_en_replica(request: Request) -> bool:
+    """
+    Decide el destino de la sesión del request según el tipo de transacción:
+    - GET/HEAD son de solo lectura: van a una réplica (si hay), salvo que el token haya escrito recién.
+    - El resto (POST, PUT, DELETE) escribe: primario, y el token queda "pegado" al primario por la ventana.
+    Las escrituras también leen del primario: el agregado que se modifica nunca viene de una réplica atrasada.
+    """
+    token = request.headers.get("authorization")
+    if request.method not in METODOS_LECTURA:
+        if token:
+            ESCRITURAS_RECIENTES.registrar(token)
+        return False
+    return not (token and ESCRITURAS_RECIENTES.reciente(token))
 
-    print("Intentando crear tablas en la base de datos...")
-    # Esta línea ahora usa el motor creado. Si la URL era inválida, el fallo ocurrirá aquí.
-    SQLModel.metadata.create_all(engine)
-    print("Tablas verificadas/creadas exitosamente.")
+
+def _registrar_fin_escritura(request: Request):
+    """La ventana se cuenta desde que termina la escritura (una escritura lenta no la consume)."""
+    token = request.headers.get("authorization")
+    if token and request.method not in METODOS_LECTURA:
+        ESCRITURAS_RECIENTES.registrar(token)
+# --------------------------------------------------------------------------------------------
+
+
+def es_sesion_de_replica(session: Union[Session, AsyncSession]) -> bool:
+    """True si la sesión lee de una réplica (get_session la marca en session.info)."""
+    return session.info.get("replica", False)
 # --------------------------------------------------------------------------------------------
 
 
 # ------------------------------- Devolvemos una Sesion --------------------------------------
-def get_session() -> Generator[Session, None, None]:
+def get_session(request: Request) -> Generator[Session, None, None]:
     """
     Patrón de generador (Dependencia de FastAPI) para obtener una sesión.
     Abre una sesión y asegura que se cierre automáticamente.
+    Las lecturas (GET) van a una réplica, salvo la tabla users: la autenticación y las desactivaciones
+    siempre se leen del primario. Sin réplicas configuradas, todo va al primario.
     """
-    session = Session(engine) # Crea la sesión.
+    if replica_engines and _es_lectura_en_replica(request):
+        session = Session(next(_siguiente_replica), binds={UserDB: engine}, info={"replica": True})
+        contar_sesion("replica")
+    else:
+        session = Session(engine) # Crea la sesión.
+        contar_sesion("primario")
     try:
         yield session # La devuelve para que FastAPI la use.
     finally:
         session.close()
+        if replica_engines:
+            _registrar_fin_escritura(request)
+# --------------------------------------------------------------------------------------------
+
+
+# ------------------------------- Devolvemos una Sesion Asíncrona ----------------------------
+async def get_async_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Equivalente asíncrono de get_session (modo DB_ASYNC_MODE), con el mismo enrutamiento a réplicas.
+    FastAPI la cachea por request, por lo que auth y rutinas comparten la misma sesión.
+    """
+    if REPLICA_URLS and _es_lectura_en_replica(request):
+        get_async_replica_engines()
+        session = AsyncSession(next(_siguiente_async_replica), binds={UserDB: get_async_engine()}, info={"replica": True})
+        contar_sesion("replica")
+    else:
+        session = AsyncSession(get_async_engine())
+        contar_sesion("primario")
+    try:
+        async with session:
+            yield session
+    finally:
+        if REPLICA_URLS:
+            _registrar_fin_escritura(request)
 # --------------------------------------------------------------------------------------------
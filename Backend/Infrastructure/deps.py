@@ -1,19 +1,35 @@
 import os
+from typing import Optional
 from config import settings
-from fastapi import Depends
+from fastapi import Depends, FastAPI
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from passlib.context import CryptContext
-from Infrastructure.database import get_session
-from Infrastructure.Security.jwt_handler import JWTHandler
+from Infrastructure.database import get_session, get_async_session, es_sesion_de_replica
+from Infrastructure.Security.jwt_handler import JWTHandler, get_current_user, get_current_user_async
 from Infrastructure.Security.password_hasher import PasswordHasher
+from Infrastructure.Security.hashing_pool import HashingPool
+from Infrastructure.Monitoring.metrics import registrar_user_cache, registrar_hashing_pool, registrar_rutina_cache
+from Infrastructure.Cache.cache_backend import CacheBackend
+from Infrastructure.Cache.memory_backend import MemoryCacheBackend
+from Infrastructure.Security.user_cache import UserCache
 from Infrastructure.Repositories.user_repository import UserRepository
 from Infrastructure.Repositories.rutina_repository import RutinaRepository
+from Infrastructure.Repositories.rutina_repository_cache import CachedRutinaRepository
+from Infrastructure.Repositories.user_repository_async import AsyncUserRepository
+from Infrastructure.Repositories.rutina_repository_async import AsyncRutinaRepository
 from Domain.Interfaces.auth_service_interface import AuthServiceInterface
 from Domain.Interfaces.rutina_service_interface import RutinaServiceInterface
 from Domain.Interfaces.user_repository_interface import UserRepositoryInterface
 from Domain.Interfaces.rutina_repository_interface import RutinaRepositoryInterface
+from Domain.Interfaces.auth_service_async_interface import AsyncAuthServiceInterface
+from Domain.Interfaces.rutina_service_async_interface import AsyncRutinaServiceInterface
+from Domain.Interfaces.user_repository_async_interface import AsyncUserRepositoryInterface
+from Domain.Interfaces.rutina_repository_async_interface import AsyncRutinaRepositoryInterface
 from Application.Services.auth_service import AuthService
 from Application.Services.rutina_service import RutinaService
+from Application.Services.auth_service_async import AsyncAuthService
+from Application.Services.rutina_service_async import AsyncRutinaService
 
 # --------------------------------------------------- FACTORY --------------------------------------------------------------------------
 # Este archivo cumple la funcion de una "Fabrica" (Solo hace Inyeccion de Dependencia).
@@ -22,9 +38,27 @@ from Application.Services.rutina_service import RutinaService
 # --------------------------------------------------------------------------------------------------------------------------------------
 
 # --------------------------------------------------- RUTINA FACTORY ---------------------------------------------------------------------
+def crear_rutina_cache() -> Optional[CacheBackend]:
+    """Backend de la caché de rutinas según RUTINA_CACHE_BACKEND (None = sin caché)."""
+    if settings.RUTINA_CACHE_BACKEND == "memory":
+        return MemoryCacheBackend(max_entries=settings.RUTINA_CACHE_MAX_ENTRIES, ttl_seconds=settings.RUTINA_CACHE_TTL_SECONDS)
+    if settings.RUTINA_CACHE_BACKEND == "redis":
+        from Infrastructure.Cache.redis_backend import RedisCacheBackend # Solo hace falta el paquete redis si se usa.
+        return RedisCacheBackend(settings.REDIS_URL, ttl_seconds=settings.RUTINA_CACHE_TTL_SECONDS)
+    return None
+
+# Caché de rutinas: única por proceso (el backend "redis" además la comparte entre procesos).
+RUTINA_CACHE = crear_rutina_cache()
+registrar_rutina_cache(RUTINA_CACHE)
+
 # Con este metodo realizamos la inyeccion de dependencia del Repositorio.
 def get_rutina_repository(session: Session = Depends(get_session)) -> RutinaRepositoryInterface:
-    return RutinaRepository(session) # De esta manera da igual los cambios que hagamos en la implementacion que el resto seguira funcionando igual.
+    repositorio = RutinaRepository(session) # De esta manera da igual los cambios que hagamos en la implementacion que el resto seguira funcionando igual.
+    if RUTINA_CACHE is not None:
+        # Decorador: el Servicio no se entera de que las lecturas pueden venir de la caché.
+        # Lo leído de una réplica no se guarda: podría estar atrasado respecto de la última escritura.
+        return CachedRutinaRepository(repositorio, RUTINA_CACHE, guardar=not es_sesion_de_replica(session))
+    return repositorio
 
 
 # En este caso hacemos la inyeccion de dependencia del Servicio.
@@ -38,36 +72,91 @@ def get_rutina_service(rutina_repo: RutinaRepositoryInterface = Depends(get_ruti
 def get_user_repository(session: Session = Depends(get_session)) -> UserRepositoryInterface:
     return UserRepository(session) 
 
-# Define el contexto de hashing, usando bcrypt, que es el estándar recomendado.
-PWD_CONTEXT = CryptContext(schemes=["argon2"], deprecated="auto")
+# Define el contexto de hashing, usando argon2 con los parámetros de Settings.
+# needs_update compara cada hash contra estos parámetros (rehash transparente en el login).
+PWD_CONTEXT_CONFIG = {
+    "schemes": ["argon2"],
+    "deprecated": "auto",
+    "argon2__time_cost": settings.ARGON2_TIME_COST,
+    "argon2__memory_cost": settings.ARGON2_MEMORY_COST,
+    "argon2__parallelism": settings.ARGON2_PARALLELISM,
+}
+PWD_CONTEXT = CryptContext(**PWD_CONTEXT_CONFIG)
+
+# Pool de procesos para el hashing: único por proceso de la API (los procesos se crean al primer uso).
+HASHING_POOL = HashingPool(workers=settings.HASH_POOL_WORKERS, max_queue=settings.HASH_POOL_MAX_QUEUE,
+                           config_contexto=PWD_CONTEXT_CONFIG) if settings.HASH_POOL_WORKERS > 0 else None
+registrar_hashing_pool(HASHING_POOL)
 
 # Inyectamos el encriptador de contraseñas.
 def get_pwd_hasher() -> PasswordHasher:
-    return PasswordHasher(context = PWD_CONTEXT)
+    return PasswordHasher(context = PWD_CONTEXT, pool = HASHING_POOL)
+
+def cerrar_hashing_pool() -> None:
+    if HASHING_POOL is not None:
+        HASHING_POOL.shutdown()
 
 # Inyectamos el Manejador de eventos JWT.
 def get_jwt_handler() -> JWTHandler:
     return JWTHandler(settings=settings)
 
-def get_auth_service() -> AuthServiceInterface:
-    """
-    Resuelve manualmente las dependencias para evitar el error 'Depends' 
-    cuando se llama fuera del contexto de FastAPI.
-    """
+# Caché de usuarios autenticados: es única por proceso (compartida por todos los requests).
+USER_CACHE = UserCache(max_size=settings.AUTH_CACHE_MAX_SIZE, ttl_seconds=settings.AUTH_CACHE_TTL_SECONDS)
+registrar_user_cache(USER_CACHE) # Hit rate visible en /metrics.
 
-    try:
-        session_instance = next(get_session()) 
-        user_repo = get_user_repository(session=session_instance)
-    except Exception as e:
-        print(f"Advertencia: No se pudo obtener la sesión DB para AuthService: {e}")
-        user_repo  = get_user_repository(session=next(get_session()))
+def get_user_cache() -> UserCache:
+    return USER_CACHE
 
+def get_auth_service(user_repo: UserRepositoryInterface = Depends(get_user_repository)) -> AuthServiceInterface:
+    """
+    El Repositorio usa la sesión del request (get_session se cachea por request): get_current_user,
+    el AuthService y el repositorio de rutinas comparten una única sesión, que FastAPI cierra al terminar.
+    """
     pwd_has = get_pwd_hasher()
     jwt_handler = get_jwt_handler()
 
     return AuthService(
         user_repository=user_repo, 
         password_hasher=pwd_has, 
-        jwt_handler=jwt_handler
+        jwt_handler=jwt_handler,
+        user_cache=get_user_cache()
+    )
+# ----------------------------------------------------------------------------------------------------------------------------------------
+
+
+# --------------------------------------------------- ASYNC FACTORY (DB_ASYNC_MODE) ------------------------------------------------------
+# Mismas fabricas, pero sobre una AsyncSession y con sus propias interfaces asíncronas (Async*Interface).
+# get_async_session se cachea por request, asi que get_current_user_async y el repositorio de rutinas comparten la misma sesion.
+def get_async_rutina_repository(session: AsyncSession = Depends(get_async_session)) -> AsyncRutinaRepositoryInterface:
+    # Un backend remoto (Redis) bloquearía el event loop: en modo async solo se usa la caché en memoria.
+    cache = RUTINA_CACHE if RUTINA_CACHE is not None and RUTINA_CACHE.es_local else None
+    return AsyncRutinaRepository(session, cache=cache, guardar_en_cache=not es_sesion_de_replica(session))
+
+
+def get_async_rutina_service(rutina_repo: AsyncRutinaRepositoryInterface = Depends(get_async_rutina_repository)) -> AsyncRutinaServiceInterface:
+    return AsyncRutinaService(rutina_repo)
+
+
+def get_async_user_repository(session: AsyncSession = Depends(get_async_session)) -> AsyncUserRepositoryInterface:
+    return AsyncUserRepository(session)
+
+
+def get_async_auth_service(user_repo: AsyncUserRepositoryInterface = Depends(get_async_user_repository)) -> AsyncAuthServiceInterface:
+    return AsyncAuthService(
+        user_repository=user_repo,
+        password_hasher=get_pwd_hasher(),
+        jwt_handler=get_jwt_handler(),
+        user_cache=get_user_cache()
     )
+
+
+def configurar_modo_async(app: FastAPI) -> None:
+    """
+    Reemplaza las fabricas síncronas por las asíncronas en toda la API.
+    Los Controladores siguen dependiendo de get_rutina_service, get_auth_service y get_current_user:
+    reciben una implementación síncrona o asíncrona (ServicioRutinas / ServicioAuth) y la llaman con ejecutar().
+    """
+    app.dependency_overrides[get_rutina_service] = get_async_rutina_service
+    app.dependency_overrides[get_auth_service] = get_async_auth_service
+    app.dependency_overrides[get_current_user] = get_current_user_async
 # ----------------------------------------------------------------------------------------------------------------------------------------
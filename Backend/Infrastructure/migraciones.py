@@ -0,0 +1,37 @@
+import os
+from typing import Optional
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy.engine import Engine
+
+# alembic.ini y migrations/ viven en Backend/, junto a main.py.
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic.ini")
+
+
+def configuracion() -> Config:
+    return Config(ALEMBIC_INI)
+
+
+# ------------------------------------- REVISIONES ----------------------------------------------
+def revision_esperada() -> str:
+    """Última migración del código (head). Solo lee los archivos de migrations/versions."""
+    return ScriptDirectory.from_config(configuracion()).get_current_head()
+
+
+def revision_actual(engine: Engine) -> Optional[str]:
+    """Migración aplicada en la base (tabla alembic_version), o None si nunca se migró."""
+    with engine.connect() as conexion:
+        return MigrationContext.configure(conexion).get_current_revision()
+# -----------------------------------------------------------------------------------------------
+
+
+# ------------------------------------- MIGRAR --------------------------------------------------
+def migrar(engine: Engine):
+    """Equivalente a 'alembic upgrade head' sobre el motor de la API (en una transacción)."""
+    config = configuracion()
+    with engine.begin() as conexion:
+        config.attributes["connection"] = conexion
+        command.upgrade(config, "head")
+# -----------------------------------------------------------------------------------------------
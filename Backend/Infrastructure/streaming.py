@@ -0,0 +1,66 @@
+from typing import AsyncIterator, Tuple
+from fastapi import Request
+from starlette.responses import StreamingResponse
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+# ------------------------------- Leer un body NDJSON en streaming ---------------------------
+async def leer_ndjson(request: Request, max_line_bytes: int) -> AsyncIterator[Tuple[int, bytes]]:
+    """
+    Recorre el body del request línea a línea a medida que llega (sin cargarlo completo).
+    Devuelve (número de línea, contenido). Las líneas vacías se ignoran.
+    Una línea más larga que max_line_bytes se devuelve vacía (b"") para que el llamador la informe como error,
+    y se descarta el resto de esa línea sin acumularla en memoria.
+    """
+    pendiente = bytearray()
+    numero = 0
+    descartando = False
+
+    async for chunk in request.stream():
+        inicio = 0
+        while True:
+            fin = chunk.find(b"\n", inicio)
+            if fin == -1:
+                if not descartando:
+                    pendiente += chunk[inicio:]
+                    if len(pendiente) > max_line_bytes:
+                        descartando = True
+                        pendiente.clear()
+                break
+
+            numero += 1
+            if descartando:
+                descartando = False
+                yield numero, b""
+            else:
+                pendiente += chunk[inicio:fin]
+                linea = bytes(pendiente).strip()
+                pendiente.clear()
+                if len(linea) > max_line_bytes:
+                    yield numero, b""
+                elif linea:
+                    yield numero, linea
+            inicio = fin + 1
+
+    # Última línea sin salto de línea final.
+    if descartando or pendiente.strip():
+        numero += 1
+        yield numero, (b"" if descartando else bytes(pendiente).strip())
+# --------------------------------------------------------------------------------------------
+
+
+# ------------------------------- Respuesta en streaming "full duplex" -----------------------
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse para endpoints que leen el body MIENTRAS responden (p. ej. el alta masiva NDJSON).
+    La StreamingResponse estándar (ASGI < 2.4) lanza una tarea que consume receive() esperando
+    'http.disconnect', y se quedaría con los chunks del body. Acá el único lector es el generador;
+    si el cliente se desconecta, request.stream() lanza ClientDisconnect y el generador termina.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+# --------------------------------------------------------------------------------------------
@@ -0,0 +1,111 @@
+"""
+Micro-benchmark de memoria y asignaciones al mapear una página grande de rutinas (Mapper.to_domain_entity).
+
+Uso (desde Backend/):
+    python -m benchmarks.bench_entidades
+    python -m benchmarks.bench_entidades --rutinas 1000 --ejercicios 10 --repeticiones 30
+
+No usa la base de datos: arma los RutinaDB/EjercicioDB en memoria y mide solo el mapeo a Entidades.
+Compara las Entidades actuales (con __slots__) contra subclases que vuelven a tener __dict__ por instancia
+(estimación conservadora del layout anterior: ocupan un poco menos que las clases originales).
+Imprime una línea JSON por variante: bytes y bloques retenidos por la página (tracemalloc), bytes por
+rutina y latencias p50/p95 en ms; y una línea final con las diferencias.
+"""
+import gc
+import json
+import random
+import argparse
+import statistics
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import List
+from Domain.Entities.rutina import Rutina
+from Domain.Entities.ejercicio import Ejercicio
+from Domain.ValueObjects.dias import DiaSemana
+from Infrastructure.Repositories import mapper as modulo_mapper
+from Infrastructure.Repositories.mapper import Mapper
+from Infrastructure.Repositories.models_db import RutinaDB, EjercicioDB
+from benchmarks.bench_search import percentil
+
+
+# Subclases sin __slots__: vuelven a tener __dict__ por instancia, como las Entidades antes de usar __slots__.
+class _RutinaConDict(Rutina):
+    pass
+
+
+class _EjercicioConDict(Ejercicio):
+    pass
+
+
+def pagina(rutinas: int, ejercicios: int) -> List[RutinaDB]:
+    """Página de RutinaDB con sus ejercicios cargados, sin sesión (lo que devuelve la consulta con selectinload)."""
+    rnd = random.Random(42)
+    inicio = datetime(2024, 1, 1)
+    resultado = []
+    for i in range(rutinas):
+        rutina = RutinaDB(id=i + 1, user_id=1, nombre=f"Rutina {i}", descripcion=None if i % 3 == 0 else f"Descripción {i}",
+                          fecha_creacion=inicio + timedelta(seconds=i))
+        rutina.ejercicios = [EjercicioDB(id=i * ejercicios + orden, rutina_id=i + 1, user_id=1, nombre=f"Ejercicio {orden}",
+                                         dia_semana=rnd.choice(list(DiaSemana)), series=rnd.randint(1, 5), repeticiones=rnd.randint(5, 15),
+                                         peso=float(rnd.randint(0, 100)), notas=None, orden=orden)
+                             for orden in range(1, ejercicios + 1)]
+        resultado.append(rutina)
+    return resultado
+
+
+def medir(filas: List[RutinaDB], repeticiones: int):
+    """Memoria retenida por la página mapeada (una corrida con tracemalloc) y latencias del mapeo (sin tracemalloc)."""
+    gc.collect()
+    tracemalloc.start()
+    antes = tracemalloc.take_snapshot()
+    entidades = [Mapper.to_domain_entity(r) for r in filas]
+    despues = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    diferencias = [d for d in despues.compare_to(antes, "filename") if d.size_diff > 0]
+    bytes_retenidos = sum(d.size_diff for d in diferencias)
+    bloques = sum(d.count_diff for d in diferencias)
+    del entidades
+
+    latencias = []
+    for i in range(repeticiones + 3):  # Las 3 primeras son de calentamiento.
+        t0 = time.perf_counter()
+        entidades = [Mapper.to_domain_entity(r) for r in filas]
+        if i >= 3:
+            latencias.append((time.perf_counter() - t0) * 1000)
+        del entidades
+    return bytes_retenidos, bloques, latencias
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memoria y tiempo de mapear una página de rutinas a Entidades.")
+    parser.add_argument("--rutinas", type=int, default=1000)
+    parser.add_argument("--ejercicios", type=int, default=5, help="Ejercicios por rutina")
+    parser.add_argument("--repeticiones", type=int, default=30)
+    args = parser.parse_args()
+
+    filas = pagina(args.rutinas, args.ejercicios)
+    resultados = {}
+    for variante, clase_rutina, clase_ejercicio in (("con_dict", _RutinaConDict, _EjercicioConDict), ("slots", Rutina, Ejercicio)):
+        # El Mapper construye las clases que encuentra en su módulo: se reemplazan solo durante la medición.
+        modulo_mapper.Rutina, modulo_mapper.Ejercicio = clase_rutina, clase_ejercicio
+        try:
+            bytes_retenidos, bloques, latencias = medir(filas, args.repeticiones)
+        finally:
+            modulo_mapper.Rutina, modulo_mapper.Ejercicio = Rutina, Ejercicio
+        resultados[variante] = (bytes_retenidos, statistics.median(latencias))
+        print(json.dumps({
+            "benchmark": "entidades", "variante": variante, "rutinas": args.rutinas, "ejercicios_por_rutina": args.ejercicios,
+            "bytes": bytes_retenidos, "bloques": bloques, "bytes_por_rutina": round(bytes_retenidos / args.rutinas, 1),
+            "p50_ms": round(statistics.median(latencias), 3), "p95_ms": round(percentil(latencias, 95), 3),
+        }), flush=True)
+
+    print(json.dumps({
+        "benchmark": "entidades",
+        "memoria_ahorrada_pct": round(100 * (1 - resultados["slots"][0] / resultados["con_dict"][0]), 1),
+        "mejora_p50": round(resultados["con_dict"][1] / resultados["slots"][1], 2),
+    }), flush=True)
+
+
+if __name__ == "__main__":
+    main()
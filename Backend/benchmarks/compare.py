@@ -0,0 +1,54 @@
+"""
+Compara dos corridas de benchmarks/bench_api.py (o bench_search.py) guardadas como JSON lines.
+
+Uso (desde Backend/):
+    python -m benchmarks.compare base.jsonl nuevo.jsonl
+
+Imprime una línea JSON por ruta con los valores de ambas corridas y la variación porcentual
+(positiva = más rps o más latencia en la corrida nueva).
+"""
+import sys
+import json
+import argparse
+from typing import Dict
+
+METRICAS = ["rps", "p50_ms", "p95_ms", "p99_ms"]
+
+
+def cargar(ruta: str) -> Dict[str, dict]:
+    """Resultados por clave (route para bench_api, rows para bench_search); ignora las líneas de configuración."""
+    resultados = {}
+    with open(ruta, encoding="utf-8") as archivo:
+        for linea in archivo:
+            if not linea.strip():
+                continue
+            fila = json.loads(linea)
+            clave = fila.get("route") or (f"rows={fila['rows']}" if "rows" in fila else None)
+            if clave is not None:
+                resultados[clave] = fila
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Diferencias entre dos corridas de benchmark.")
+    parser.add_argument("base")
+    parser.add_argument("nuevo")
+    args = parser.parse_args()
+
+    base, nuevo = cargar(args.base), cargar(args.nuevo)
+    for clave in [c for c in nuevo if c in base]:
+        fila = {"route": clave}
+        for metrica in METRICAS:
+            if metrica in base[clave] and metrica in nuevo[clave]:
+                antes, despues = base[clave][metrica], nuevo[clave][metrica]
+                fila[metrica] = {"base": antes, "nuevo": despues,
+                                 "delta_pct": round((despues - antes) / antes * 100, 1) if antes else None}
+        fila["errores"] = {"base": base[clave].get("errores", 0), "nuevo": nuevo[clave].get("errores", 0)}
+        print(json.dumps(fila))
+
+    for clave in sorted(set(base) ^ set(nuevo)):
+        print(f"AVISO: '{clave}' solo aparece en {'la base' if clave in base else 'la corrida nueva'}.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
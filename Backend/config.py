@@ -6,9 +6,63 @@ class Settings(BaseSettings):
     JWT_SECRET_KEY: str
     JWT_ALGORITHM: str = "HS256"
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+
+    # Hashing de contraseñas (argon2). Si cambian, los hashes viejos se re-generan en el próximo login.
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536       # KiB.
+    ARGON2_PARALLELISM: int = 4
+    HASH_POOL_WORKERS: int = 2            # Procesos dedicados al hashing (0 = en el mismo proceso de la API).
+    HASH_POOL_MAX_QUEUE: int = 32         # Trabajos en espera antes de rechazar con 503.
+
+    # Caché de usuarios autenticados (get_current_user)
+    AUTH_CACHE_TTL_SECONDS: float = 30.0
+    AUTH_CACHE_MAX_SIZE: int = 10_000
     
+    # Caché de lecturas de rutinas (get_by_id, get_by_nombre, get_all_by_user)
+    RUTINA_CACHE_BACKEND: str = "memory"  # "memory" (por proceso), "redis" (compartida) o "none".
+    RUTINA_CACHE_MAX_ENTRIES: int = 10_000 # Solo backend "memory" (en Redis lo acota maxmemory).
+    RUTINA_CACHE_TTL_SECONDS: float = 60.0
+    REDIS_URL: str = "redis://localhost:6379/0"
+
+    # Alta masiva de rutinas (POST /api/rutinas/bulk)
+    BULK_BATCH_SIZE: int = 200            # Rutinas por transacción.
+    BULK_MAX_LINE_BYTES: int = 1_048_576  # Tamaño máximo de una línea NDJSON.
+
+    # Lote de operaciones (POST /api/batch)
+    BATCH_MAX_OPERACIONES: int = 100      # Operaciones por request (todas en una transacción).
+
+    # Exportación de rutinas (GET /api/rutinas/export)
+    EXPORT_BATCH_SIZE: int = 1000         # Filas leídas del cursor por vez.
+
+    # Monitoreo
+    METRICS_ENABLED: bool = True          # Expone GET /metrics (formato Prometheus).
+    SLOW_QUERY_MS: float = 200.0          # Las consultas que tardan más se loguean (logger "pokegym.sql").
+    SQL_DEBUG_ENABLED: bool = False       # Permite pedir el detalle de consultas con el header X-Debug-SQL: 1.
+    SQL_PROFILE_MAX_QUERIES: int = 50     # Consultas de un request perfilado que se loguean con detalle.
+    SQL_PROFILE_MAX_SQL_CHARS: int = 300  # Largo máximo de cada sentencia en el log.
+    DB_ECHO: bool = False                 # echo de SQLAlchemy (todas las sentencias a stdout): solo para depurar.
+
     # Database (opcional)
     DATABASE_URL: Optional[str] = None
+    ASYNC_DATABASE_URL: Optional[str] = None # Si no se define, se deriva de DATABASE_URL (asyncpg/aiosqlite).
+
+    # Pool de conexiones de cada motor (primario, réplicas, async). Por proceso: con N workers se abren hasta
+    # N x (DB_POOL_SIZE + DB_MAX_OVERFLOW) conexiones por motor, que deben entrar en max_connections de Postgres.
+    DB_POOL_MODE: str = "queue"           # "queue" (pool propio) o "null" (sin pool: detrás de un pooler externo, p. ej. PgBouncer).
+    DB_POOL_SIZE: int = 20                # Conexiones que se mantienen abiertas.
+    DB_MAX_OVERFLOW: int = 40             # Conexiones extra ante picos (se cierran al devolverse).
+    DB_POOL_TIMEOUT: float = 30.0         # Segundos esperando una conexión libre antes de fallar.
+    DB_POOL_RECYCLE: int = 3600           # Segundos de vida de una conexión (-1 = sin límite).
+
+    # Réplicas de solo lectura: URLs separadas por coma (mismo formato que DATABASE_URL). Vacío = sin réplicas.
+    DB_REPLICA_URLS: str = ""
+    DB_READ_YOUR_WRITES_SECONDS: float = 5.0 # Después de escribir, las lecturas del mismo token van al primario.
+
+    # Modo de ejecución de la capa de datos: False = psycopg2 + threadpool, True = asyncpg + AsyncSession.
+    DB_ASYNC_MODE: bool = False
+
+    # Migraciones (Alembic). Al iniciar solo se verifica la revisión; con True se aplican las pendientes.
+    DB_AUTO_MIGRATE: bool = False
 
     # Configuración de Pydantic Settings.
     # Esto le dice a Pydantic que lea las variables de entorno.
@@ -1,7 +1,13 @@
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
-from Infrastructure.database import create_db_and_tables, engine
+from config import settings
+from Infrastructure.database import verificar_esquema, dispose_async_engine, engine
+from Infrastructure.deps import configurar_modo_async, cerrar_hashing_pool
+from Infrastructure.Monitoring.query_counter import QueryCounterMiddleware, QUERY_COUNT_HEADER
+from Infrastructure.Monitoring.metrics import MetricsMiddleware, router as metrics_router
+from Infrastructure.Monitoring.sql_profiler import SqlProfilerMiddleware, SQL_PROFILE_HEADER, configurar_logger
+from Application.Services.paginacion import NEXT_CURSOR_HEADER
 from Application.Controllers.auth_controller import router as auth_router
 from Application.Controllers.rutina_controller import router as rutina_router # Importamos el enrutador y le ponemos un nuevo nombre.
 
@@ -11,8 +17,13 @@ async def lifespan(app: FastAPI):
     print("="*80)
     print("INICIANDO APLICACIÓN")
     print("="*80)
-    create_db_and_tables()
+    verificar_esquema()
+    print(f"Modo de acceso a datos: {'ASYNC (AsyncSession)' if settings.DB_ASYNC_MODE else 'SYNC (Session + threadpool)'}")
+    if settings.SQL_DEBUG_ENABLED:
+        configurar_logger() # El detalle por consulta de X-Debug-SQL se loguea como INFO.
     yield
+    await dispose_async_engine()
+    cerrar_hashing_pool()
     print("App terminando...")
     
 app = FastAPI(
@@ -24,6 +35,13 @@ app = FastAPI(
 # -----------------------------------------------------------------------------------------------------------------------------------
 
 
+# ------------------------------------------ Modo de acceso a datos (sync / async) --------------------------------------------------
+# Con DB_ASYNC_MODE=true las mismas rutas usan AsyncSession + repositorios asíncronos (útil para comparar ambos modos).
+if settings.DB_ASYNC_MODE:
+    configurar_modo_async(app)
+# -----------------------------------------------------------------------------------------------------------------------------------
+
+
 # -------------------------------------------------- Configurar CORS ----------------------------------------------------------------
 origins = [ # Es una lista de URLs que tienen permiso para acceder a la API.
     "http://localhost:5173",  # Vite dev server (puerto típico)
@@ -37,13 +55,27 @@ app.add_middleware(
     allow_credentials=True, # Permite el envío de cookies y headers de autenticación (Necesario para Sesiones, JWT tokens, autenticación).
     allow_methods=["*"], # Permite todos los métodos HTTP (GET, POST, PUT, DELETE, etc.).
     allow_headers=["*"], # Permite todos los headers HTTP en las solicitudes (Ejemplos: Content-Type, Authorization, X-Requested-With).
+    expose_headers=[QUERY_COUNT_HEADER, NEXT_CURSOR_HEADER, SQL_PROFILE_HEADER, "ETag"], # Headers propios que el navegador puede leer.
 )
+
+# Métricas por ruta para /metrics. Se agrega antes que QueryCounterMiddleware para quedar "adentro" y leer su contador.
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# Detalle de las consultas de un request (header X-Debug-SQL: 1). Expone SQL: solo para entornos de desarrollo.
+if settings.SQL_DEBUG_ENABLED:
+    app.add_middleware(SqlProfilerMiddleware)
+
+# Cuenta las consultas SQL de cada request (header X-DB-Query-Count) para detectar regresiones N+1.
+app.add_middleware(QueryCounterMiddleware)
 # -----------------------------------------------------------------------------------------------------------------------------------
 
 
 # ------------------------------------------ Incluimos los Controladores ------------------------------------------------------------
 app.include_router(rutina_router)
 app.include_router(auth_router)
+if settings.METRICS_ENABLED:
+    app.include_router(metrics_router) # GET /metrics (no aparece en /docs).
 # -----------------------------------------------------------------------------------------------------------------------------------
 
 
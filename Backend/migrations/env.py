@@ -0,0 +1,58 @@
+from logging.config import fileConfig
+from alembic import context
+from sqlalchemy import create_engine, pool
+from sqlmodel import SQLModel
+import Infrastructure.Repositories.models_db  # Registra las tablas en SQLModel.metadata (autogenerate).
+
+# --------------------------------------------------------------------------------------------
+# Entorno de Alembic. La conexión sale, en este orden, de:
+#   1. config.attributes["connection"]: la pasa Infrastructure.migraciones.migrar() (usa el motor de la API).
+#   2. sqlalchemy.url de la configuración (se puede fijar desde código).
+#   3. La misma URL que usa la API (Infrastructure.database.DATABASE_URL).
+# --------------------------------------------------------------------------------------------
+config = context.config
+target_metadata = SQLModel.metadata
+
+# Logging de alembic.ini solo desde la línea de comandos: dentro de la API no se tocan sus loggers.
+if config.config_file_name and "connection" not in config.attributes:
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+
+def _url() -> str:
+    url = config.get_main_option("sqlalchemy.url")
+    if url:
+        return url
+    from Infrastructure.database import DATABASE_URL
+    return DATABASE_URL
+
+
+def _configurar(connection):
+    # SQLite no soporta ALTER de constraints: en ese motor las operaciones se hacen recreando la tabla (batch).
+    context.configure(connection=connection, target_metadata=target_metadata,
+                      render_as_batch=connection.dialect.name == "sqlite", compare_type=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_offline():
+    """Genera el SQL sin conectarse (alembic upgrade head --sql)."""
+    context.configure(url=_url(), target_metadata=target_metadata, literal_binds=True, dialect_opts={"paramstyle": "named"})
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    conexion = config.attributes.get("connection")
+    if conexion is not None:
+        _configurar(conexion)
+        return
+    engine = create_engine(_url(), poolclass=pool.NullPool)
+    with engine.connect() as conexion:
+        _configurar(conexion)
+    engine.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,80 @@
+"""Esquema inicial: users, rutina, ejercicio y rutina_version.
+
+Adopta las bases creadas antes por SQLModel.metadata.create_all: las tablas e índices que ya existen se
+saltean, así 'alembic upgrade head' funciona tanto en una base vacía como en una base en uso.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+from alembic import context, op
+import sqlalchemy as sa
+
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Nombres de los miembros de DiaSemana (SQLAlchemy guarda el nombre, no el valor). Copiados a propósito:
+# una migración no debe cambiar si después cambia el código.
+DIAS = ("LUNES", "MARTES", "MIERCOLES", "JUEVES", "VIERNES", "SABADO", "DOMINGO")
+
+
+def upgrade() -> None:
+    # En modo offline (--sql) no hay conexión para inspeccionar: se genera el esquema completo.
+    existentes = set() if context.is_offline_mode() else set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "users" not in existentes:
+        op.create_table(
+            "users",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("username", sa.String(length=100), nullable=False),
+            sa.Column("hashed_password", sa.String(), nullable=False),
+            sa.Column("full_name", sa.String(), nullable=True),
+            sa.Column("is_active", sa.Boolean(), nullable=False),
+            sa.Column("date_created", sa.DateTime(), nullable=False),
+        )
+    op.create_index("ix_users_username", "users", ["username"], unique=True, if_not_exists=True)
+
+    if "rutina" not in existentes:
+        op.create_table(
+            "rutina",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("nombre", sa.String(), nullable=False),
+            sa.Column("descripcion", sa.String(), nullable=True),
+            sa.Column("fecha_creacion", sa.DateTime(), nullable=False),
+        )
+    op.create_index("ix_rutina_user_id", "rutina", ["user_id"], if_not_exists=True)
+
+    if "ejercicio" not in existentes:
+        op.create_table(
+            "ejercicio",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("rutina_id", sa.Integer(), sa.ForeignKey("rutina.id"), nullable=False),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("nombre", sa.String(), nullable=False),
+            sa.Column("dia_semana", sa.Enum(*DIAS, name="diasemana"), nullable=False),
+            sa.Column("series", sa.Integer(), nullable=False),
+            sa.Column("repeticiones", sa.Integer(), nullable=False),
+            sa.Column("peso", sa.Float(), nullable=True),
+            sa.Column("notas", sa.String(), nullable=True),
+            sa.Column("orden", sa.Integer(), nullable=False),
+        )
+    op.create_index("ix_ejercicio_user_id", "ejercicio", ["user_id"], if_not_exists=True)
+
+    if "rutina_version" not in existentes:
+        op.create_table(
+            "rutina_version",
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), primary_key=True),
+            sa.Column("version", sa.Integer(), nullable=False),
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("rutina_version")
+    op.drop_table("ejercicio")
+    op.drop_table("rutina")
+    op.drop_table("users")
+    sa.Enum(name="diasemana").drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,43 @@
+"""Índices compuestos de las consultas del repositorio de rutinas.
+
+- rutina (user_id, fecha_creacion, id): listado y paginación keyset (ORDER BY fecha_creacion, id).
+- rutina (user_id, nombre): get_by_nombre / get_nombres_existentes (validación de nombre repetido).
+- ejercicio (rutina_id, orden, id): carga de los ejercicios de una rutina (selectinload, JOIN de las lecturas
+  en filas y de la exportación) y borrado en cascada; antes ejercicio.rutina_id no tenía índice.
+- ejercicio (rutina_id, dia_semana, orden, id): GET /rutinas/{id}/dias.
+- Solo PostgreSQL: índice trigrama GIN sobre lower(nombre) para la búsqueda parcial.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+from alembic import op
+
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDICES = (
+    ("ix_rutina_user_fecha_id", "rutina", ["user_id", "fecha_creacion", "id"]),
+    ("ix_rutina_user_nombre", "rutina", ["user_id", "nombre"]),
+    ("ix_ejercicio_rutina_orden_id", "ejercicio", ["rutina_id", "orden", "id"]),
+    ("ix_ejercicio_rutina_dia_orden", "ejercicio", ["rutina_id", "dia_semana", "orden", "id"]),
+)
+
+
+def upgrade() -> None:
+    for nombre, tabla, columnas in INDICES:
+        op.create_index(nombre, tabla, columnas, if_not_exists=True)
+
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute("CREATE INDEX IF NOT EXISTS ix_rutina_nombre_trgm ON rutina USING gin (lower(nombre) gin_trgm_ops)")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_rutina_nombre_trgm")
+    for nombre, tabla, _ in reversed(INDICES):
+        op.drop_index(nombre, table_name=tabla, if_exists=True)
@@ -0,0 +1,33 @@
+"""Nombre de rutina único por usuario: ix_rutina_user_nombre pasa a ser UNIQUE (user_id, nombre).
+
+El repositorio inserta con ON CONFLICT DO NOTHING sobre este índice y traduce la violación en los UPDATE:
+la validación de nombre repetido ya no necesita una consulta previa y no depende del orden de requests concurrentes.
+Si la base ya tiene nombres repetidos (altas concurrentes anteriores), se conserva el de la rutina más vieja
+y a las demás se les agrega el id al nombre: 'Fuerza' -> 'Fuerza (42)'.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+from alembic import op
+
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "UPDATE rutina SET nombre = nombre || ' (' || CAST(id AS VARCHAR) || ')' "
+        "WHERE EXISTS (SELECT 1 FROM rutina AS anterior "
+        "WHERE anterior.user_id = rutina.user_id AND anterior.nombre = rutina.nombre AND anterior.id < rutina.id)"
+    )
+    op.drop_index("ix_rutina_user_nombre", table_name="rutina")
+    op.create_index("ix_rutina_user_nombre", "rutina", ["user_id", "nombre"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_rutina_user_nombre", table_name="rutina")
+    op.create_index("ix_rutina_user_nombre", "rutina", ["user_id", "nombre"])
@@ -0,0 +1,36 @@
+"""ON DELETE CASCADE en ejercicio.rutina_id.
+
+Al borrar una rutina, la DB borra sus ejercicios: el repositorio ejecuta un único DELETE de la rutina,
+sin cargar los ejercicios para que el ORM los borre uno por uno.
+En SQLite la clave foránea no se puede modificar: el modo batch recrea la tabla ejercicio (con sus índices).
+La convención de nombres le da a la clave foránea existente el nombre que le asigna PostgreSQL
+(ejercicio_rutina_id_fkey), así la misma migración sirve en los dos motores.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+from alembic import op
+
+revision: str = "0004"
+down_revision: Union[str, Sequence[str], None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CONVENCION = {"fk": "%(table_name)s_%(column_0_name)s_fkey"}
+FK = "ejercicio_rutina_id_fkey"
+
+
+def _reemplazar_fk(ondelete: Union[str, None]) -> None:
+    with op.batch_alter_table("ejercicio", naming_convention=CONVENCION) as batch:
+        batch.drop_constraint(FK, type_="foreignkey")
+        batch.create_foreign_key(FK, "rutina", ["rutina_id"], ["id"], ondelete=ondelete)
+
+
+def upgrade() -> None:
+    _reemplazar_fk("CASCADE")
+
+
+def downgrade() -> None:
+    _reemplazar_fk(None)
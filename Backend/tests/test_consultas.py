@@ -0,0 +1,66 @@
+"""
+Regresiones N+1 del repositorio de rutinas: la cantidad de consultas de una lectura
+no puede crecer con la cantidad de rutinas (ni de ejercicios) que devuelve.
+
+Uso (desde Backend/):
+    python -m pytest -q
+"""
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import insert
+from sqlmodel import SQLModel, Session, create_engine
+from Domain.ValueObjects.dias import DiaSemana
+from Infrastructure.Monitoring.query_counter import contar_consultas
+from Infrastructure.Repositories.models_db import UserDB, RutinaDB, EjercicioDB
+from Infrastructure.Repositories.rutina_repository import RutinaRepository
+
+USER_ID = 1
+EJERCICIOS_POR_RUTINA = 5
+CANTIDADES_DE_RUTINAS = [1, 10, 100]
+
+# Lecturas a verificar: (nombre, llamada sobre el repositorio).
+LECTURAS = [
+    ("get_all_by_user", lambda repo: repo.get_all_by_user(user_id=USER_ID, limit=1000)),
+    ("search_by_name", lambda repo: repo.search_by_name("rutina", USER_ID, limit=1000)),
+]
+
+
+def sembrar(engine, rutinas: int, ejercicios: int):
+    """Recrea las tablas e inserta 'rutinas' rutinas del mismo usuario con 'ejercicios' ejercicios cada una."""
+    SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+    inicio = datetime(2024, 1, 1)
+    dias = list(DiaSemana)
+    with engine.begin() as conn:
+        conn.execute(insert(UserDB), [{"id": USER_ID, "username": "test", "hashed_password": "x", "is_active": True, "date_created": inicio}])
+        conn.execute(insert(RutinaDB), [{"id": i + 1, "user_id": USER_ID, "nombre": f"Rutina {i}", "descripcion": None,
+                                         "fecha_creacion": inicio + timedelta(seconds=i)} for i in range(rutinas)])
+        conn.execute(insert(EjercicioDB), [{
+            "rutina_id": rutina_id, "user_id": USER_ID, "nombre": f"Ejercicio {orden}", "dia_semana": dias[orden % len(dias)],
+            "series": 3, "repeticiones": 10, "peso": None, "notas": None, "orden": orden,
+        } for rutina_id in range(1, rutinas + 1) for orden in range(1, ejercicios + 1)])
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'consultas.db'}")
+    yield engine
+    engine.dispose()
+
+
+@pytest.mark.parametrize("nombre, leer", LECTURAS, ids=[nombre for nombre, _ in LECTURAS])
+def test_consultas_constantes_al_crecer_las_rutinas(engine, nombre, leer):
+    totales = {}
+    for rutinas in CANTIDADES_DE_RUTINAS:
+        sembrar(engine, rutinas, EJERCICIOS_POR_RUTINA)
+        with Session(engine) as session:
+            with contar_consultas() as contador:
+                resultado = leer(RutinaRepository(session))
+        # Las rutinas llegan completas: los ejercicios vienen precargados (una consulta para toda la página).
+        assert len(resultado) == rutinas
+        assert all(len(rutina.ejercicios) == EJERCICIOS_POR_RUTINA for rutina in resultado)
+        totales[rutinas] = contador.total
+
+    assert len(set(totales.values())) == 1, f"{nombre}: las consultas crecen con las rutinas {totales}"
+    # SELECT de las rutinas + SELECT ... WHERE rutina_id IN (...) de sus ejercicios.
+    assert totales[CANTIDADES_DE_RUTINAS[0]] == 2, f"{nombre}: {totales}"